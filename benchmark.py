@@ -0,0 +1,375 @@
+"""A NOTE ON OPTIMAL DEGREE-THREE SPANNERS OF THE SQUARE LATTICE - BENCHMARKS
+
+Usage:
+    benchmark.py square-root-number [--repeat=<r>]
+    benchmark.py run [--repeat=<r>] [--prove-repeat=<r>] [--results=<names>] [--groups=<names>] [--history=<file>] [--no-history]
+    benchmark.py compare [--history=<file>] [--threshold=<t>] [<old> <new>]
+    benchmark.py (-h | --help)
+
+Options:
+    -h --help               Show this screen.
+    --repeat=<r>            Number of measures of each benchmark (the best one is reported) [default: 5].
+    --prove-repeat=<r>      Number of measures of each proof of the group 'prove' [default: 1].
+    --results=<names>       Results proved by the group 'prove', separated by commas [default: h1,h2,p1,p2,p3,p4].
+    --groups=<names>        Groups of benchmarks which are run, separated by commas
+                            [default: prove,square-root-number,prover,figure-2,lemma-2-4].
+    --history=<file>        JSON file where the results of 'run' are added, and read by 'compare' [default: benchmark_history.json].
+    --no-history            Only print the results of 'run'.
+    --threshold=<t>         Relative slowdown above which 'compare' reports a regression [default: 0.1].
+
+Explanation:
+    This program measures the time spent on the proofs and on some elementary operations of the proof.
+    square-root-number: the arithmetic operations and comparisons of SquareRootNumber,
+    and the pruning test of the depth-first searches of proof.py, written with the arithmetic
+    operations of SquareRootNumber (as in the first version of proof.py) and with square_le.
+
+    run: runs the groups of benchmarks below, and adds their results to the history file.
+        prove               the proofs of launch.py without interface, with sets and with bitboards
+                            (the number of branches of every proof must be the one of launch.py), and the proofs
+                            with a store of 5 nogoods, which evicts nogoods (the numbers of branches and of
+                            evictions must be the same with sets and with bitboards);
+        square-root-number  the operations above;
+        prover              'exists_good_path', 'find_paths', 'find_shortcut', 'pattern_created_by_recent_add' and
+                            'detect_pattern' of the prover, with sets and with bitboards, on the configuration of
+                            a branch of the proof of p4
+                            (the answers must be the same with sets and with bitboards);
+        figure-2            'verify_shortest_paths' of proposition_2_1.py on the three configurations of figure_2.py;
+        lemma-2-4           the Dijkstra's algorithm of lemma_2_4.py.
+    Every benchmark records its time and a check (the number of branches of a proof, the number of answers
+    of a search, ...), which must not change from one version of the programs to the next.
+
+    compare: compares two runs of the history file (by default the last two runs; <old> and <new> are positions
+    in the history, negative positions counted from the end), and exits with an error if a benchmark is slower
+    by more than the threshold or if its check changed.
+"""
+
+import sys
+import json
+import time
+import timeit
+import platform
+import subprocess
+
+from docopt import docopt
+
+from util import *
+
+
+def measure(statement, setup_globals, number, repeat):
+    '''Returns the best time (in nanoseconds) of one execution of 'statement' over 'repeat' measures.'''
+    times = timeit.repeat(statement, globals=setup_globals, number=number, repeat=repeat)
+    return 1e9 * min(times) / number
+
+
+def measure_function(function, repeat):
+    '''
+    Calls 'function' (without arguments) 'repeat' times, and returns the best time (in seconds)
+    and the value returned by the last call.
+    '''
+    best_time = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = function()
+        elapsed = time.perf_counter() - start
+        if best_time is None or elapsed < best_time:
+            best_time = elapsed
+    return best_time, value
+
+
+def format_time(seconds):
+    if seconds >= 1:
+        return '%8.2f s ' % seconds
+    if seconds >= 1e-3:
+        return '%8.2f ms' % (1e3 * seconds)
+    if seconds >= 1e-6:
+        return '%8.2f us' % (1e6 * seconds)
+    return '%8.0f ns' % (1e9 * seconds)
+
+
+def report(results, name, seconds, check=None):
+    '''Prints the result of a benchmark and stores it in 'results' (a dictionary name -> {'time', 'check'}).'''
+    print('%-55s %s' % (name, format_time(seconds)) + ('' if check is None else '   (check: %s)' % check))
+    sys.stdout.flush()
+    results[name] = {'time': seconds, 'check': check}
+
+
+# -----------------------------------------------------------------------------------------------------------------
+# SQUARE ROOT NUMBERS
+
+def benchmark_square_root_number(repeat, results=None):
+    setup_globals = {
+        'SquareRootNumber': SquareRootNumber,
+        'manhattan_with_diagonals': manhattan_with_diagonals,
+        'DIL': DIL,
+        'max_lg_squared': dilated_squared(5),
+        'd_pq_squared': 5,
+        'lg': SquareRootNumber(2, 1),
+        'x': SquareRootNumber(3, -1),
+        'y': SquareRootNumber(-2, 2),
+        'q': (2, 1),
+        'u': (0, 1),
+    }
+
+    benchmarks = [
+        ('x + y', 'x + y'),
+        ('x * y', 'x * y'),
+        ('x**2', 'x**2'),
+        ('x < y', 'x < y'),
+        ('x <= y', 'x <= y'),
+        ('x == y', 'x == y'),
+        ('pruning test (arithmetic operations)',
+         '(lg + manhattan_with_diagonals(q, u))**2 > (DIL**2) * SquareRootNumber(d_pq_squared, 0)'),
+        ('pruning test (square_le)',
+         'not (lg + manhattan_with_diagonals(q, u)).square_le(max_lg_squared)'),
+    ]
+
+    for name, statement in benchmarks:
+        nanoseconds = measure(statement, setup_globals, 100000, repeat)
+        if results is None:
+            print('%-45s %8.0f ns' % (name, nanoseconds))
+        else:
+            report(results, 'SquareRootNumber: ' + name, 1e-9 * nanoseconds)
+
+
+# -----------------------------------------------------------------------------------------------------------------
+# PROOFS
+
+# Size of the store of nogoods of the proofs which evict nogoods
+SMALL_NOGOOD_STORE = 5
+
+
+def benchmark_prove(repeat, to_prove_names, results):
+    '''
+    Proves the results without interface, with sets and with bitboards, and then with a store of SMALL_NOGOOD_STORE
+    nogoods. Raises ValueError if the number of branches of a proof is not the number 'tot' of launch.py, or if the
+    proofs with nogoods do not have the same numbers of branches and of evictions with sets and with bitboards.
+    '''
+    import proof
+    from interface import SilentInterface
+    from launch import to_prove_dictionary
+
+    for bitboard in [False, True]:
+        for to_prove_name in to_prove_names:
+            to_prove = to_prove_dictionary[to_prove_name]
+            seconds, counters = measure_function(lambda: proof.prove(to_prove, SilentInterface(), bitboard=bitboard), repeat)
+            if counters['branches'] != to_prove.tot:
+                raise ValueError('The proof of %s has %d branches instead of %d' % (to_prove_name, counters['branches'], to_prove.tot))
+            report(results, 'prove %s%s' % (to_prove_name, ' (bitboard)' if bitboard else ''), seconds, counters['branches'])
+
+    for to_prove_name in to_prove_names:
+        to_prove = to_prove_dictionary[to_prove_name]
+        checks = []
+        for bitboard in [False, True]:
+            seconds, counters = measure_function(lambda: proof.prove(to_prove, SilentInterface(), bitboard=bitboard,
+                                                                     nogood_store_size=SMALL_NOGOOD_STORE), repeat)
+            checks.append('%d branches, %d evictions' % (counters['branches'], counters['nogood_evictions']))
+            report(results, 'prove %s, %d nogoods%s' % (to_prove_name, SMALL_NOGOOD_STORE, ' (bitboard)' if bitboard else ''),
+                   seconds, checks[-1])
+        if checks[0] != checks[1]:
+            raise ValueError('The proofs of %s with nogoods differ with sets and with bitboards: %s and %s'
+                             % (to_prove_name, checks[0], checks[1]))
+
+
+# -----------------------------------------------------------------------------------------------------------------
+# OPERATIONS OF THE PROVER
+#
+# The operations are measured on a configuration met during the proof of p4: the configuration of the node
+# where the budget of branches of the search is exceeded. No shortcut and no pattern is found in this configuration,
+# so 'find_shortcut' and 'detect_pattern' explore all their possibilities.
+
+PROVER_RESULT = 'p4'
+PROVER_BRANCH = 1000
+
+
+def prover_at_branch(to_prove, prover_class, branch):
+    '''Returns a prover whose configuration is the one of the branch number 'branch' of the proof of 'to_prove'.'''
+    import proof
+    from interface import SilentInterface
+
+    prover = prover_class(to_prove, SilentInterface(), max_branches=branch - 1)
+    try:
+        prover.expand(to_prove.path_of_config)
+    except proof.BudgetExceeded:
+        return prover
+    raise ValueError('The proof of %s has less than %d branches' % (to_prove.name, branch))
+
+
+def benchmark_prover(repeat, results):
+    '''
+    Measures the searches of the prover on every pair of points (p, q) of the catalog of short paths with p in the
+    configuration, the search of a shortcut, and the detection of the patterns at every point of the configuration.
+    Raises ValueError if the answers are not the same with sets and with bitboards.
+    '''
+    import proof
+    from launch import to_prove_dictionary
+
+    to_prove = to_prove_dictionary[PROVER_RESULT]
+    checks = {}
+    for prover_class in [proof.Prover, proof.BitboardProver]:
+        prover = prover_at_branch(to_prove, prover_class, PROVER_BRANCH)
+        points = sorted({a for a, _ in prover.edges})
+        pairs = [(p, translate(p, v)) for p in points for v in sorted(proof.PATH_CATALOG)]
+        suffix = ' (bitboard)' if prover_class is proof.BitboardProver else ''
+
+        benchmarks = [
+            ('exists_good_path (%d pairs)' % len(pairs),
+             lambda: sum([prover.exists_good_path(p, q) for p, q in pairs])),
+            ('find_paths, at most 2 paths (%d pairs)' % len(pairs),
+             lambda: sum([len(prover.find_paths(p, q, 2)) for p, q in pairs])),
+            ('find_shortcut (x10)',
+             lambda: [prover.find_shortcut(to_prove.u, to_prove.v, to_prove.length_of_path) for _ in range(10)].count(None)),
+            ('pattern_created_by_recent_add (%d points, x10)' % len(points),
+             lambda: [prover.pattern_created_by_recent_add(points) for _ in range(10)].count(None)),
+        ]
+        if prover_class is proof.Prover:   # (BitboardProver only searches the patterns with 'pattern_created_by_recent_add')
+            benchmarks.append(('detect_pattern (%d points, %d patterns)' % (len(points), len(prover.list_of_patterns)),
+                               lambda: sum([prover.detect_pattern(p, pattern) is not None for p in points for pattern in prover.list_of_patterns])))
+        for name, function in benchmarks:
+            seconds, check = measure_function(function, repeat)
+            if checks.setdefault(name, check) != check:
+                raise ValueError('%s: the answers are not the same with sets and with bitboards' % name)
+            report(results, name + suffix, seconds, check)
+
+
+# -----------------------------------------------------------------------------------------------------------------
+# FIGURE 2 AND LEMMA 2.4
+
+def benchmark_figure_2(repeat, results):
+    '''Measures 'verify_shortest_paths' on the configurations of figure_2.py (it raises ValueError if it fails).'''
+    from figure_2 import first_config, second_config, third_config
+    from proposition_2_1 import verify_shortest_paths
+
+    for name, config_function in [('first', first_config), ('second', second_config), ('third', third_config)]:
+        config, possible_values_for_p1 = config_function()
+        seconds, _ = measure_function(lambda: verify_shortest_paths(config, possible_values_for_p1), repeat)
+        report(results, 'verify_shortest_paths (figure 2, %s configuration)' % name, seconds, len(possible_values_for_p1))
+
+
+def benchmark_lemma_2_4(repeat, results):
+    '''Measures the Dijkstra's algorithm of lemma_2_4.py (the check is the distance of the farthest point).'''
+    from lemma_2_4 import build_graph, distances_from
+
+    _, graph = build_graph()
+    seconds, distances = measure_function(lambda: distances_from(graph, (0, 0)), repeat)
+    farthest = max(distances.values())
+    report(results, "Dijkstra's algorithm of lemma 2.4 (%d points)" % len(graph), seconds, '%d+%d*sqrt(2)' % (farthest.a, farthest.b))
+
+
+# -----------------------------------------------------------------------------------------------------------------
+# HISTORY
+#
+# The history file is a JSON list of runs, in the order in which they were made. A run is a dictionary with the date,
+# the commit of the programs (if they are in a git repository), the version of Python, the machine, and 'results',
+# which maps the name of every benchmark to its time (in seconds) and its check.
+
+GROUPS = ['prove', 'square-root-number', 'prover', 'figure-2', 'lemma-2-4']
+
+
+def current_commit():
+    '''Returns the short hash of the commit of the programs, or None if it is not available.'''
+    try:
+        output = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.stdout.strip() if output.returncode == 0 else None
+
+
+def read_history(history_file):
+    try:
+        with open(history_file) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def run(groups, repeat, prove_repeat, to_prove_names):
+    '''Runs the groups of benchmarks, and returns the run (see the section HISTORY).'''
+    results = {}
+    if 'prove' in groups:
+        benchmark_prove(prove_repeat, to_prove_names, results)
+    if 'square-root-number' in groups:
+        benchmark_square_root_number(repeat, results)
+    if 'prover' in groups:
+        benchmark_prover(repeat, results)
+    if 'figure-2' in groups:
+        benchmark_figure_2(repeat, results)
+    if 'lemma-2-4' in groups:
+        benchmark_lemma_2_4(repeat, results)
+    return {
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'commit': current_commit(),
+        'python': platform.python_version(),
+        'machine': platform.machine() + ' ' + platform.node(),
+        'results': results,
+    }
+
+
+def compare(old_run, new_run, threshold):
+    '''
+    Prints the ratio of the times of the benchmarks of the two runs, and returns the number of regressions:
+    the benchmarks which are slower by more than 'threshold' (relatively) or whose check changed.
+    '''
+    def description(run):
+        return '%s (commit %s)' % (run['date'], run['commit'])
+    print('Old run:', description(old_run))
+    print('New run:', description(new_run))
+
+    nb_regressions = 0
+    for name, new in new_run['results'].items():
+        old = old_run['results'].get(name)
+        if old is None:
+            print('%-55s %s   (new benchmark)' % (name, format_time(new['time'])))
+            continue
+        ratio = new['time'] / old['time']
+        status = ''
+        if old['check'] != new['check']:
+            status = 'CHECK CHANGED (%s -> %s)' % (old['check'], new['check'])
+            nb_regressions += 1
+        elif ratio > 1 + threshold:
+            status = 'REGRESSION'
+            nb_regressions += 1
+        elif ratio < 1 - threshold:
+            status = 'improvement'
+        print('%-55s %s -> %s %7.2fx   %s' % (name, format_time(old['time']), format_time(new['time']), ratio, status))
+    return nb_regressions
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    repeat = int(arguments['--repeat'])
+
+    if arguments['square-root-number']:
+        benchmark_square_root_number(repeat)
+
+    elif arguments['run']:
+        groups = arguments['--groups'].split(',')
+        for group in groups:
+            if group not in GROUPS:
+                raise SystemExit('Unknown group of benchmarks: %s' % group)
+        to_prove_names = arguments['--results'].split(',')
+        for to_prove_name in to_prove_names:
+            if to_prove_name not in ['h1', 'h2', 'p1', 'p2', 'p3', 'p4']:
+                raise SystemExit('Unknown result: %s' % to_prove_name)
+
+        new_run = run(groups, repeat, int(arguments['--prove-repeat']), to_prove_names)
+        if not arguments['--no-history']:
+            history = read_history(arguments['--history'])
+            history.append(new_run)
+            with open(arguments['--history'], 'w') as f:
+                json.dump(history, f, indent=1)
+            print('Run %d added to %s' % (len(history), arguments['--history']))
+
+    elif arguments['compare']:
+        history = read_history(arguments['--history'])
+        if arguments['<old>'] is None:
+            old, new = -2, -1
+        else:
+            old, new = int(arguments['<old>']), int(arguments['<new>'])
+        try:
+            old_run, new_run = history[old], history[new]
+        except IndexError:
+            raise SystemExit('The history %s does not contain these runs (%d runs)' % (arguments['--history'], len(history)))
+        nb_regressions = compare(old_run, new_run, float(arguments['--threshold']))
+        if nb_regressions > 0:
+            raise SystemExit('%d regression(s)' % nb_regressions)
+        print('No regression')
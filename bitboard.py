@@ -0,0 +1,108 @@
+# -----------------------------------------------------------------------------------------------------------------
+# ENCODING OF POINTS AND EDGES AS INTEGERS
+
+# The points of the configurations have coordinates in [-RADIUS, RADIUS], and the queries made during the proof
+# (paths, patterns, shortcuts) only look at points at distance at most MARGIN from the configuration.
+RADIUS = 10
+MARGIN = 5
+
+OFFSET = RADIUS + MARGIN
+SIDE = 2*OFFSET + 1     # the window of the bitboards is the square [-OFFSET, OFFSET]²
+NB_POINTS = SIDE*SIDE
+
+# Every edge is stored once, from the endpoint a such that b-a is in FORWARD.
+FORWARD = [(1, 0), (0, 1), (1, 1), (1, -1)]
+NB_EDGES = 4*NB_POINTS
+
+
+def point_id(p):
+    '''Returns the id of the point p of the window.'''
+    x, y = p
+    return (x+OFFSET)*SIDE + (y+OFFSET)
+
+
+def point_of_id(i):
+    '''Returns the point of the window with id i.'''
+    return (i//SIDE - OFFSET, i % SIDE - OFFSET)
+
+
+def is_in_window(p):
+    '''Returns True iff the point p can be part of a configuration represented by bitboards.'''
+    x, y = p
+    return abs(x) <= RADIUS and abs(y) <= RADIUS
+
+
+def shift_of(v):
+    '''Returns the number which is added to the id of every edge by the translation of vector v.'''
+    vx, vy = v
+    return 4*(vx*SIDE + vy)
+
+
+def edge_id(a, b):
+    '''Returns the id of the edge (a, b), which is also the id of (b, a).'''
+    ax, ay = a
+    bx, by = b
+    d = (bx-ax, by-ay)
+    if d in FORWARD:
+        return 4*point_id(a) + FORWARD.index(d)
+    return 4*point_id(b) + FORWARD.index((ax-bx, ay-by))
+
+
+def edge_of_id(i):
+    '''Returns the edge (a, b) with id i, where b-a is in FORWARD.'''
+    a = point_of_id(i // 4)
+    dx, dy = FORWARD[i % 4]
+    return (a, (a[0]+dx, a[1]+dy))
+
+
+# Maps every direction d to the number 'offset' such that the id of the edge (p, p+d) is 4*point_id(p) + offset.
+EDGE_OFFSETS = {}
+for _d in FORWARD:
+    _dx, _dy = _d
+    EDGE_OFFSETS[_d] = FORWARD.index(_d)
+    EDGE_OFFSETS[(-_dx, -_dy)] = shift_of((-_dx, -_dy)) + FORWARD.index(_d)
+
+
+def mask_of_edges(list_of_edges):
+    '''Returns the bitboard containing the edges of 'list_of_edges'.'''
+    mask = 0
+    for a, b in list_of_edges:
+        mask |= 1 << edge_id(a, b)
+    return mask
+
+
+def bits_of_mask(mask):
+    '''Returns the list of the positions of the bits set in 'mask'.'''
+    binary = bin(mask)[:1:-1]   # the binary digits, starting with the least significant one
+    return [i for i in range(len(binary)) if binary[i] == '1']
+
+
+# -----------------------------------------------------------------------------------------------------------------
+# READ-ONLY VIEW OF A BITBOARD
+
+class EdgeSet:
+    '''
+    Read-only view of a bitboard which behaves like the sets of edges used by Prover:
+    it contains both (a, b) and (b, a) for every edge of the bitboard.
+    It is used to send the configuration to the interfaces.
+    '''
+
+    def __init__(self, bits):
+        self.bits = bits
+
+    def __contains__(self, edge):
+        a, b = edge
+        ax, ay = a
+        bx, by = b
+        if max(abs(ax), abs(ay), abs(bx), abs(by)) > OFFSET or (bx-ax, by-ay) not in EDGE_OFFSETS:
+            return False
+        return (self.bits >> edge_id(a, b)) & 1 == 1
+
+    def __iter__(self):
+        for i in bits_of_mask(self.bits):
+            a, b = edge_of_id(i)
+            yield (a, b)
+            yield (b, a)
+
+    def __len__(self):
+        return 2*bin(self.bits).count('1')
@@ -0,0 +1,239 @@
+import gzip
+
+import proof
+from util import ZERO, vec, translate, the_five_short_paths
+
+
+# -----------------------------------------------------------------------------------------------------------------
+# READING
+#
+# A certificate is written by 'prove' (option 'certificate_file', see the section CERTIFICATE of proof.py) and is read
+# line by line, so the memory used by the checker only depends on the depth of the proof tree (and on the number of
+# the explanations of the branching nodes, which are kept for the lines 'N').
+
+class CertificateError(Exception):
+    '''Raised when a line of a certificate is not a valid step of the proof.'''
+
+
+def read_certificate(certificate_file):
+    '''
+    Yields the lines of a certificate (compressed with gzip if the name of the file ends with '.gz')
+    as triples (line number, kind, fields), where 'fields' is the list of the words after the kind.
+    '''
+    opener = gzip.open if certificate_file.endswith('.gz') else open
+    with opener(certificate_file, 'rt') as f:
+        for number, line in enumerate(f, 1):
+            words = line.split()
+            if words:
+                yield number, words[0], words[1:]
+
+
+def points_of_fields(fields):
+    '''Returns the list of the points whose coordinates are the integers of 'fields' (x0 y0 x1 y1 ...).'''
+    numbers = [int(x) for x in fields]
+    if len(numbers) % 2 == 1:
+        raise ValueError('odd number of coordinates')
+    return [(numbers[i], numbers[i+1]) for i in range(0, len(numbers), 2)]
+
+
+# -----------------------------------------------------------------------------------------------------------------
+# CHECKS OF THE STEPS
+#
+# Every check only reads the configuration around the points of the line: the catalog of short paths (see
+# 'exists_good_path' and 'find_paths' of Prover), the known patterns and the lengths of the given paths.
+# No search is made.
+
+def check_shortcut(prover, path):
+    '''Checks that 'path' goes from u to v with a length (as computed by 'find_shortcut') less than 'length_of_path'.'''
+    to_prove = prover.to_prove
+    if to_prove.u is None or to_prove.v is None:
+        raise ValueError('this result has no shortcut')
+    if len(path) < 2 or path[0] != to_prove.u or path[-1] != to_prove.v:
+        raise ValueError('the shortcut does not join u and v')
+
+    norms = {d: (norm, dilated_norm) for d, norm, dilated_norm in proof.dilated_directions}
+    length = ZERO
+    for a, b in zip(path, path[1:]):
+        if vec(a, b) not in norms:
+            raise ValueError('the shortcut has a segment which is not a step of the grid')
+        norm, dilated_norm = norms[vec(a, b)]
+        # an edge which is not in the configuration is replaced by a path of length at most DIL times its length
+        length = length + (norm if (a, b) in prover.edges else dilated_norm)
+    if not length < to_prove.length_of_path:
+        raise ValueError('the shortcut is not shorter than the path')
+
+
+def check_pattern(prover, i, v):
+    '''Checks that the translate by v of the i-th pattern of 'list_of_patterns' is in the configuration.'''
+    if not 0 <= i < len(prover.list_of_patterns):
+        raise ValueError('there is no pattern %d' % i)
+    for a, b in prover.list_of_patterns[i]:
+        if (translate(a, v), translate(b, v)) not in prover.edges:
+            raise ValueError('the pattern is not in the configuration')
+
+
+def check_pair(prover, p, q):
+    '''Checks that (p, q) is a pair of the catalog of short paths which is not joined by a good path.'''
+    if vec(p, q) not in proof.PATH_CATALOG:
+        raise ValueError('the points are not at distance between 1 and sqrt(5)')
+    if prover.exists_good_path(p, q):
+        raise ValueError('the points are already joined by a good path')
+
+
+def check_contradiction(prover, p, q):
+    '''Checks that no path of length at most DIL*|pq| between p and q can be added to the configuration.'''
+    check_pair(prover, p, q)
+    if prover.find_paths(p, q, 1):
+        raise ValueError('the points can be joined')
+
+
+def check_unique_path(prover, p, q, path):
+    '''Checks that 'path' is the only path of length at most DIL*|pq| between p and q which can be added.'''
+    check_pair(prover, p, q)
+    if prover.find_paths(p, q, 2) != [path]:
+        raise ValueError('the path is not the only possible path between the points')
+
+
+def branching_paths(prover, p, q):
+    '''
+    Returns the paths of 'the_five_short_paths' between p and q which can be added to the configuration,
+    and the list of the other paths.
+    '''
+    if vec(p, q) not in proof.UNIT_DIRECTIONS:
+        raise ValueError('the points are not neighbours')
+    paths = []
+    rejected_paths = []
+    for path in the_five_short_paths(p, q):
+        (paths if prover.can_add_path(path) else rejected_paths).append(path)
+    return paths, rejected_paths
+
+
+def check_nogood(prover, learned, k, v):
+    '''
+    Checks that the translate by v of the k-th explanation of 'learned' (the explanations of the branching nodes,
+    see the section LEARNED NOGOODS of proof.py) is in the configuration, and returns it.
+    '''
+    if not 1 <= k <= len(learned):
+        raise ValueError('there is no explanation %d' % k)
+    nogood, absolute = learned[k-1]
+    if absolute and v != (0, 0):
+        raise ValueError('the explanation %d cannot be translated' % k)
+    nogood = [(translate(a, v), translate(b, v)) for a, b in nogood]
+    for edge in nogood:
+        if edge not in prover.edges:
+            raise ValueError('the explanation is not in the configuration')
+    return nogood, absolute
+
+
+# -----------------------------------------------------------------------------------------------------------------
+# CHECK OF A CERTIFICATE
+
+def pass_explanation(stack, edges, absolute):
+    '''
+    Adds the explanation (edges, absolute) of the current node to the explanation of its parent, the node of the last
+    entry of 'stack', without the edges of the path of the child (see the section LEARNED NOGOODS of proof.py).
+    Nothing is done if the explanations are not computed (their edges are None).
+    '''
+    if stack and stack[-1][2] is not None:
+        entry = stack[-1]
+        entry[2] |= {(a, b) if a < b else (b, a) for a, b in edges} - proof.edges_of_path(entry[4])
+        entry[3] = entry[3] or absolute
+
+
+def next_node(prover, stack, learned):
+    '''
+    Moves to the node which follows the subtree of the current node in preorder: removes the paths added in the
+    subtrees which are finished, and adds the path of the next child. Returns False if the proof is finished.
+    The explanations of the nodes which are finished are passed to their parents, and the explanations of the
+    branching nodes are added to 'learned', in the order in which 'prove' numbers them.
+    '''
+    while stack:
+        children, height, _, _, _, branching = stack[-1]
+        prover.backtrack(height)
+        path = next(children, None)
+        if path is not None:
+            prover.add_path(path)
+            stack[-1][4] = path
+            return True
+        _, _, edges, absolute, _, _ = stack.pop()
+        if branching and edges is not None:
+            learned.append((sorted(edges), absolute))
+        pass_explanation(stack, edges, absolute)
+    return False
+
+
+def check_certificate(result_to_prove, certificate_file):
+    '''
+    Checks the certificate of the proof of 'result_to_prove' written in 'certificate_file', and returns the number
+    of lines of every kind. Raises CertificateError (with the number of the line) if a step does not hold,
+    or if the certificate does not cover the whole proof tree.
+
+    The configuration starts with the initial path of the result, and every line is checked against the configuration
+    of its node (see the section CERTIFICATE of proof.py): the lines 'U' and 'B' push on 'stack' the list [children,
+    height, edges, absolute, path, branching] of their node, where 'children' is an iterator over the paths of its
+    children, 'height' the height of the trail of the configuration, (edges, absolute) its explanation so far, 'path'
+    the path of the child being checked and 'branching' True for a line 'B'. The lines 'S', 'P', 'C' and 'N' close
+    the current node, whose explanation is passed to its parent. The explanations are only computed for the
+    certificates of proofs with nogoods (first line 'R name nogoods'), and their edges are None otherwise.
+    '''
+    from interface import SilentInterface
+
+    prover = proof.Prover(result_to_prove, SilentInterface())   # only used to store the configuration
+    counts = dict.fromkeys(['S', 'P', 'C', 'N', 'U', 'B'], 0)
+    stack = []
+    learned = []    # the explanations (edges, absolute) of the branching nodes, in the order of their numbers
+
+    lines = read_certificate(certificate_file)
+    _, kind, fields = next(lines, (0, None, None))
+    if kind != 'R' or fields not in ([result_to_prove.name], [result_to_prove.name, 'nogoods']):
+        raise CertificateError('line 1: the certificate is not a certificate of %s' % result_to_prove.name)
+    explain = (fields[-1] == 'nogoods')
+
+    prover.add_path(result_to_prove.path_of_config)
+    open_node = True   # False once the whole tree is checked
+    for number, kind, fields in lines:
+        if not open_node:
+            raise CertificateError('line %d: the proof is already complete' % number)
+        try:
+            if kind == 'P':
+                i, vx, vy = [int(x) for x in fields]
+                check_pattern(prover, i, (vx, vy))
+                if explain:
+                    pass_explanation(stack, [(translate(a, (vx, vy)), translate(b, (vx, vy)))
+                                             for a, b in prover.list_of_patterns[i]], False)
+            elif kind == 'N':
+                k, vx, vy = [int(x) for x in fields]
+                pass_explanation(stack, *check_nogood(prover, learned, k, (vx, vy)))
+            else:
+                points = points_of_fields(fields)
+                if kind == 'S':
+                    check_shortcut(prover, points)
+                    if explain:
+                        shortcut_edges = [(a, b) for a, b in zip(points, points[1:]) if (a, b) in prover.edges]
+                        pass_explanation(stack, shortcut_edges, True)
+                elif kind == 'C' and len(points) == 2:
+                    check_contradiction(prover, *points)
+                    if explain:
+                        pass_explanation(stack, prover.rejection_reasons(proof.paths_of_catalog(*points)), False)
+                elif kind == 'U' and len(points) >= 4:
+                    p, q, path = points[0], points[1], points[2:]
+                    check_unique_path(prover, p, q, path)
+                    reasons = None
+                    if explain:
+                        other_paths = [other for other in proof.paths_of_catalog(p, q) if other != path]
+                        reasons = prover.rejection_reasons(other_paths)
+                    stack.append([iter([path]), len(prover.trail), reasons, False, None, False])
+                elif kind == 'B' and len(points) == 2:
+                    paths, rejected_paths = branching_paths(prover, *points)
+                    reasons = prover.rejection_reasons(rejected_paths) if explain else None
+                    stack.append([iter(paths), len(prover.trail), reasons, False, None, True])
+                else:
+                    raise ValueError('unknown line')
+        except ValueError as error:
+            raise CertificateError('line %d: %s' % (number, error))
+        counts[kind] += 1
+        open_node = next_node(prover, stack, learned)
+
+    if open_node:
+        raise CertificateError('the certificate ends before the end of the proof')
+    return counts
@@ -19,7 +19,10 @@ from docopt import docopt
 
 import matplotlib
 import matplotlib.pyplot as plt
-matplotlib.use('qt5agg')
+try:
+    matplotlib.use('qt5agg')
+except ImportError:     # no display (for instance when the configurations are imported by benchmark.py)
+    pass
 from matplotlib.widgets import Button, Slider
 
 from queue import PriorityQueue
@@ -1,14 +1,37 @@
 import sys
 import math
 import time
+import bz2
+import gzip
+import json
+import lzma
+import atexit
+import struct
+from queue import Empty
 
 import numpy as np
 
 import matplotlib
 import matplotlib.pyplot as plt
-matplotlib.use('qt5agg')
+try:
+    matplotlib.use('qt5agg')
+except ImportError:     # no display (for instance on a server, with LogInterface): only GUIInterface is unavailable
+    pass
 from matplotlib.widgets import Button, RadioButtons, Slider
 
+from bitboard import EdgeSet, bits_of_mask, edge_of_id
+from rendering import Renderer, undirected, curly_segment
+
+
+def describe_estimate(tot, estimated_total, elapsed):
+    '''
+    Returns the text of an estimate of the size of a proof (see 'notify_estimate'): the estimated number of branches
+    and the remaining time, given the number of branches 'tot' explored in 'elapsed' seconds.
+    '''
+    remaining = elapsed * (estimated_total - tot) / tot if tot > 0 else 0
+    minutes, seconds = divmod(round(remaining), 60)
+    return 'about %d branches, %s left' % (estimated_total, '%dm%02ds' % (minutes, seconds) if minutes else '%ds' % seconds)
+
 
 class GUIInterface:
     def __init__(self):
@@ -35,6 +58,17 @@ class GUIInterface:
         self.ax = self.fig.add_subplot(111, aspect='equal')
         self.__init_axes()
 
+        # the layers of the configuration, drawn in this order (see rendering.py)
+        self.renderer = Renderer(self.fig, self.ax)
+        self.edges_layer = self.renderer.segments(color='blue')
+        self.forbidden_edges_layer = self.renderer.segments(color='lightsalmon')
+        self.shortcut_layer = self.renderer.segments(linewidth=4, linestyle='--', color='magenta')
+        self.curly_shortcut_layer = self.renderer.segments(linewidth=3, color='magenta')
+        self.unique_path_layer = self.renderer.segments(linestyle='--', linewidth=4, color='limegreen')
+        self.pattern_layer = self.renderer.segments(linewidth=5, color='darkviolet')
+        self.impossible_to_join_layer = self.renderer.segments(linewidth=3, color='red')
+        self.uv_layer = self.renderer.points(marker='o', markersize=8, color='magenta')
+
         self.fig.subplots_adjust(left=0.2, bottom=0.2)
         
         widget_color = 'palegoldenrod'
@@ -42,6 +76,7 @@ class GUIInterface:
         self.progress_slider_ax = self.fig.add_axes([0.15, 0.08, 0.75, 0.04], facecolor=widget_color)
         self.progress_slider = Slider(self.progress_slider_ax, 'Progress', 0, 100, valinit=0, dragging=False)
         self.progress_slider.set_active(False)    
+        self.estimate_label = self.fig.text(0.15, 0.03, '')
 
         self.in_pause = False
 
@@ -77,7 +112,9 @@ class GUIInterface:
         
 
     def notify_start(self, edges, forbidden_edges, to_prove):
-        self.current_tot = to_prove.tot
+        self.current_tot = to_prove.tot     # until the first estimate of the number of branches
+        self.start_time = time.monotonic()
+        self.estimate_label.set_text('')
         self.progress_slider.set_val(0)
         self.is_uv_constraint = (to_prove.u is not None and to_prove.v is not None)
         self.shortcut = None
@@ -116,29 +153,89 @@ class GUIInterface:
 
     def notify_branch(self, edges, forbidden_edges, tot):
         self.__visualize(edges, forbidden_edges)
-        self.progress_slider.set_val(100*tot/self.current_tot)
+        self.progress_slider.set_val(min(100, 100*tot/self.current_tot))
+
+    def notify_progress(self, tot):
+        self.progress_slider.set_val(min(100, 100*tot/self.current_tot))
+        self.fig.canvas.draw_idle()
+        self.fig.canvas.start_event_loop(0.001)
+
+    def notify_estimate(self, tot, estimated_total):
+        # shown with the next progress of the slider
+        self.current_tot = estimated_total
+        self.estimate_label.set_text('Estimate: ' + describe_estimate(tot, estimated_total, time.monotonic() - self.start_time))
+
+
+    def follow(self, queue, running, to_prove_dictionary, frame_rate=30):
+        '''
+        Displays a proof which runs in another process with a QueueInterface (see the section PROOF IN ANOTHER PROCESS),
+        until the proof is finished. The figure is drawn at most 'frame_rate' times per second: at every frame, all
+        the events received are applied to the configuration but only the last one is drawn, so that the display
+        never slows the proof down. The button Pause clears the event 'running', which stops the proof.
+        Returns the number of frames drawn and the number of events which were not drawn.
+        '''
+        frame_interval = 1 / frame_rate
+        edges = set()
+        forbidden_edges = set()
+        nb_frames = 0
+        nb_dropped = 0
+        finished = False
+        while not finished:
+            frame_start = time.monotonic()
+            if self.in_pause and running.is_set():
+                running.clear()
+            elif not self.in_pause and not running.is_set():
+                running.set()
+
+            last_event = None   # the last event received during this frame which shows a configuration
+            progress = None
+            while not finished:
+                try:
+                    block = queue.get_nowait()
+                except Empty:
+                    break
+                if block is None:   # sent by QueueInterface.close
+                    finished = True
+                    break
+                for name, added, removed, forbidden_added, forbidden_removed, data in decode_events(block):
+                    edges.difference_update(removed)
+                    edges.update(added)
+                    forbidden_edges.difference_update(forbidden_removed)
+                    forbidden_edges.update(forbidden_added)
+                    if name == 'start':
+                        self.notify_start(None, None, to_prove_dictionary[data[0]])
+                        last_event = None
+                        progress = None
+                    elif name == 'end':
+                        self.notify_end(to_prove_dictionary[data])
+                    elif name == 'finished':
+                        self.notify_finished()
+                    elif name == 'progress':
+                        progress = data
+                    elif name == 'estimate':
+                        self.notify_estimate(*data)
+                    else:
+                        if name == 'branch':
+                            progress = data
+                        nb_dropped += (last_event is not None)
+                        last_event = (name, data)
+
+            if progress is not None:
+                self.progress_slider.set_val(min(100, 100*progress/self.current_tot))
+            if last_event is not None:
+                name, data = last_event
+                if name != 'branch':    # the attributes drawn by __draw have the names of the events
+                    setattr(self, name, data)
+                self.__draw(symmetric_edges(edges), symmetric_edges(forbidden_edges))
+                if name != 'branch':
+                    setattr(self, name, None)
+            if progress is not None or last_event is not None:
+                self.renderer.update()
+                nb_frames += 1
+            self.fig.canvas.start_event_loop(max(0.001, frame_interval - (time.monotonic() - frame_start)))
+        return nb_frames, nb_dropped
     
     
-    def __curly_path(self, a, b, col):
-        # modified from the answer https://stackoverflow.com/a/50918519/3350732
-        # of user hayk-hakobyan https://stackoverflow.com/users/4888158/hayk-hakobyan
-        # from https://stackoverflow.com/questions/45365158/matplotlib-wavy-arrow
-        xa, ya = a
-        xb, yb = b
-        dist = np.hypot(xb - xa, yb - ya)
-        theta = np.arctan2(yb - ya, xb - xa)
-
-        n = 3 * round(dist)
-        x = np.linspace(0, dist, 200)
-        y = 0.2 * np.sin(2*np.pi * x * n / dist)
-        for i in range(200):
-            old_x, old_y = x[i], y[i]
-            x[i] = np.cos(theta)*old_x - np.sin(theta)*old_y
-            y[i] = np.sin(theta)*old_x + np.cos(theta)*old_y
-        
-        self.ax.plot(x + xa, y + ya, linewidth=3, color=col)
-
-
     def __init_axes(self):
         x_ticks = range(-5, 7)
         y_ticks = range(-5, 7)
@@ -153,66 +250,27 @@ class GUIInterface:
         while self.in_pause:
             self.fig.canvas.start_event_loop(0.01)
         
-        self.ax.cla()
-        self.__init_axes()
-        
-        for seg in edges:
-            a, b = seg
-            xa, ya = a
-            xb, yb = b
-            self.ax.plot((xa, xb), (ya, yb), color='blue')
-        
-        for seg in forbidden_edges:
-            a, b = seg
-            xa, ya = a
-            xb, yb = b
-            self.ax.plot((xa, xb), (ya, yb), color='lightsalmon')
-        
-        if self.shortcut is not None:
-            ls_x = []
-            ls_y = []
-            for pt in self.shortcut:
-                x, y = pt
-                ls_x.append(x)
-                ls_y.append(y)
-            
-            len_shortcut = len(self.shortcut)
-            for i in range(len_shortcut - 1):
-                a, b = self.shortcut[i], self.shortcut[i+1]
-                
-                if (a, b) in edges:
-                    xa, ya = a
-                    xb, yb = b
-                    self.ax.plot((xa, xb), (ya, yb), linewidth=4, linestyle='--', color='magenta')
-                else:
-                    self.__curly_path(a, b, 'magenta')
-        
-        if self.unique_path is not None:
-            ls_x = []
-            ls_y = []
-            for pt in self.unique_path:
-                x, y = pt
-                ls_x.append(x)
-                ls_y.append(y)
-            self.ax.plot(ls_x, ls_y, linestyle='--', linewidth=4, color='limegreen')
-        
-        if self.pattern is not None:
-            for seg in self.pattern:
-                a, b = seg
-                xa, ya = a
-                xb, yb = b
-                self.ax.plot((xa, xb), (ya, yb), linewidth=5, color='darkviolet')
-        
-        if self.impossible_to_join is not None:
-            a, b = self.impossible_to_join
-            self.__curly_path(a, b, 'red')
+        self.__draw(edges, forbidden_edges)
+        self.renderer.update()
+        self.fig.canvas.start_event_loop(self.waiting_time)
+
+
+    def __draw(self, edges, forbidden_edges):
+        # only the segments which changed since the previous frame are updated
+        self.edges_layer.update(undirected(edges))
+        self.forbidden_edges_layer.update(undirected(forbidden_edges))
         
-        if self.is_uv_constraint:
-            self.ax.plot([0], [0], marker='o', markersize=8, color='magenta')
-            self.ax.plot([1], [2], marker='o', markersize=8, color='magenta')
+        # the steps of the shortcut which are not edges of the configuration are drawn as curly paths
+        shortcut = self.shortcut if self.shortcut is not None else []
+        steps = set(zip(shortcut, shortcut[1:]))
+        self.shortcut_layer.update({(a, b) for a, b in steps if (a, b) in edges})
+        self.curly_shortcut_layer.update({(a, b) for a, b in steps if (a, b) not in edges}, lambda step: curly_segment(*step))
         
-        self.fig.canvas.draw_idle()
-        self.fig.canvas.start_event_loop(self.waiting_time)
+        self.unique_path_layer.update({tuple(self.unique_path)} if self.unique_path is not None else set())
+        self.pattern_layer.update(undirected(self.pattern) if self.pattern is not None else set())
+        self.impossible_to_join_layer.update({tuple(self.impossible_to_join)} if self.impossible_to_join is not None else set(),
+                                             lambda pair: curly_segment(*pair))
+        self.uv_layer.update([(0, 0), (1, 2)] if self.is_uv_constraint else [])
 
      
 class TextInterface:
@@ -222,7 +280,8 @@ class TextInterface:
 
     def notify_start(self, edges, forbidden_edges, to_prove):
         self.cp_expand = 0
-        self.current_tot = to_prove.tot
+        self.current_tot = to_prove.tot     # until the first estimate of the number of branches
+        self.start_time = time.monotonic()
 
         print('We now consider the proof of', to_prove.name)
         print('Known lemmas so far:', str([lemma.name for lemma in to_prove.known_lemmas]))
@@ -250,3 +309,334 @@ class TextInterface:
     def notify_branch(self, edges, forbidden_edges, tot):
         self.cp_expand += 1
         print('PROGRESS:', str(self.cp_expand) + '/' + str(self.current_tot))
+
+    def notify_progress(self, tot):
+        print('PROGRESS:', str(tot) + '/' + str(self.current_tot))
+
+    def notify_estimate(self, tot, estimated_total):
+        self.current_tot = estimated_total
+        print('ESTIMATE:', describe_estimate(tot, estimated_total, time.monotonic() - self.start_time))
+
+
+class SilentInterface:
+    '''Interface which ignores all notifications (used by the worker processes in parallel mode).'''
+
+    def notify_start(self, edges, forbidden_edges, to_prove):
+        pass
+
+    def notify_end(self, to_prove):
+        pass
+
+    def notify_finished(self):
+        pass
+
+    def notify_shortcut(self, edges, forbidden_edges, shortcut):
+        pass
+
+    def notify_pattern(self, edges, forbidden_edges, pattern):
+        pass
+
+    def notify_unique_path(self, edges, forbidden_edges, unique_path):
+        pass
+
+    def notify_impossible_to_join(self, edges, forbidden_edges, p, q):
+        pass
+
+    def notify_branch(self, edges, forbidden_edges, tot):
+        pass
+
+    def notify_progress(self, tot):
+        pass
+
+    def notify_estimate(self, tot, estimated_total):
+        pass
+
+
+# -----------------------------------------------------------------------------------------------------------------
+# EVENT LOG
+#
+# LogInterface writes every notification in a file, with the changes of 'edges' and 'forbidden_edges' since the
+# previous notification instead of the whole configuration (every edge is written once, as (a, b) with a < b).
+# The events are encoded in a buffer which is written in the file by blocks of LOG_BUFFER_SIZE bytes, and the file
+# is compressed according to its extension ('.gz', '.bz2' or '.xz'). Two formats are available:
+# - JSONL: one JSON object per line, {"e": event, "a": added edges, "r": removed edges, "fa": added forbidden edges,
+#   "fr": removed forbidden edges, "d": data of the event}, where the empty lists are omitted and the edges are
+#   lists [xa, ya, xb, yb];
+# - binary: the file starts with LOG_MAGIC, and every event is a header (event code, numbers of added edges,
+#   removed edges, added forbidden edges and removed forbidden edges) followed by the coordinates of the edges
+#   as signed bytes (the configurations of the proofs stay in [-15, 15]², see bitboard.py) and the data of the event.
+# 'read_log' reads both formats.
+
+LOG_EVENTS = ['start', 'end', 'finished', 'shortcut', 'pattern', 'unique_path', 'impossible_to_join', 'branch', 'progress',
+              'estimate']
+LOG_MAGIC = b'SPANLOG1'
+LOG_HEADER = struct.Struct('<B4H')
+LOG_BUFFER_SIZE = 1 << 16
+LOG_OPENERS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+
+
+def open_log(log_file, mode):
+    '''Opens a log file in binary mode, with the compression given by its extension.'''
+    for extension, opener in LOG_OPENERS.items():
+        if log_file.endswith(extension):
+            return opener(log_file, mode)
+    return open(log_file, mode)
+
+
+def flatten_edges(list_of_edges):
+    '''Returns the list of the coordinates xa, ya, xb, yb of the edges (a, b) of 'list_of_edges'.'''
+    return [int(x) for a, b in list_of_edges for x in a + b]
+
+
+def edges_of_numbers(numbers):
+    '''Inverse of 'flatten_edges'.'''
+    return [((numbers[i], numbers[i+1]), (numbers[i+2], numbers[i+3])) for i in range(0, len(numbers), 4)]
+
+
+def points_of_numbers(numbers):
+    '''Returns the list of the points whose coordinates are x0, y0, x1, y1, ... in 'numbers'.'''
+    return [(numbers[i], numbers[i+1]) for i in range(0, len(numbers), 2)]
+
+
+def symmetric_edges(list_of_edges):
+    '''Returns the set of the edges (a, b) and (b, a) for the edges (a, b) of 'list_of_edges' (as used by the interfaces).'''
+    return set(list_of_edges) | {(b, a) for a, b in list_of_edges}
+
+
+class LogInterface:
+    '''Interface which writes all the notifications in a log file (see the section EVENT LOG), without any output.'''
+
+    def __init__(self, log_file, binary=False):
+        self.file = open_log(log_file, 'wb')
+        self.binary = binary
+        self.buffer = bytearray(LOG_MAGIC if binary else b'')
+        self.last_edges = set()
+        self.last_forbidden_edges = set()
+        atexit.register(self.close)     # the end of the log is written even if the program is stopped by sys.exit
+
+    def close(self):
+        '''Writes the buffer and closes the file (the interface cannot be used anymore).'''
+        if self.file is not None:
+            self.flush()
+            self.file.close()
+            self.file = None
+
+    def flush(self):
+        self.file.write(self.buffer)
+        self.buffer = bytearray()
+
+    def delta(self, edges, last_edges):
+        '''
+        Returns (added, removed, current): the lists of the edges (a, b) with a < b added to and removed from
+        'last_edges', and the state to compare with at the next notification.
+        '''
+        if isinstance(edges, EdgeSet):    # bitboards: the state is the integer of the bits
+            bits = edges.bits
+            last_bits = last_edges if isinstance(last_edges, int) else 0
+            added = [edge_of_id(i) for i in bits_of_mask(bits & ~last_bits)]
+            removed = [edge_of_id(i) for i in bits_of_mask(last_bits & ~bits)]
+            return added, removed, bits
+        last_edges = last_edges if isinstance(last_edges, set) else set()
+        added = [(a, b) for a, b in edges - last_edges if a < b]
+        removed = [(a, b) for a, b in last_edges - edges if a < b]
+        return added, removed, set(edges)
+
+    def write_event(self, event, edges, forbidden_edges, data=None):
+        '''Encodes an event with the changes of the configuration, and writes the buffer if it is full.'''
+        added, removed, self.last_edges = self.delta(edges, self.last_edges)
+        forbidden_added, forbidden_removed, self.last_forbidden_edges = self.delta(forbidden_edges, self.last_forbidden_edges)
+
+        if self.binary:
+            buffer = self.buffer
+            buffer += LOG_HEADER.pack(LOG_EVENTS.index(event), len(added), len(removed), len(forbidden_added), len(forbidden_removed))
+            numbers = flatten_edges(added) + flatten_edges(removed) + flatten_edges(forbidden_added) + flatten_edges(forbidden_removed)
+            buffer += struct.pack('<%db' % len(numbers), *numbers)
+            if event == 'start':
+                name, tot, is_uv_constraint = data
+                encoded_name = name.encode()
+                buffer += struct.pack('<H', len(encoded_name)) + encoded_name + struct.pack('<IB', tot, is_uv_constraint)
+            elif event == 'end':
+                encoded_name = data.encode()
+                buffer += struct.pack('<H', len(encoded_name)) + encoded_name
+            elif event in ['shortcut', 'unique_path', 'impossible_to_join']:
+                numbers = [int(x) for point in data for x in point]
+                buffer += struct.pack('<H%db' % len(numbers), len(data), *numbers)
+            elif event == 'pattern':
+                numbers = flatten_edges(data)
+                buffer += struct.pack('<H%db' % len(numbers), len(data), *numbers)
+            elif event in ['branch', 'progress']:
+                buffer += struct.pack('<I', data)
+            elif event == 'estimate':
+                buffer += struct.pack('<II', *data)
+        else:
+            record = {'e': event}
+            for key, list_of_edges in [('a', added), ('r', removed), ('fa', forbidden_added), ('fr', forbidden_removed)]:
+                if list_of_edges:
+                    record[key] = [flatten_edges([edge]) for edge in list_of_edges]
+            if event in ['shortcut', 'unique_path', 'impossible_to_join']:
+                data = [[int(x), int(y)] for x, y in data]
+            elif event == 'pattern':
+                data = [flatten_edges([edge]) for edge in data]
+            if data is not None:
+                record['d'] = data
+            self.buffer += (json.dumps(record, separators=(',', ':')) + '\n').encode()
+
+        if len(self.buffer) >= LOG_BUFFER_SIZE:
+            self.flush()
+
+    def notify_start(self, edges, forbidden_edges, to_prove):
+        is_uv_constraint = (to_prove.u is not None and to_prove.v is not None)
+        self.write_event('start', edges, forbidden_edges, (to_prove.name, to_prove.tot, is_uv_constraint))
+
+    def notify_end(self, to_prove):
+        self.write_event('end', self.last_edges_view(), self.last_forbidden_edges_view(), to_prove.name)
+
+    def notify_finished(self):
+        self.write_event('finished', self.last_edges_view(), self.last_forbidden_edges_view())
+        self.flush()
+
+    def notify_shortcut(self, edges, forbidden_edges, shortcut):
+        self.write_event('shortcut', edges, forbidden_edges, shortcut)
+
+    def notify_pattern(self, edges, forbidden_edges, pattern):
+        self.write_event('pattern', edges, forbidden_edges, pattern)
+
+    def notify_unique_path(self, edges, forbidden_edges, unique_path):
+        self.write_event('unique_path', edges, forbidden_edges, unique_path)
+
+    def notify_impossible_to_join(self, edges, forbidden_edges, p, q):
+        self.write_event('impossible_to_join', edges, forbidden_edges, (p, q))
+
+    def notify_branch(self, edges, forbidden_edges, tot):
+        self.write_event('branch', edges, forbidden_edges, tot)
+
+    def notify_progress(self, tot):
+        self.write_event('progress', self.last_edges_view(), self.last_forbidden_edges_view(), tot)
+
+    def notify_estimate(self, tot, estimated_total):
+        self.write_event('estimate', self.last_edges_view(), self.last_forbidden_edges_view(), (tot, estimated_total))
+
+    def last_edges_view(self):
+        '''Returns the configuration of the last notification (for the notifications without configuration).'''
+        return EdgeSet(self.last_edges) if isinstance(self.last_edges, int) else self.last_edges
+
+    def last_forbidden_edges_view(self):
+        return EdgeSet(self.last_forbidden_edges) if isinstance(self.last_forbidden_edges, int) else self.last_forbidden_edges
+
+
+def read_log(log_file):
+    '''
+    Yields the events of a log file written by LogInterface (in either format) as tuples
+    (event, added, removed, forbidden_added, forbidden_removed, data), where the four lists contain
+    edges (a, b) with a < b, and 'data' is:
+    - (name, tot, is_uv_constraint) for 'start', and the name of the result for 'end';
+    - the list of the points of the path for 'shortcut' and 'unique_path', and the pair (p, q) for 'impossible_to_join';
+    - the list of the edges of the pattern for 'pattern';
+    - the number of branches for 'branch' and 'progress', and None for 'finished';
+    - the pair (number of branches, estimated number of branches of the proof) for 'estimate'.
+    '''
+    with open_log(log_file, 'rb') as f:
+        content = f.read(len(LOG_MAGIC))
+        if content != LOG_MAGIC:     # JSONL
+            for line in (content + f.read()).splitlines():
+                record = json.loads(line)
+                event = record['e']
+                lists = [edges_of_numbers([x for edge in record.get(key, []) for x in edge]) for key in ['a', 'r', 'fa', 'fr']]
+                data = record.get('d')
+                if event in ['shortcut', 'unique_path', 'impossible_to_join']:
+                    data = [tuple(point) for point in data]
+                    if event == 'impossible_to_join':
+                        data = tuple(data)
+                elif event == 'pattern':
+                    data = edges_of_numbers([x for edge in data for x in edge])
+                elif event in ['start', 'estimate']:
+                    data = tuple(data)
+                yield tuple([event] + lists + [data])
+            return
+        yield from decode_events(f.read())
+
+
+def decode_events(content):
+    '''Yields the events encoded in 'content' in the binary format (without LOG_MAGIC), as 'read_log'.'''
+    position = 0
+
+    def unpack(fmt):
+        nonlocal position
+        values = struct.unpack_from(fmt, content, position)
+        position += struct.calcsize(fmt)
+        return values
+
+    while position < len(content):
+        code, *counts = unpack(LOG_HEADER.format)
+        event = LOG_EVENTS[code]
+        lists = [edges_of_numbers(unpack('<%db' % (4*count))) for count in counts]
+        data = None
+        if event in ['start', 'end']:
+            length, = unpack('<H')
+            name = content[position:position+length].decode()
+            position += length
+            if event == 'start':
+                tot, is_uv_constraint = unpack('<IB')
+                data = (name, tot, bool(is_uv_constraint))
+            else:
+                data = name
+        elif event in ['shortcut', 'unique_path', 'impossible_to_join']:
+            length, = unpack('<H')
+            data = points_of_numbers(unpack('<%db' % (2*length)))
+            if event == 'impossible_to_join':
+                data = tuple(data)
+        elif event == 'pattern':
+            length, = unpack('<H')
+            data = edges_of_numbers(unpack('<%db' % (4*length)))
+        elif event in ['branch', 'progress']:
+            data, = unpack('<I')
+        elif event == 'estimate':
+            data = unpack('<II')
+        yield tuple([event] + lists + [data])
+
+
+# -----------------------------------------------------------------------------------------------------------------
+# PROOF IN ANOTHER PROCESS
+#
+# With the option --gui-process of launch.py, the proof runs in a child process with a QueueInterface, and the main
+# process only displays it (see GUIInterface.follow). The events are encoded as in the binary logs and sent by blocks
+# through a multiprocessing queue, so the proof never waits for the drawing of the figure: the GUI draws at a fixed
+# frame rate and skips the intermediate events. The pause of the GUI is sent back with a multiprocessing event,
+# which the proof waits for between two blocks.
+
+QUEUE_SIZE = 64     # maximal number of blocks waiting in the queue, after which the proof waits for the GUI
+
+
+class QueueInterface(LogInterface):
+    '''
+    Interface which sends the notifications to a GUIInterface in another process: the events are encoded as in the
+    binary format of LogInterface, and the buffer is put in 'queue' every 'flush_interval' seconds. While the
+    event 'running' is cleared (the GUI is paused), the proof is stopped at the next block.
+    '''
+
+    def __init__(self, queue, running, flush_interval):
+        self.queue = queue
+        self.running = running
+        self.flush_interval = flush_interval
+        self.next_flush = time.monotonic() + flush_interval
+        self.binary = True
+        self.buffer = bytearray()
+        self.last_edges = set()
+        self.last_forbidden_edges = set()
+
+    def close(self):
+        '''Sends the last block and the end of the stream (None).'''
+        self.flush()
+        self.queue.put(None)
+
+    def flush(self):
+        if self.buffer:
+            self.queue.put(bytes(self.buffer))     # blocks if the GUI is too far behind (the queue is bounded)
+            self.buffer = bytearray()
+        self.running.wait()
+        self.next_flush = time.monotonic() + self.flush_interval
+
+    def write_event(self, event, edges, forbidden_edges, data=None):
+        super().write_event(event, edges, forbidden_edges, data)
+        if time.monotonic() >= self.next_flush:
+            self.flush()
@@ -1,14 +1,67 @@
 """A NOTE ON OPTIMAL DEGREE-THREE SPANNERS OF THE SQUARE LATTICE
 
 Usage:
-    launch.py prove (h1 | h2 | p1 | p2 | p3 | p4) (--text | --gui)
-    launch.py prove all (--text | --gui)
+    launch.py prove (h1 | h2 | p1 | p2 | p3 | p4) (--text | --gui | --gui-process | --log=<file>) [--log-format=<format>] [--frame-rate=<f>] [--processes=<n>] [--split-depth=<d>] [--check-catalog] [--bitboard] [--cache-size=<n>] [--transpositions] [--branching=<order>] [--propagate] [--nogoods=<n>] [--stats=<format>] [--estimate-interval=<n>] [--result-cache=<dir>] [--force] [--checkpoint=<file>] [--checkpoint-interval=<s>] [--resume=<file>] [--certificate=<file>]
+    launch.py prove all (--text | --gui | --gui-process | --log=<file>) [--log-format=<format>] [--frame-rate=<f>] [--processes=<n>] [--split-depth=<d>] [--check-catalog] [--bitboard] [--cache-size=<n>] [--transpositions] [--branching=<order>] [--propagate] [--nogoods=<n>] [--stats=<format>] [--estimate-interval=<n>] [--result-cache=<dir>] [--force]
+    launch.py prove all --concurrent
+    launch.py compare-branching
+    launch.py optimise-order (h1 | h2 | p1 | p2 | p3 | p4) [--processes=<n>] [--rounds=<r>] [--output=<file>]
+    launch.py check-certificate (h1 | h2 | p1 | p2 | p3 | p4) <file>
+    launch.py estimate (h1 | h2 | p1 | p2 | p3 | p4) [--probes=<n>] [--seed=<s>] [--bitboard] [--branching=<order>] [--propagate]
     launch.py (-h | --help)
 
 Options:
-    -h --help       Show this screen.
-    --text          Use the text-based interface.
-    --gui           Use the graphical interface.
+    -h --help               Show this screen.
+    --text                  Use the text-based interface.
+    --gui                   Use the graphical interface.
+    --gui-process           Use the graphical interface, with the proof in another process: the figure is drawn at a
+                            fixed frame rate and only shows the last event of each frame.
+    --log=<file>            Write all the events of the proof in a log file, without output (compressed if the name
+                            of the file ends with .gz, .bz2 or .xz).
+    --log-format=<format>   Format of the log file: 'jsonl' (one JSON object per line) or 'binary' [default: jsonl].
+    --frame-rate=<f>        Number of frames per second drawn by --gui-process [default: 30].
+    --processes=<n>         Number of processes used to explore the search tree. The counters are the same as with one
+                            process, except with --transpositions and --nogoods, whose table and store are not shared
+                            by the processes: the proof has more branches, and their number can change from one run
+                            to the next [default: 1].
+    --split-depth=<d>       Number of branching choices after which the subtrees are explored in parallel [default: 3].
+    --check-catalog         Compare the answers of the catalog of short paths with a depth-first search.
+    --bitboard              Store the configurations in bitboards instead of sets.
+    --cache-size=<n>        Number of answers of the path searches kept in cache (0 disables the cache) [default: 0].
+    --transpositions        Do not explore again the configurations (up to symmetry) which were already refuted.
+    --branching=<order>     Order of the pairs on which the search branches: 'static' (the lists of launch.py)
+                            or 'dynamic' (the pair with the fewest possible paths first) [default: static].
+    --propagate             Add all the unique paths found by a node before branching (as a unit propagation).
+    --nogoods=<n>           Number of nogoods learned from the explored branchings kept in memory (0 disables the learning) [default: 0].
+    --stats=<format>        Profile the proofs and print the time spent in each phase, with the histograms of the sizes
+                            of the searches of shortcuts and of the depths of the nodes: 'text' or 'json' (one line per proof).
+    --estimate-interval=<n> Number of branches between two estimates of the number of branches of the proof, sent to
+                            the interface with the remaining time (0 disables the estimates) [default: 64].
+    --result-cache=<dir>    Keep the results in a cache in this directory: a proof whose result, options and programs
+                            did not change since it was stored is not done again (see result_cache.py). The cache is
+                            only used with --text, and not with --stats, --checkpoint, --resume and --certificate,
+                            which show, record or measure the proof.
+    --force                 Do the proofs even if they are in the cache of the results (and store them again).
+    --checkpoint=<file>     Write a checkpoint of the exploration in this file at regular intervals (with one process).
+    --checkpoint-interval=<s>   Number of seconds between two checkpoints [default: 5].
+    --resume=<file>         Resume the proof from a checkpoint file (and keep writing checkpoints in it).
+    --certificate=<file>    Write the certificate of the proof in this file (compressed if its name ends with .gz).
+    --concurrent            Prove the six results at the same time in separate processes (without interface).
+
+    --rounds=<r>            Number of rounds of local search of optimise-order [default: 10].
+    --output=<file>         File where optimise-order writes the best order (by default order_<name>.json).
+    --probes=<n>            Number of random probes of the command estimate [default: 200].
+    --seed=<s>              Seed of the random probes of the command estimate [default: 0].
+
+Commands:
+    compare-branching       Prove the six results (without interface) with the static and the dynamic branching orders,
+                            and print the number of branches of each proof.
+    optimise-order          Search an order of the pairs on which the search branches (the list 'edges_to_consider')
+                            which gives fewer branches than the list of launch.py (see ordering.py), and write it
+                            in a JSON file with its number of branches.
+    check-certificate       Check the certificate of a proof written with --certificate, without any search.
+    estimate                Estimate the number of branches of a proof without doing it, by random probes from the
+                            root to a leaf of the search tree (Knuth's estimator, see proof.estimate_branches).
 """
 
 from util import SquareRootNumber
@@ -32,7 +85,7 @@ None,
 "h1",
 [(0, 0), (-1, 0), (0, 1), (1, 0), (1, -1), (0, 0)],
 [((1, 1), (2, 1)), ((1, 1), (1, 0)), ((1, 2), (2, 2)), ((1, 2), (1, 1)), ((0, 2), (1, 2)), ((0, 2), (0, 1)), ((-1, 1), (0, 1)), ((-1, 1), (-1, 0)), ((1, -1), (2, -1)), ((1, -1), (1, -2)), ((-1, 2), (-1, 1)), ((-1, 2), (0, 2)), ((2, 0), (3, 0)), ((2, 0), (2, -1)), ((2, 1), (3, 1)), ((2, 1), (2, 0)), ((2, 2), (3, 2)), ((2, 2), (2, 1)), ((0, 3), (0, 2)), ((-1, 3), (0, 3)), ((-1, 3), (-1, 2)), ((-1, 2), (0, 2)), ((-1, 2), (-1, 1))],
-1467,
+1350,
 [])
 
 
@@ -43,7 +96,7 @@ None,
 "h2",
 [(0, 2), (-1, 2), (-1, 1), (-1, 0), (0, 0), (1, 0), (0, 1), (1, 1), (0, 2), (1, 2)],
 [((0, 0), (0, -1)), ((-1, 0), (-1, -1)), ((-1, 0), (-2, 0)), ((-1, 1), (-2, 1)), ((-2, 2), (-1, 2)), ((-1, 2), (-1, 3)), ((0, 2), (0, 3)), ((-1, 1), (0, 1)), ((1, 2), (2, 2)), ((1, 1), (2, 1)), ((1, 2), (1, 1)), ((2, 2), (3, 2)), ((2, 2), (2, 1)), ((1, 1), (1, 0)), ((2, 1), (3, 1)), ((2, 1), (2, 0)), ((1, 0), (2, 0)), ((1, 0), (1, -1)), ((2, 0), (3, 0)), ((2, 0), (2, -1)), ((0, 0), (1, 0)), ((0, 0), (0, -1)), ((1, -1), (2, -1)), ((0, -1), (1, -1)), ((-1, 0), (0, 0)), ((-1, 0), (-1, -1)), ((-1, -1), (0, -1)), ((-2, 0), (-1, 0)), ((-2, 0), (-2, -1)), ((-2, -1), (-1, -1)), ((-2, 1), (-1, 1)), ((-2, 1), (-2, 0)), ((-1, 1), (0, 1)), ((-1, 1), (-1, 0)), ((-2, 2), (-1, 2)), ((-2, 2), (-2, 1))],
-922,
+952,
 [lemma1])
 
 
@@ -79,7 +132,7 @@ SquareRootNumber(1, 3),
 "p3",
 [(0, 0), (-1, 1), (0, 2), (1, 3), (1, 2)],
 three_first_paths_edges_to_consider,
-15,
+18,
 [lemma1, lemma2])
 
 
@@ -90,37 +143,226 @@ SquareRootNumber(5, 0),
 "p4",
 [(0, 0), (1, 0), (2, 0), (2, 1), (2, 2), (1, 2)],
 [((2, 1), (3, 1)), ((2, 1), (2, 0)), ((2, 0), (3, 0)), ((2, 0), (2, -1)), ((1, 1), (2, 1)), ((1, 1), (1, 0)), ((1, 0), (2, 0)), ((1, 0), (1, -1)), ((0, 0), (1, 0)), ((0, 0), (0, -1)), ((0, 1), (1, 1)), ((0, 1), (0, 0)), ((0, 2), (1, 2)), ((0, 2), (0, 1)), ((1, 2), (2, 2)), ((1, 2), (1, 1)), ((2, 2), (3, 2)), ((2, 2), (2, 1)), ((3, 2), (4, 2)), ((3, 2), (3, 1)), ((3, 1), (4, 1)), ((3, 1), (3, 0)), ((3, 0), (4, 0)), ((3, 0), (3, -1)), ((3, -1), (4, -1)), ((3, -1), (3, -2)), ((2, -1), (3, -1)), ((2, -1), (2, -2)), ((1, -1), (2, -1)), ((1, -1), (1, -2)), ((0, -1), (1, -1)), ((0, -1), (0, -2)), ((1, -2), (2, -2)), ((1, -2), (1, -3)), ((2, -2), (3, -2)), ((2, -2), (2, -3)), ((3, -2), (4, -2)), ((3, -2), (3, -3)), ((4, -1), (5, -1)), ((4, -1), (4, -2)), ((4, 0), (5, 0)), ((4, 0), (4, -1)), ((4, 1), (5, 1)), ((4, 1), (4, 0)), ((4, 2), (5, 2)), ((4, 2), (4, 1)), ((3, 3), (4, 3)), ((3, 3), (3, 2)), ((4, 3), (5, 3)), ((4, 3), (4, 2)), ((5, 3), (6, 3)), ((5, 3), (5, 2)), ((5, 2), (6, 2)), ((5, 2), (5, 1)), ((5, 1), (6, 1)), ((5, 1), (5, 0)), ((2, 3), (3, 3)), ((2, 3), (2, 2)), ((1, 3), (2, 3)), ((1, 3), (1, 2)), ((0, 3), (1, 3)), ((0, 3), (0, 2)), ((-1, 2), (0, 2)), ((-1, 2), (-1, 1)), ((-1, 1), (0, 1)), ((-1, 1), (-1, 0)), ((-1, 0), (0, 0)), ((-1, 0), (-1, -1)), ((2, 4), (3, 4)), ((2, 4), (2, 3)), ((-2, 1), (-1, 1)), ((-2, 1), (-2, 0)), ((1, 4), (2, 4)), ((1, 4), (1, 3)), ((2, -3), (3, -3)), ((2, -3), (2, -4)), ((2, 5), (3, 5)), ((2, 5), (2, 4)), ((3, 4), (4, 4)), ((3, 4), (3, 3)), ((5, 0), (6, 0)), ((5, 0), (5, -1)), ((6, 1), (7, 1)), ((6, 1), (6, 0)), ((-3, 1), (-2, 1)), ((-3, 1), (-3, 0)), ((-2, 0), (-1, 0)), ((-2, 0), (-2, -1)), ((-2, 2), (-1, 2)), ((-2, 2), (-2, 1)), ((-1, -1), (0, -1)), ((-1, -1), (-1, -2)), ((-1, 3), (0, 3)), ((-1, 3), (-1, 2)), ((0, -2), (1, -2)), ((0, -2), (0, -3)), ((0, 4), (1, 4)), ((0, 4), (0, 3)), ((1, -3), (2, -3)), ((1, -3), (1, -4)), ((1, 5), (2, 5)), ((1, 5), (1, 4)), ((2, -4), (3, -4)), ((2, -4), (2, -5)), ((2, 6), (3, 6)), ((2, 6), (2, 5)), ((3, -3), (4, -3)), ((3, -3), (3, -4)), ((3, 5), (4, 5)), ((3, 5), (3, 4)), ((4, -2), (5, -2)), ((4, -2), (4, -3)), ((4, 4), (5, 4)), ((4, 4), (4, 3)), ((5, -1), (6, -1)), ((5, -1), (5, -2)), ((6, 0), (7, 0)), ((6, 0), (6, -1)), ((6, 2), (7, 2)), ((6, 2), (6, 1)), ((7, 1), (8, 1)), ((7, 1), (7, 0))],
-6155,
+6184,
 [lemma1, lemma2])
 
 
 import sys
+import json
+import time
+import multiprocessing
 from docopt import docopt
 
 import proof
 import interface
+import ordering
+import certificate
+import result_cache
+
+to_prove_dictionary = {
+    'h1' : lemma1,
+    'h2' : lemma2,
+    'p1' : path1,
+    'p2' : path2,
+    'p3' : path3,
+    'p4' : path4
+}
+
+
+def prove_silently(to_prove_name, **options):
+    '''Proves a result without interface, and returns its name, its counters and the time spent.'''
+    start = time.time()
+    counters = proof.prove(to_prove_dictionary[to_prove_name], interface.SilentInterface(), **options)
+    return to_prove_name, counters, time.time() - start
+
+
+def print_profile(to_prove_name, profile):
+    '''Prints the statistics of a proof recorded with the option 'profile' of proof.prove (see proof.Profile).'''
+    print('Profile of the proof of %s (%.2fs):' % (to_prove_name, profile.total_time))
+    print('    %-32s %10s %10s %8s %10s' % ('Phase', 'Calls', 'Time', 'Share', 'Per call'))
+    for phase in proof.PROFILED_PHASES:
+        calls, phase_time = profile.calls[phase], profile.times[phase]
+        print('    %-32s %10d %9.3fs %7.1f%% %8.2fus' % (phase, calls, phase_time, 100*phase_time / max(profile.total_time, 1e-9),
+                                                    1e6*phase_time / calls if calls else 0))
+    buckets = {}    # the sizes of the searches are grouped by powers of 2
+    for nb_nodes, count in profile.shortcut_nodes.items():
+        low = 1 << (nb_nodes.bit_length() - 1)
+        buckets[low] = buckets.get(low, 0) + count
+    print('    Nodes visited by the searches of shortcuts:',
+          ', '.join(['%d-%d: %d' % (low, 2*low - 1, count) for low, count in sorted(buckets.items())]) or 'none')
+    print('    Nodes of the search tree by depth:', ', '.join(['%d: %d' % (depth, count) for depth, count in sorted(profile.depths.items())]))
+
+
+def cached_result(to_prove_name, cache_directory, key):
+    '''
+    Returns the counters of the proof of 'to_prove_name' stored in the cache of the results with the key 'key',
+    or None if the proof has to be done (the entry is missing or not valid).
+    '''
+    try:
+        entry = result_cache.load_result(cache_directory, key, to_prove_dictionary[to_prove_name])
+    except result_cache.ResultCacheError as error:
+        print('The entry of', to_prove_name, 'in the cache of the results is ignored:', error)
+        return None
+    if entry is None:
+        return None
+    print('The proof of', to_prove_name, 'is in the cache of the results', '(%d branches, proved in %.1fs on %s):'
+          % (entry['counters']['branches'], entry['time'], entry['date']), 'it is not done again (use --force to do it)')
+    return entry['counters']
+
+
+def prove_and_report(to_prove_names, interface, *prove_arguments, stats_format=None, cache_directory=None, force=False, **options):
+    '''
+    Proves the results 'to_prove_names' with 'interface' and the arguments of proof.prove,
+    and prints the counters of the options which are used (and the profile in 'stats_format', if it is not None).
+
+    If 'cache_directory' is not None, the proofs which are in this cache of the results (see result_cache.py) are not
+    done again, unless 'force' is True, and the proofs which are done are stored in the cache.
+    '''
+    nb_processes, depth_of_split = prove_arguments[:2]
+    for to_prove_name in to_prove_names:
+        to_prove = to_prove_dictionary[to_prove_name]
+        counters = None
+        if cache_directory is not None:
+            key = result_cache.result_key(to_prove, options, nb_processes, depth_of_split)
+            if not force:
+                counters = cached_result(to_prove_name, cache_directory, key)
+        if counters is None:
+            start = time.time()
+            counters = proof.prove(to_prove, interface, *prove_arguments, profile=(stats_format is not None), **options)
+            if cache_directory is not None:
+                result_cache.store_result(cache_directory, key, to_prove, counters, time.time() - start)
+        if options['check_catalog']:
+            print('Catalog of short paths:', counters['catalog_checks'], 'answers checked,', counters['catalog_disagreements'], 'disagreements')
+        if options['cache_size'] > 0:
+            print('Cache of the path searches:', counters['cache_hits'], 'hits,', counters['cache_misses'], 'misses,', counters['cache_evictions'], 'evictions')
+        if options['transpositions']:
+            print('Transposition table:', counters['transpositions'], 'nodes pruned')
+        if options['propagation']:
+            print('Propagation:', counters['unique_paths'], 'deductions absorbed by', counters['branches'], 'branch nodes',
+                  '(%.2f per branch node)' % (counters['unique_paths'] / counters['branches']))
+        if options['nogood_store_size'] > 0:
+            print('Learned nogoods:', counters['nogoods_learned'], 'learned,', counters['nogood_hits'], 'nodes refuted,', counters['nogood_evictions'], 'evictions')
+        if stats_format == 'json':
+            print(json.dumps({'result': to_prove_name, 'counters': counters}, default=proof.Profile.as_dict))
+        elif stats_format is not None:
+            print_profile(to_prove_name, counters['profile'])
 
-if __name__ == '__main__':
-    to_prove_dictionary = {
-        'h1' : lemma1,
-        'h2' : lemma2,
-        'p1' : path1,
-        'p2' : path2,
-        'p3' : path3,
-        'p4' : path4
-    }
 
+def prove_in_process(to_prove_names, queue, running, frame_rate, prove_arguments, options, stats_format):
+    '''Runs 'prove_and_report' in the child process of --gui-process, with a QueueInterface (see interface.py).'''
+    queue_interface = interface.QueueInterface(queue, running, 1 / frame_rate)
+    prove_and_report(to_prove_names, queue_interface, *prove_arguments, stats_format=stats_format, **options)
+    queue_interface.close()
+
+
+if __name__ == '__main__':
     arguments = docopt(__doc__)
+    nb_processes = int(arguments['--processes'])
+    depth_of_split = int(arguments['--split-depth'])
+    check_catalog = arguments['--check-catalog']
+    bitboard = arguments['--bitboard']
+    cache_size = int(arguments['--cache-size'])
+    transpositions = arguments['--transpositions']
+    branching = arguments['--branching']
+    propagation = arguments['--propagate']
+    nogood_store_size = int(arguments['--nogoods'])
+    resume = arguments['--resume']
+    checkpoint_file = arguments['--checkpoint'] or resume
+    checkpoint_interval = float(arguments['--checkpoint-interval'])
+    certificate_file = arguments['--certificate']
+    stats_format = arguments['--stats']
+    estimate_interval = int(arguments['--estimate-interval'])
+    cache_directory = arguments['--result-cache']
+    force = arguments['--force']
+    # the graphical interfaces and the logs show or record the proofs, the statistics measure them, and the checkpoints
+    # and the certificates are written by them, so these proofs are always done
+    if cache_directory is not None and (not arguments['--text'] or stats_format or checkpoint_file or certificate_file):
+        print('The cache of the results is only used with --text, and without --stats, --checkpoint, --resume and --certificate')
+        cache_directory = None
+    if stats_format not in [None, 'text', 'json']:
+        raise SystemExit("The format of the statistics must be 'text' or 'json'")
     
+    if arguments['--concurrent']:
+        start = time.time()
+        with multiprocessing.Pool(len(to_prove_dictionary)) as pool:
+            for to_prove_name, counters, duration in pool.imap_unordered(prove_silently, to_prove_dictionary):
+                print('Finished the proof of', to_prove_name, 'in', '%.1fs' % duration, '-', counters['branches'], 'branches')
+        print('The six proofs are complete!', '(%.1fs in total)' % (time.time() - start))
+        sys.exit()
+
+    if arguments['compare-branching']:
+        print('%-6s %18s %18s' % ('Result', 'Static order', 'Dynamic order'))
+        for to_prove_name in to_prove_dictionary:
+            columns = []
+            for order in ['static', 'dynamic']:
+                _, counters, duration = prove_silently(to_prove_name, branching=order)
+                columns.append('%d (%.1fs)' % (counters['branches'], duration))
+            print('%-6s %18s %18s' % (to_prove_name, columns[0], columns[1]))
+        sys.exit()
+    
+    if arguments['optimise-order']:
+        to_prove_name = [name for name in to_prove_dictionary if arguments[name]][0]
+        order, branches = ordering.optimise_order(to_prove_dictionary[to_prove_name], nb_processes, int(arguments['--rounds']))
+        output = arguments['--output'] or 'order_%s.json' % to_prove_name
+        with open(output, 'w') as f:
+            json.dump({'name': to_prove_name, 'branches': branches, 'edges_to_consider': order}, f)
+        print('Best order:', branches, 'branches (written in %s)' % output)
+        sys.exit()
+
+    if arguments['check-certificate']:
+        to_prove_name = [name for name in to_prove_dictionary if arguments[name]][0]
+        start = time.time()
+        try:
+            counts = certificate.check_certificate(to_prove_dictionary[to_prove_name], arguments['<file>'])
+        except certificate.CertificateError as error:
+            print('The certificate of', to_prove_name, 'is not valid:', error)
+            sys.exit(1)
+        print('The certificate of', to_prove_name, 'is valid', '(%.1fs):' % (time.time() - start),
+              counts['B'], 'branchings,', counts['U'], 'unique paths,', counts['S'], 'shortcuts,',
+              counts['P'], 'patterns,', counts['C'], 'contradictions,', counts['N'], 'nogoods')
+        sys.exit()
+
+    if arguments['estimate']:
+        to_prove_name = [name for name in to_prove_dictionary if arguments[name]][0]
+        nb_probes = int(arguments['--probes'])
+        start = time.time()
+        mean, standard_error = proof.estimate_branches(to_prove_dictionary[to_prove_name], nb_probes, int(arguments['--seed']),
+                                                       bitboard, branching, propagation)
+        print('Estimated number of branches of the proof of %s: %.0f +- %.0f' % (to_prove_name, mean, standard_error),
+              '(%d probes, %.1fs)' % (nb_probes, time.time() - start))
+        sys.exit()
+
+    to_prove_names = [name for name in to_prove_dictionary if arguments['all'] or arguments[name]]
+    prove_arguments = (nb_processes, depth_of_split, bitboard, resume, certificate_file)
+    options = dict(check_catalog=check_catalog, cache_size=cache_size, transpositions=transpositions,
+                   branching=branching, propagation=propagation, nogood_store_size=nogood_store_size,
+                   checkpoint_file=checkpoint_file, checkpoint_interval=checkpoint_interval, estimate_interval=estimate_interval)
+
+    if arguments['--gui-process']:
+        frame_rate = float(arguments['--frame-rate'])
+        queue = multiprocessing.Queue(interface.QUEUE_SIZE)
+        running = multiprocessing.Event()
+        running.set()
+        producer = multiprocessing.Process(target=prove_in_process, args=(to_prove_names, queue, running, frame_rate, prove_arguments, options, stats_format))
+        producer.start()
+        try:
+            nb_frames, nb_dropped = interface.GUIInterface().follow(queue, running, to_prove_dictionary, frame_rate)
+        except BaseException:   # the window was closed: the proof is stopped
+            producer.terminate()
+            raise
+        producer.join()
+        print('Display:', nb_frames, 'frames drawn,', nb_dropped, 'events not drawn')
+        sys.exit()
+
     if arguments['--gui']:
         interface = interface.GUIInterface()
+    elif arguments['--log']:
+        interface = interface.LogInterface(arguments['--log'], binary=(arguments['--log-format'] == 'binary'))
     else:
         interface = interface.TextInterface()
     
-    if not arguments['all']:
-        for to_prove_name in ['h1', 'h2', 'p1', 'p2', 'p3', 'p4']:
-            if arguments[to_prove_name]:
-                proof.prove(to_prove_dictionary[to_prove_name], interface)
-    else:
-        for to_prove_name in ['h1', 'h2', 'p1', 'p2', 'p3', 'p4']:
-            proof.prove(to_prove_dictionary[to_prove_name], interface)
+    prove_and_report(to_prove_names, interface, *prove_arguments, stats_format=stats_format,
+                     cache_directory=cache_directory, force=force, **options)
+
+    if arguments['--log']:
+        interface.close()
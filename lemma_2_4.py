@@ -17,11 +17,13 @@ from queue import PriorityQueue
 
 from util import *
 
-if __name__ == '__main__':
-    arguments = docopt(__doc__)
-    
-    # Building the graph
-    nodes = [(i, j) for i in range(-10, 11) for j in range(-10, 11)]
+def build_graph(radius=10):
+    '''
+    Returns the points (i, j) with -radius <= i, j <= radius and the graph on these points (as adjacency lists
+    of pairs (neighbour, length)) where p and q are joined when 1 <= manhattan(p, q) <= 3,
+    by an edge of length (1 + sqrt(2)) * manhattan(p, q) for the neighbours and manhattan(p, q) + sqrt(2) otherwise.
+    '''
+    nodes = [(i, j) for i in range(-radius, radius+1) for j in range(-radius, radius+1)]
 
     graph = {}
     for p in nodes:
@@ -34,20 +36,37 @@ if __name__ == '__main__':
                 graph[p].append((q, SquareRootNumber(2, 1))) # (1 + sqrt(2))*sqrt(2) = 2 + sqrt(2)
             elif d == 3:
                 graph[p].append((q, SquareRootNumber(3, 1))) # 3 + sqrt(2)
+    return nodes, graph
 
-    # Dijkstra's algorithm
-    distances_from_origin = {}  # stores the graph distance between (0, 0) to all the other points
+
+def distances_from(graph, origin):
+    '''
+    Dijkstra's algorithm: returns a dictionary which maps every point of 'graph'
+    to its graph distance from 'origin'.
+    '''
+    distances = {}
     pq = PriorityQueue()
-    pq.put((SquareRootNumber(0, 0), (0, 0)))
+    pq.put((SquareRootNumber(0, 0), origin))
 
     while not pq.empty():
         cur_dist, cur_point = pq.get()
         
-        if not cur_point in distances_from_origin:    
-            distances_from_origin[cur_point] = cur_dist
+        if not cur_point in distances:    
+            distances[cur_point] = cur_dist
             for neigh, edge_length in graph[cur_point]:
-                if not neigh in distances_from_origin:
+                if not neigh in distances:
                     pq.put((cur_dist + edge_length, neigh))
+    return distances
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    
+    # Building the graph
+    nodes, graph = build_graph()
+
+    # Dijkstra's algorithm
+    distances_from_origin = distances_from(graph, (0, 0))  # stores the graph distance between (0, 0) to all the other points
 
     # Checking the shortest path property
     for (x, y) in nodes:
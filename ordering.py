@@ -0,0 +1,151 @@
+import copy
+import math
+import random
+import multiprocessing
+
+import proof
+from util import manhattan
+
+
+# -----------------------------------------------------------------------------------------------------------------
+# CANDIDATE ORDERS
+#
+# An order is a list of pairs (p, q) of neighbours of Z², used as 'edges_to_consider' by the static branching
+# of 'expand': the search branches on the first pair of the order which is not known as good.
+
+def distance_to_points(p, points):
+    '''Returns the Manhattan distance between p and the closest point of 'points'.'''
+    return min([manhattan(p, c) for c in points])
+
+
+def pairs_around(points, radius):
+    '''
+    Returns the list of the pairs (p, q) of neighbours of Z² (each pair given once, with q = p + (1, 0) or p + (0, -1))
+    whose points are at Manhattan distance at most 'radius' from 'points'.
+    '''
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    pairs = []
+    for x in range(min(xs) - radius, max(xs) + radius + 1):
+        for y in range(min(ys) - radius, max(ys) + radius + 1):
+            p = (x, y)
+            for q in [(x+1, y), (x, y-1)]:
+                if distance_to_points(p, points) <= radius and distance_to_points(q, points) <= radius:
+                    pairs.append((p, q))
+    return pairs
+
+
+def bfs_order(result_to_prove, radius=6):
+    '''
+    Returns the pairs around the initial configuration in the order of a breadth-first search from it:
+    by distance of the farthest point of the pair, then of its closest point, and then by the position
+    along the initial path of the point of the initial configuration closest to the pair.
+    '''
+    initial_points = result_to_prove.path_of_config
+
+    def key(pair):
+        p, q = pair
+        dp = distance_to_points(p, initial_points)
+        dq = distance_to_points(q, initial_points)
+        closest = min(range(len(initial_points)), key=lambda i: manhattan(p, initial_points[i]) + manhattan(q, initial_points[i]))
+        return (max(dp, dq), min(dp, dq), closest)
+
+    return sorted(pairs_around(initial_points, radius), key=key)
+
+
+def spiral_order(result_to_prove, radius=6):
+    '''
+    Returns the pairs around the initial configuration in the order of a spiral around it:
+    by distance of the farthest point of the pair, and then by angle around the centre of the initial configuration.
+    '''
+    initial_points = result_to_prove.path_of_config
+    cx = sum([x for x, _ in initial_points]) / len(initial_points)
+    cy = sum([y for _, y in initial_points]) / len(initial_points)
+
+    def key(pair):
+        p, q = pair
+        distance = max(distance_to_points(p, initial_points), distance_to_points(q, initial_points))
+        mx = (p[0] + q[0]) / 2 - cx
+        my = (p[1] + q[1]) / 2 - cy
+        return (distance, math.atan2(my, mx))
+
+    return sorted(pairs_around(initial_points, radius), key=key)
+
+
+def moved_order(order, generator, window):
+    '''
+    Returns a neighbour of 'order' for the local search: one of the 'window' first pairs is moved to an earlier position.
+    (The first pairs are the ones on which the search branches most often.)
+    '''
+    window = min(window, len(order))
+    j = generator.randrange(1, window)
+    i = generator.randrange(0, j)
+    neighbour = list(order)
+    neighbour.insert(i, neighbour.pop(j))
+    return neighbour
+
+
+# -----------------------------------------------------------------------------------------------------------------
+# SCORING
+
+def score_order(task):
+    '''
+    Given a task (result_to_prove, order, budget), proves the result without interface with 'order' as
+    'edges_to_consider', and returns the number of branches of the proof, or None if the budget of branches
+    was exceeded or if the order was not long enough to finish the proof.
+    '''
+    result_to_prove, order, budget = task
+    from interface import SilentInterface
+
+    candidate = copy.copy(result_to_prove)
+    candidate.edges_to_consider = order
+    try:
+        counters = proof.prove(candidate, SilentInterface(), max_branches=budget)
+    except proof.BudgetExceeded:
+        return None
+    except ValueError:  # the order was not long enough
+        return None
+    return counters['branches']
+
+
+# -----------------------------------------------------------------------------------------------------------------
+# OPTIMISATION
+
+def optimise_order(result_to_prove, nb_processes=1, nb_rounds=10, nb_neighbours=8, radius=6, window=40, seed=0):
+    '''
+    Searches an order of the pairs for the static branching of 'expand' which minimises the number of branches
+    of the proof of 'result_to_prove'. Returns the best order found and its number of branches.
+
+    The candidates are the order of 'result_to_prove' (its 'edges_to_consider'), the breadth-first order and the
+    spiral order around the initial configuration. The best candidate is then improved by a local search:
+    at each of the 'nb_rounds' rounds, 'nb_neighbours' orders obtained by moving one pair (see 'moved_order')
+    are scored, and the best one replaces the current order if it has fewer branches.
+
+    The orders are scored by proofs without interface in a pool of 'nb_processes' processes. Every proof has
+    a budget of branches (the number of branches of the best order so far), so that bad orders are stopped early.
+    '''
+    generator = random.Random(seed)
+
+    with multiprocessing.Pool(nb_processes) as pool:
+        best_order = list(result_to_prove.edges_to_consider)
+        best_branches = score_order((result_to_prove, best_order, math.inf))
+        print('Order of launch.py:', best_branches, 'branches')
+
+        candidates = [('breadth-first order', bfs_order(result_to_prove, radius)),
+                      ('spiral order', spiral_order(result_to_prove, radius))]
+        scores = pool.map(score_order, [(result_to_prove, order, best_branches) for _, order in candidates])
+        for (name, order), branches in zip(candidates, scores):
+            print(name[0].upper() + name[1:] + ':', 'more than %d branches' % best_branches if branches is None else '%d branches' % branches)
+            if branches is not None and branches < best_branches:
+                best_order, best_branches = order, branches
+
+        for i in range(nb_rounds):
+            neighbours = [moved_order(best_order, generator, window) for _ in range(nb_neighbours)]
+            scores = pool.map(score_order, [(result_to_prove, order, best_branches - 1) for order in neighbours])
+            improvements = [(branches, k) for k, branches in enumerate(scores) if branches is not None]
+            if improvements:
+                best_branches, k = min(improvements)
+                best_order = neighbours[k]
+            print('Round %d/%d:' % (i+1, nb_rounds), best_branches, 'branches')
+
+    return best_order, best_branches
@@ -1,451 +1,2342 @@
+import os
 import math
 import copy
+import gzip
+import json
+import time
+import random
+import itertools
+import multiprocessing
+from collections import OrderedDict
 import numpy as np
 from numpy.linalg import matrix_power
 
 from util import *  # file with SquareRootNumber class, helper functions and data
+from bitboard import *  # file with the encoding of points and edges used by BitboardProver
 
 
 # -----------------------------------------------------------------------------------------------------------------
 # GLOBAL VARIABLES
 
-DIL = SquareRootNumber(1, 1)
+# The 8 directions, with their norm and their norm multiplied by DIL (used in 'find_shortcut')
+dilated_directions = [(d, norm, norm*DIL) for d, norm in directions]
+
+# The vectors (dx, dy) with 1 <= |dx| + |dy| <= 3 and |dx|, |dy| <= 2 (that is 1 <= |pq| <= sqrt(5)),
+# in the order in which the pairs (p, q) are examined in 'expand'
+PAIR_OFFSETS = [(dx, dy) for dx in [-2, -1, 0, 1, 2] for dy in [-2, -1, 0, 1, 2] if abs(dx) + abs(dy) in [1, 2, 3]]
+
+# The kinds of the records of the trail of a prover (see 'Prover.backtrack')
+EDGE_RECORD, FORBIDDEN_RECORD, POINT_RECORD, SATISFACTION_RECORD = range(4)
+
+# The 4 vectors (dx, dy) with |dx| + |dy| = 1 (the pairs on which 'expand' can branch, see 'the_five_short_paths')
+UNIT_DIRECTIONS = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+
+# The vectors of the balls of radius 2 and 3 for the Manhattan distance (see 'is_close_to')
+MANHATTAN_BALL_2 = [(dx, dy) for dx in range(-2, 3) for dy in range(-2, 3) if abs(dx) + abs(dy) <= 2]
+MANHATTAN_BALL_3 = [(dx, dy) for dx in range(-3, 4) for dy in range(-3, 4) if abs(dx) + abs(dy) <= 3]
 
 
 # -----------------------------------------------------------------------------------------------------------------
-# TRAVERSAL
+# PATTERNS
 
-def can_add_path(path):
+def initialize_patterns(initial_list_of_patterns):
     '''
-    Given a path, returns True iff
-    1) no edge of the path is a forbidden edge
-    2) every vertex has degree at most 3 after adding the edges from this path to the already existing edges
+    Given a list of patterns (each one being a list of edges),
+    returns the list of edges corresponding to the images of those patterns under rotations and symmetries.
     '''
+    list_of_patterns = []
 
-    degree_increment = {}    # maps points to the increment in degree they receive
-    l = len(path)
-    for i in range(l-1):
-        a = path[i]
-        b = path[i+1]
+    # Construct 'all_transfo', a list of 8 matrices corresponding to the possible symmetries
+    rotation = np.array([np.array([0, -1]), np.array([1, 0])])
+    flip = np.array([np.array([-1, 0]), np.array([0, 1])])
+    all_transfo = [matrix_power(rotation, i) for i in range(
+        4)] + [matrix_power(rotation, i).dot(flip) for i in range(4)]
 
-        if (a, b) in forbidden_edges:
-            return False
+    for pattern in initial_list_of_patterns:
+        for mat in all_transfo:
+            transformed_pattern = []
 
-        if not (a, b) in edges:  # already existing edges are fine
-            for p in [a, b]:
-                degree_increment[p] = degree_increment.get(p, 0) + 1
-                # p will have a degree > 3 after adding the edge
-                if degree_increment[p] + deg.get(p, 0) > 3:
-                    return False
-    return True
+            for edge in pattern:
+                a, b = edge
+                new_a = tuple(mat.dot(np.array(a)))
+                new_b = tuple(mat.dot(np.array(b)))
+                transformed_pattern.append((new_a, new_b))
 
+            list_of_patterns.append(transformed_pattern)
+
+    return list_of_patterns
+
+
+# The bit of every direction in the signature of a point (the set of directions of the edges at this point)
+DIRECTION_BITS = {d: 1 << i for i, (d, _) in enumerate(directions)}
 
-def exists_good_path(p, q):
+
+def anchor_pattern(pattern):
     '''
-    Returns True iff there exists a path between p and q,
-    made only of existing edges of length at most DIL*|pq|.
+    Returns the list of the pairs (signature, anchored_pattern) for the points of 'pattern' (see 'build_pattern_index'),
+    in the order of the points used by 'detect_pattern'.
     '''
-    d_pq_squared = dist_squared(p, q)
-
-    def DFS(u, lg, previous=None):
-        '''
-        We are currently at u and we want to reach q. 
-        The variable 'lg' is the distance already traveled between p and u.
-        '''
+    anchored_patterns = []
+    points_of_pattern = set()   # the same set as in 'detect_pattern', so that the points are in the same order
+    for a, b in pattern:
+        points_of_pattern.update([a, b])
 
-        if u == q:
-            return lg**2 <= (DIL**2)*SquareRootNumber(d_pq_squared, 0)
+    ids = [int(edge_id(a, b)) for a, b in pattern]  # the coordinates of the patterns are numpy integers
+    lowest_id = min(ids)
+    mask = 0
+    for i in ids:
+        mask |= 1 << (i - lowest_id)
+
+    for anchor in points_of_pattern:
+        ax, ay = int(anchor[0]), int(anchor[1])
+        signature = 0
+        relative_edges = []
+        for (xa, ya), (xb, yb) in pattern:
+            xa, ya, xb, yb = int(xa) - ax, int(ya) - ay, int(xb) - ax, int(yb) - ay
+            relative_edges.append((xa, ya, xb, yb))
+            if (xa, ya) == (0, 0):
+                signature |= DIRECTION_BITS[(xb, yb)]
+            elif (xb, yb) == (0, 0):
+                signature |= DIRECTION_BITS[(xa, ya)]
+        offset = lowest_id - shift_of((ax, ay))
+        anchored_patterns.append((signature, (pattern, anchor, relative_edges, offset, mask)))
+    return anchored_patterns
+
+
+def build_pattern_index(list_of_patterns):
+    '''
+    Returns an index of the patterns of 'list_of_patterns' for 'pattern_created_by_recent_add':
+    a list which maps every signature s (see DIRECTION_BITS) to the list of the pairs (pattern, anchor) such that
+    the directions of the edges of the pattern at the anchor are in s. Only these pairs can match at a point of
+    signature s, so most pairs are rejected with one lookup.
+
+    The patterns which are equal to a previous pattern (up to the orientation of the edges) are discarded, since
+    the previous pattern matches first. The pairs are stored in the order in which 'detect_pattern' tries them:
+    the order of the patterns, and then the order of the points of each pattern. Every pair is given as a tuple
+    (pattern, anchor, relative_edges, offset, mask), where
+    - 'relative_edges' is the list of the edges of the pattern translated so that the anchor is (0, 0),
+      as tuples (xa, ya, xb, yb);
+    - 'offset' and 'mask' are used by BitboardProver: the pattern anchored at p is in the bitboard 'edge_bits'
+      iff (edge_bits >> (shift_of(p) + offset)) & mask == mask.
+    '''
+    anchored_patterns = []
+    known_patterns = set()
+    for pattern in list_of_patterns:
+        edges_of_pattern = frozenset([frozenset([(int(xa), int(ya)), (int(xb), int(yb))]) for (xa, ya), (xb, yb) in pattern])
+        if edges_of_pattern in known_patterns:
+            continue
+        known_patterns.add(edges_of_pattern)
 
-        # pruning using manhattan_with_diagonals which is a lower bound of the length of the path from q to u
-        if (lg + manhattan_with_diagonals(q, u))**2 > (DIL**2) * SquareRootNumber(d_pq_squared, 0):    # the dilation is too big
-            return False  # we end the exploration of the current path
+        anchored_patterns.extend(anchor_pattern(pattern))
 
-        for d, norm in directions:
-            v = translate(u, d)
-            if (v != previous) and ((u, v) in edges):   # we don't go back and use an existing edge
-                if DFS(v, lg+norm, u):
-                    return True
-                # else we continue to explore all possible paths
-        return False    # we did not find any valid end to the current path
+    return [[anchored_pattern for signature, anchored_pattern in anchored_patterns if signature & s == signature]
+            for s in range(1 << len(directions))]
 
-    return DFS(p, SquareRootNumber(0, 0))
 
+# -----------------------------------------------------------------------------------------------------------------
+# CATALOG OF SHORT PATHS
 
-def find_paths(p, q, max_nb_paths=math.inf):
+def all_short_paths(q):
     '''
-    Returns a list of paths between p and q of length at most DIL*|pq|.
-    The edges of those paths may or may not in 'edges'.
-    The paths must satisfy the conditions of the function 'can_add_path'.
-
-    The size of this list is limited to at most 'max_nb_paths' different paths.
-    The list is exhaustive unless the limit 'max_nb_paths' has been reached.
+    Returns the list of all paths (without any constraint from a configuration) from (0, 0) to q
+    of length at most DIL*|pq|, in the order in which a depth-first search following 'directions' finds them.
     '''
-    d_pq_squared = dist_squared(p, q)
+    p = (0, 0)
+    max_lg_squared = dilated_squared(dist_squared(p, q))  # (DIL*|pq|)**2
 
     paths = []
 
-    def DFS(u, lg, path):   # we are currently at u and we want to reach q
-        '''
-        We are currently at u and we want to reach q. 
-        The variable 'path' is the current path from p to u, and 'lg' is the length of this path.
-
-        Returns True if enough paths are found and we can stop the search,
-        False if more paths needs to be considered.
-        Valid paths are added to the list 'paths'.
-        '''
-
-        if u == q and (lg**2 <= (DIL**2) * SquareRootNumber(d_pq_squared, 0)) and can_add_path(path):
+    def DFS(u, lg, path):
+        if u == q and lg.square_le(max_lg_squared):
             paths.append(path)
-            return len(paths) == max_nb_paths    # True if we must stop
 
         # pruning
-        if (lg + manhattan_with_diagonals(q, u))**2 > (DIL**2) * SquareRootNumber(d_pq_squared, 0):
-            return False  # we end the exploration of the current path
+        if not (lg + manhattan_with_diagonals(q, u)).square_le(max_lg_squared):
+            return
 
         for d, norm in directions:
             v = translate(u, d)
-            # we don't go back and go through an allowed edge
-            if ((len(path) == 1) or (v != path[-2])) and not (u, v) in forbidden_edges:
-                if DFS(v, lg+norm, path+[v]):
-                    return True
-        return False
+            if (len(path) == 1) or (v != path[-2]):     # we don't go back
+                DFS(v, lg+norm, path+[v])
 
-    DFS(p, SquareRootNumber(0, 0), [p])
+    DFS(p, ZERO, [p])
     return paths
 
 
-def find_shortcut(p, q, c):
+def build_path_catalog():
+    '''
+    Returns the catalog of short paths, a dictionary which maps every vector q with 1 <= |q| <= sqrt(5)
+    to a pair (relative_edges, catalog_paths), where
+    - 'relative_edges' is the list of the edges (a, b) used by the paths from (0, 0) to q of length at most DIL*|q|,
+      given as tuples (xa, ya, xb, yb); the id of an edge is its index in this list;
+    - 'catalog_paths' is the list of those paths, given as tuples (points, edge_ids, mask)
+      where 'mask' is the bitmask of the ids of the edges of the path.
+
+    All the paths are simple (a path visiting twice the same point is too long).
     '''
-    If we can infer that there exists a path between p and q,
-    with length strictly less than c, it returns this path. Otherwise, returns None. 
+    catalog = {}
+    for dx in [-2, -1, 0, 1, 2]:
+        for dy in [-2, -1, 0, 1, 2]:
+            if abs(dx) + abs(dy) in [1, 2, 3]:
+                relative_edges = []
+                id_of_edge = {}
+                catalog_paths = []
+                for path in all_short_paths((dx, dy)):
+                    edge_ids = []
+                    for a, b in path_to_list_of_edges(path):
+                        if (a, b) not in id_of_edge:
+                            id_of_edge[(a, b)] = id_of_edge[(b, a)] = len(relative_edges)
+                            relative_edges.append(a + b)
+                        edge_ids.append(id_of_edge[(a, b)])
+                    mask = 0
+                    for i in edge_ids:
+                        mask |= 1 << i
+                    catalog_paths.append((tuple(path), tuple(edge_ids), mask))
+                catalog[(dx, dy)] = (relative_edges, catalog_paths)
+    return catalog
+
+
+PATH_CATALOG = build_path_catalog()
+
+# Maps every vector q of PATH_CATALOG to the sorted list of the points of the paths from (0, 0) to q
+CATALOG_POINTS = {q: sorted({pt for points, _, _ in catalog_paths for pt in points})
+                  for q, (_, catalog_paths) in PATH_CATALOG.items()}
+
+
+def paths_of_catalog(p, q):
+    '''Returns the paths of the catalog from p to q (as lists of points), in the order of the catalog.'''
+    px, py = p
+    return [[(px+x, py+y) for x, y in points] for points, _, _ in PATH_CATALOG[vec(p, q)][1]]
+
+
+def edges_of_path(path):
+    '''Returns the set of the edges (a, b) of 'path' (a list of points) with a < b.'''
+    return {(a, b) if a < b else (b, a) for a, b in zip(path, path[1:])}
 
 
-    The strategy is as follows: if a and b are two vertices with |ab| <= sqrt(5),
-    - if ab is in 'edges', we know that there is a segment of length |ab| between a and b;
-    - in all cases, we know that there is a path of length at most |ab|*DIL between them (*)
-      (since the geometric graph has local dilation DIL = 1+sqrt(2)).
+# -----------------------------------------------------------------------------------------------------------------
+# TRANSPOSITION TABLE
+#
+# The subtree explored by 'expand' below a node refutes the configuration 'edges' of this node: every leaf is a
+# shortcut, a pattern or a contradiction, which only depend on the edges of the leaf. Hence a node whose configuration
+# was already refuted does not need to be explored again. The same holds for the images of a refuted configuration
+# under the isometries of Z² which preserve the constraints of the result, since the patterns are closed under all
+# isometries (see 'initialize_patterns').
+#
+# Each configuration is identified by one Zobrist hash per isometry (the xor of the random keys of the images of
+# its edges), which is updated by 'add_path' and 'backtrack'. The smallest of these hashes is the key of the
+# configuration in the table, and the image of the configuration under the corresponding isometry is stored to
+# rule out collisions.
+
+# The 8 linear isometries of Z², as matrices (a, b, c, d) which map (x, y) to (a*x + b*y, c*x + d*y)
+LINEAR_ISOMETRIES = [(1, 0, 0, 1), (0, -1, 1, 0), (-1, 0, 0, -1), (0, 1, -1, 0),
+                     (-1, 0, 0, 1), (0, -1, -1, 0), (1, 0, 0, -1), (0, 1, 1, 0)]
+
+ZOBRIST_KEYS = {}   # random 64-bit key of every edge (a, b) with a < b, generated when it is first needed
+zobrist_generator = random.Random(0)
+
+
+def zobrist_key(a, b):
+    '''Returns the random key of the edge (a, b).'''
+    edge = (a, b) if a < b else (b, a)
+    key = ZOBRIST_KEYS.get(edge)
+    if key is None:
+        key = ZOBRIST_KEYS[edge] = zobrist_generator.getrandbits(64)
+    return key
+
+
+def apply_isometry(isometry, p):
+    '''Returns the image of the point p under 'isometry', given as a pair (matrix, translation).'''
+    (a, b, c, d), (tx, ty) = isometry
+    x, y = p
+    return (a*x + b*y + tx, c*x + d*y + ty)
+
+
+def symmetries_of_result(result_to_prove):
+    '''
+    Returns the list of the isometries of Z² (as pairs (matrix, translation)) which preserve the constraints of
+    'result_to_prove': they map {u, v} to itself when there is a shortcut to find between u and v,
+    and the initial configuration to itself otherwise. The identity is the first isometry of the list.
     '''
+    if result_to_prove.u is not None and result_to_prove.v is not None:
+        anchor = {frozenset([tuple(result_to_prove.u), tuple(result_to_prove.v)])}
+    else:
+        anchor = {frozenset(edge) for edge in path_to_list_of_edges(result_to_prove.path_of_config)}
+    anchor_points = set().union(*anchor)
 
-    def DFS(u, lg, prev=None):   # we are currently at u and we want to reach q, length of current path is 'lg'
-        if u == q and lg < c:
-            return [q]
+    symmetries = []
+    for matrix in LINEAR_ISOMETRIES:
+        # the translation must map the smallest image of the points of the anchor to its smallest point
+        mx, my = min(apply_isometry((matrix, (0, 0)), p) for p in anchor_points)
+        x, y = min(anchor_points)
+        isometry = (matrix, (x - mx, y - my))
+        if {frozenset([apply_isometry(isometry, a), apply_isometry(isometry, b)]) for a, b in anchor} == anchor:
+            symmetries.append(isometry)
+    return symmetries
 
-        # pruning
-        if lg + manhattan_with_diagonals(q, u) >= c:
-            return None  # we end the exploration of the current path
 
-        for d, norm in directions:
-            v = translate(u, d)
-            if (u, v) not in edges:
-                norm *= SquareRootNumber(1, 1)  # explanation above, see (*)
+# -----------------------------------------------------------------------------------------------------------------
+# PROFILING
+#
+# With the option 'profile' of Prover, the methods of PROFILED_PHASES are replaced by wrappers which measure
+# their calls (see Prover.profile_phase), and the statistics are returned by 'prove' in the counter 'profile'.
+# The time of a phase includes the time of the phases it calls (for instance 'add_path' in 'propagate').
+# Without the option, the methods are not replaced, so the profiling costs nothing.
+
+# The phases measured by the profiling: the methods of Prover and the notifications sent to the interface
+PROFILED_PHASES = ['find_shortcut', 'pattern_created_by_recent_add', 'candidate_pairs', 'exists_good_path',
+                   'find_paths', 'add_path', 'backtrack', 'notifications']
+
+
+class Profile:
+    '''
+    Statistics of an exploration: 'times' and 'calls' map every phase of PROFILED_PHASES to the time spent in it
+    (in seconds) and to its number of calls, 'shortcut_nodes' maps every number of nodes visited by the depth-first
+    search of 'find_shortcut' to the number of searches which visited this number of nodes, and 'depths' maps every
+    depth to the number of nodes of the search tree at this depth (the root has depth 0). 'total_time' is the
+    time of the whole proof.
+
+    The statistics of the worker processes are added with +=, as the other counters (so with several processes,
+    the sum of the times of the phases can exceed 'total_time').
+    '''
+
+    def __init__(self):
+        self.times = dict.fromkeys(PROFILED_PHASES, 0.0)
+        self.calls = dict.fromkeys(PROFILED_PHASES, 0)
+        self.shortcut_nodes = {}
+        self.depths = {}
+        self.total_time = 0.0
+
+    def clear(self):
+        '''Resets the statistics (in place, as the wrappers of the phases keep references to the dictionaries).'''
+        for phase in PROFILED_PHASES:
+            self.times[phase] = 0.0
+            self.calls[phase] = 0
+        self.shortcut_nodes.clear()
+        self.depths.clear()
+        self.total_time = 0.0
+
+    def __iadd__(self, other):
+        for phase in PROFILED_PHASES:
+            self.times[phase] += other.times[phase]
+            self.calls[phase] += other.calls[phase]
+        for histogram, other_histogram in [(self.shortcut_nodes, other.shortcut_nodes), (self.depths, other.depths)]:
+            for value, count in other_histogram.items():
+                histogram[value] = histogram.get(value, 0) + count
+        self.total_time += other.total_time
+        return self
+
+    def as_dict(self):
+        '''Returns the statistics as a dictionary which can be written in JSON (the keys of the histograms are strings).'''
+        return {'total_time': self.total_time, 'times': dict(self.times), 'calls': dict(self.calls),
+                'shortcut_nodes': {str(value): count for value, count in sorted(self.shortcut_nodes.items())},
+                'depths': {str(depth): count for depth, count in sorted(self.depths.items())}}
+
+    def load(self, dictionary):
+        '''Inverse of 'as_dict' (in place, see 'clear').'''
+        self.clear()
+        self.times.update(dictionary['times'])
+        self.calls.update(dictionary['calls'])
+        self.shortcut_nodes.update({int(value): count for value, count in dictionary['shortcut_nodes'].items()})
+        self.depths.update({int(depth): count for depth, count in dictionary['depths'].items()})
+        self.total_time = dictionary['total_time']
+
+
+class ProfiledInterface:
+    '''Forwards the notifications to 'interface', and adds their calls to the phase 'notifications' of 'profile'.'''
+
+    def __init__(self, interface, profile):
+        self.interface = interface
+        self.profile = profile
+
+    def __getattr__(self, name):
+        # called once per notification: the wrapper is then an attribute of the ProfiledInterface
+        notify = getattr(self.interface, name)
+        times = self.profile.times
+        calls = self.profile.calls
+        clock = time.perf_counter
+
+        def timed_notify(*args):
+            start = clock()
+            notify(*args)
+            times['notifications'] += clock() - start
+            calls['notifications'] += 1
+        setattr(self, name, timed_notify)
+        return timed_notify
 
-            if v != prev:
-                shortcut = DFS(v, lg+norm, v)
-                if shortcut is not None:
-                    return [u] + shortcut
-        return None
-    return DFS(p, SquareRootNumber(0, 0))
 
+# -----------------------------------------------------------------------------------------------------------------
+# PROVER
+
+class BudgetExceeded(Exception):
+    '''Raised by 'expand' when the number of branches exceeds the budget 'max_branches' of the prover.'''
 
-def add_path(path):
+class Prover:
     '''
-    Adds all the edges from a path given as a list of points,
-    assuming it can be added (needs to be checked earlier by can_add_path).
-    Returns:
-    - added_edges: a list of added edges (with exactly one of (a, b) and (b, a)).
-    - added_points: a list of added points.
-    - new_forbidden: a list of new forbidden edges (with exactly one of (a, b) and (b, a)).
+    State of the exploration of the proof of a result.
+
+    The main attributes are:
+    - 'edges', the current set of edges (with both (a, b) and (b, a));
+    - 'deg', which maps points to their current degree;
+    - 'points', the endpoints of the edges in 'edges';
+    - 'forbidden_edges', the set of edges which cannot be added to 'edges' anymore;
+    - 'known_satisfaction', the set of pairs (p, q) which are known to be joined by a good path;
+    - 'list_of_patterns', the patterns (from the known lemmas) which cannot appear in 'edges';
+    - 'trail', the list of the changes made to the attributes above since the root of the search tree
+      (see 'backtrack').
+
+    Two provers do not share any state, so several proofs can be explored in the same process.
+    In the methods called for every node of the search tree, the attributes are bound to local variables.
     '''
 
-    def add_edge(a, b):
+    def __init__(self, result_to_prove, communication_interface, depth_of_split=None, check_catalog=False, cache_size=0,
+                 transpositions=False, branching='static', max_branches=math.inf, propagation=False,
+                 nogood_store_size=0, checkpoint_file=None, checkpoint_interval=5, certificate=None, profile=False,
+                 estimate_interval=64):
+        '''
+        Initializes the state before the exploration of the proof of 'result_to_prove'.
+
+        If 'depth_of_split' is not None, the subtrees rooted at the branching nodes of depth 'depth_of_split'
+        (the number of branching choices made above them) are not explored by 'expand' but stored in 'subtrees'.
+
+        If 'check_catalog' is True, every answer of 'exists_good_path' and 'find_paths' (which use the catalog of short paths)
+        is compared to the answer of the depth-first search; the counters 'catalog_checks' and 'catalog_disagreements'
+        count the comparisons and the different answers.
+
+        If 'cache_size' > 0, the answers of 'exists_good_path' and 'find_paths' are stored in a cache which contains
+        at most 'cache_size' answers (the least recently used answer is evicted first); the counters 'cache_hits',
+        'cache_misses' and 'cache_evictions' describe its use.
+
+        If 'transpositions' is True, the nodes whose configuration (up to the symmetries of the result) was already
+        refuted are not explored again (see the section TRANSPOSITION TABLE); the counter 'transpositions' counts them.
+
+        The pair on which 'expand' branches is chosen in the order of 'ls_edges_to_consider' if 'branching' is 'static',
+        and by the heuristic 'fail_first_branching_pair' if 'branching' is 'dynamic'.
+
+        The exploration is stopped (with the exception BudgetExceeded) as soon as the number of branches exceeds
+        'max_branches'.
+
+        If 'propagation' is True, the paths of the case Deduction are added by the node which finds them
+        (see 'propagate') instead of one child node per path.
+
+        If 'nogood_store_size' > 0, the explanation of every branching node (a small set of edges which refutes its
+        whole subtree) is learned as a nogood when the subtree is explored, and the nodes whose configuration contains
+        a learned nogood (or one of its translates) are leaves (see the section LEARNED NOGOODS). At most
+        'nogood_store_size' nogoods are kept (the least recently used nogood is evicted first); the counters
+        'nogoods_learned', 'nogood_hits' and 'nogood_evictions' describe their use (the nodes refuted by a nogood are
+        only counted in 'nogood_hits', not in 'patterns').
+
+        If 'checkpoint_file' is not None, a checkpoint of the exploration is written in this file every
+        'checkpoint_interval' seconds (see the section CHECKPOINTS).
+
+        If 'certificate' is not None, it is a text file in which the certificate of the proof is written
+        (see the section CERTIFICATE).
+
+        If 'profile' is True, the time spent in the phases of PROFILED_PHASES, their numbers of calls and
+        the histograms of the sizes of the searches of 'find_shortcut' and of the depths of the nodes are recorded
+        in the counter 'profile' (see Profile and the section PROFILING).
+
+        Every 'estimate_interval' branches, the number of branches of the whole proof is estimated from the part of
+        the tree explored so far, and sent to the interface with 'notify_estimate' (see the section TREE SIZE
+        ESTIMATION). If 'estimate_interval' is 0, no estimate is made.
         '''
-        Adds a bidirectional edge between points a and b to 'edges'.
-        Assumes that it is possible and that the edge does not already exist.
-        Returns a list of new forbidden edges.
+        self.to_prove = result_to_prove
+        self.interface = communication_interface
+
+        self.initialize_configuration()
+        self.known_satisfaction = set()
+        self.trail = []
+
+        self.counters = {'branches': 0, 'shortcuts': 0, 'patterns': 0, 'unique_paths': 0, 'contradictions': 0}
+
+        if check_catalog:
+            self.counters.update({'catalog_checks': 0, 'catalog_disagreements': 0})
+            self.exists_good_path = self.checked_exists_good_path
+            self.find_paths = self.checked_find_paths
+
+        self.cache_size = cache_size
+        if cache_size > 0:
+            self.cache = OrderedDict()
+            self.counters.update({'cache_hits': 0, 'cache_misses': 0, 'cache_evictions': 0})
+            self.exists_good_path = self.cached_exists_good_path
+            self.find_paths = self.cached_find_paths
+
+        self.transpositions = transpositions
+        if transpositions:
+            self.symmetries = symmetries_of_result(result_to_prove)
+            self.zobrist_hashes = [0] * len(self.symmetries)
+            self.refuted_configurations = {}
+            self.counters['transpositions'] = 0
+            self.add_path = self.hashed_add_path
+            self.backtrack = self.hashed_backtrack
+
+        self.list_of_patterns = initialize_patterns([path_to_list_of_edges(lemma.path_of_config)
+                                                     for lemma in result_to_prove.known_lemmas])
+        # now list_of_patterns is the full list of forbidden patterns, taking rotations and symmetries into account
+        self.pattern_index = build_pattern_index(self.list_of_patterns)
+
+        self.nogood_store_size = nogood_store_size
+        self.explanation = None     # the explanation of the current node (see the section LEARNED NOGOODS)
+        if nogood_store_size > 0:
+            self.nogoods = OrderedDict()    # maps the key of every learned nogood to (number, edges, anchored patterns)
+            self.nogood_index = {}  # maps every signature to a dictionary {key: anchored patterns with this signature}
+            self.absolute_nogoods = {}  # maps every edge to a dictionary {key: None} of the absolute nogoods containing it
+            self.nogood_number = 0  # the number of explanations of branching nodes so far (see 'learn_nogood')
+            self.nogood_hit = None
+            self.counters.update({'nogoods_learned': 0, 'nogood_hits': 0, 'nogood_evictions': 0})
+
+        self.ls_edges_to_consider = result_to_prove.edges_to_consider
+        if branching == 'dynamic':
+            self.branching_pair = self.fail_first_branching_pair
+        elif branching != 'static':
+            raise ValueError("The branching order must be 'static' or 'dynamic'")
+
+        self.current_paths = []  # the paths added by the calls to 'expand' from the root to the current node
+        self.stack = []     # the frames of the nodes being explored (see 'expand')
+        self.checkpoint_file = checkpoint_file
+        self.checkpoint_interval = checkpoint_interval
+        self.next_checkpoint = time.monotonic() + checkpoint_interval
+        self.certificate = certificate
+        if certificate is not None and transpositions:
+            raise ValueError('The certificates are not available with the transposition table')
+        self.branch_depth = 0
+        self.split_depth = depth_of_split
+        self.max_branches = max_branches
+        self.propagation = propagation
+        self.subtrees = []
+        self.unexplored_weight = 0.0    # the share of the tree in the subtrees not explored yet (see 'estimated_fraction')
+        self.depth_offset = 0   # the depth of the root of the exploration (see 'explore_subtree')
+        self.estimate_interval = estimate_interval
+        self.next_estimate = estimate_interval if estimate_interval > 0 else math.inf
+
+        self.profile = None
+        if profile:     # the other options are set before, so that the methods they replace are measured
+            self.profile = Profile()
+            self.counters['profile'] = self.profile
+            for phase in PROFILED_PHASES[:-1]:
+                self.profile_phase(phase)
+            self.interface = ProfiledInterface(self.interface, self.profile)
+            self.enter_node = self.profiled_enter_node
+
+    def initialize_configuration(self):
+        '''Initializes 'edges', 'deg', 'points' and 'forbidden_edges' with an empty configuration.'''
+        self.edges = set()
+        self.deg = {}
+        # 'points' is a dictionary used as an ordered set: the order in which the pairs (p, q) are examined in 'expand'
+        # only depends on the paths added in the current branch, and not on the branches explored before.
+        # Every point is mapped to its rank in this order (see 'candidate_pairs').
+        self.points = {}
+
+        self.forbidden_edges = set()
+
+    # -------------------------------------------------------------------------------------------------------------
+    # TRAVERSAL
+
+    def can_add_path(self, path):
         '''
+        Given a path, returns True iff
+        1) no edge of the path is a forbidden edge
+        2) every vertex has degree at most 3 after adding the edges from this path to the already existing edges
+        '''
+        edges = self.edges
+        forbidden_edges = self.forbidden_edges
+        deg = self.deg
+
+        degree_increment = {}    # maps points to the increment in degree they receive
+        l = len(path)
+        for i in range(l-1):
+            a = path[i]
+            b = path[i+1]
+
+            if (a, b) in forbidden_edges:
+                return False
+
+            if not (a, b) in edges:  # already existing edges are fine
+                for p in [a, b]:
+                    degree_increment[p] = degree_increment.get(p, 0) + 1
+                    # p will have a degree > 3 after adding the edge
+                    if degree_increment[p] + deg.get(p, 0) > 3:
+                        return False
+        return True
+
+    def exists_good_path(self, p, q):
+        '''
+        Returns True iff there exists a path between p and q,
+        made only of existing edges of length at most DIL*|pq|.
 
-        for p in [a, b]:
-            deg[p] = deg.get(p, 0) + 1
+        The paths are taken from the catalog of short paths (see 'build_path_catalog').
+        '''
+        edges = self.edges
+        px, py = p
+        relative_edges, catalog_paths = PATH_CATALOG[vec(p, q)]
+
+        existing = 0    # bitmask of the ids of the edges (translated to p) which are in 'edges'
+        bit = 1
+        for xa, ya, xb, yb in relative_edges:
+            if ((px+xa, py+ya), (px+xb, py+yb)) in edges:
+                existing |= bit
+            bit <<= 1
+
+        for _, _, mask in catalog_paths:
+            if mask & existing == mask:
+                return True
+        return False
 
-        edges.update([(a, b), (b, a)])
+    def find_paths(self, p, q, max_nb_paths=math.inf):
+        '''
+        Returns a list of paths between p and q of length at most DIL*|pq|.
+        The edges of those paths may or may not in 'edges'.
+        The paths must satisfy the conditions of the method 'can_add_path'.
 
-        new_forbidden = []
+        The size of this list is limited to at most 'max_nb_paths' different paths.
+        The list is exhaustive unless the limit 'max_nb_paths' has been reached.
 
-        if manhattan(a, b) == 2:  # (a, b) is a diagonal edge -> the crossing diagonal becomes forbidden
-            dx, dy = vec(a, b)
-            c = translate(a, (dx, 0))
-            # (c, d) is the diagonal that crosses (a, b)
-            d = translate(a, (0, dy))
-            if ((c, d) not in edges) and ((c, d) not in forbidden_edges):
-                forbidden_edges.update([(c, d), (d, c)])
-                new_forbidden.extend([(c, d), (d, c)])
+        The paths are taken from the catalog of short paths (see 'build_path_catalog'),
+        in the same order as in 'find_paths_dfs'.
+        '''
+        forbidden_edges = self.forbidden_edges
+        can_add_path = self.can_add_path
+        px, py = p
+        relative_edges, catalog_paths = PATH_CATALOG[vec(p, q)]
+
+        forbidden = 0   # bitmask of the ids of the edges (translated to p) which are in 'forbidden_edges'
+        bit = 1
+        for xa, ya, xb, yb in relative_edges:
+            if ((px+xa, py+ya), (px+xb, py+yb)) in forbidden_edges:
+                forbidden |= bit
+            bit <<= 1
+
+        paths = []
+        for points, _, mask in catalog_paths:
+            if mask & forbidden == 0:
+                path = [(px+x, py+y) for x, y in points]
+                if can_add_path(path):
+                    paths.append(path)
+                    if len(paths) == max_nb_paths:
+                        break
+        return paths
+
+    def checked_exists_good_path(self, p, q):
+        '''Same as 'exists_good_path', but also compares its answer with the answer of 'exists_good_path_dfs'.'''
+        answer = type(self).exists_good_path(self, p, q)
+        self.counters['catalog_checks'] += 1
+        if answer != self.exists_good_path_dfs(p, q):
+            self.counters['catalog_disagreements'] += 1
+        return answer
+
+    def checked_find_paths(self, p, q, max_nb_paths=math.inf):
+        '''Same as 'find_paths', but also compares its answer with the answer of 'find_paths_dfs'.'''
+        answer = type(self).find_paths(self, p, q, max_nb_paths)
+        self.counters['catalog_checks'] += 1
+        if answer != self.find_paths_dfs(p, q, max_nb_paths):
+            self.counters['catalog_disagreements'] += 1
+        return answer
+
+    # -------------------------------------------------------------------------------------------------------------
+    # CACHE OF THE ANSWERS OF 'exists_good_path' AND 'find_paths'
+    #
+    # The answers only depend on the vector pq and on the configuration around p, restricted to the edges and
+    # the points of the catalog paths from p to q: the existing edges, the forbidden edges and the degrees of the points.
+    # This restriction (the fingerprint of p and q) is part of the key of the answers in the cache,
+    # and the paths are stored relatively to p, so that the answers can be reused anywhere in the grid.
+
+    def local_edges(self, p, q):
+        '''
+        Returns the bitmasks of the existing edges and of the forbidden edges among the edges of the catalog paths
+        from p to q (with the ids of PATH_CATALOG).
+        '''
+        edges = self.edges
+        forbidden_edges = self.forbidden_edges
+        px, py = p
+        relative_edges, _ = PATH_CATALOG[vec(p, q)]
+
+        existing = 0
+        forbidden = 0
+        bit = 1
+        for xa, ya, xb, yb in relative_edges:
+            edge = ((px+xa, py+ya), (px+xb, py+yb))
+            if edge in edges:
+                existing |= bit
+            elif edge in forbidden_edges:
+                forbidden |= bit
+            bit <<= 1
+        return existing, forbidden
+
+    def local_degrees(self, p, q):
+        '''Returns the tuple of the degrees of the points of the catalog paths from p to q.'''
+        deg = self.deg
+        px, py = p
+        return tuple([deg.get((px+x, py+y), 0) for x, y in CATALOG_POINTS[vec(p, q)]])
+
+    def cache_lookup(self, key):
+        '''Returns the answer stored in the cache for 'key' (None if there is none), and marks it as recently used.'''
+        answer = self.cache.get(key)
+        if answer is None:
+            self.counters['cache_misses'] += 1
+        else:
+            self.counters['cache_hits'] += 1
+            self.cache.move_to_end(key)
+        return answer
+
+    def cache_store(self, key, answer):
+        '''Stores an answer in the cache, and evicts the least recently used answer if the cache is full.'''
+        cache = self.cache
+        cache[key] = answer
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+            self.counters['cache_evictions'] += 1
+
+    def cached_exists_good_path(self, p, q):
+        '''Same as 'exists_good_path', but the answer is taken from the cache if possible.'''
+        existing, _ = self.local_edges(p, q)
+        key = ('exists_good_path', vec(p, q), existing)
+        answer = self.cache_lookup(key)
+        if answer is None:
+            answer = type(self).exists_good_path(self, p, q)
+            self.cache_store(key, answer)
+        return answer
+
+    def cached_find_paths(self, p, q, max_nb_paths=math.inf):
+        '''Same as 'find_paths', but the answer is taken from the cache if possible.'''
+        px, py = p
+        key = ('find_paths', vec(p, q), max_nb_paths) + self.local_edges(p, q) + (self.local_degrees(p, q),)
+        relative_paths = self.cache_lookup(key)
+        if relative_paths is None:
+            paths = type(self).find_paths(self, p, q, max_nb_paths)
+            self.cache_store(key, tuple([tuple([(x-px, y-py) for x, y in path]) for path in paths]))
+            return paths
+        return [[(px+x, py+y) for x, y in path] for path in relative_paths]
+
+    # -------------------------------------------------------------------------------------------------------------
+    # DEPTH-FIRST SEARCHES (the catalog of short paths is checked against them)
+
+    def exists_good_path_dfs(self, p, q):
+        '''
+        Same as 'exists_good_path', with a depth-first search instead of the catalog of short paths.
+        '''
+        edges = self.edges
+        max_lg_squared = dilated_squared(dist_squared(p, q))  # (DIL*|pq|)**2
 
-        # if one of the endpoints of the edge now has degree 3, more forbidden edges need to be added
-        for p in [a, b]:
-            if deg[p] == 3:
-                for d, _ in directions:
-                    c = translate(p, d)
-                    if ((p, c) not in edges) and ((p, c) not in forbidden_edges):
-                        forbidden_edges.update([(p, c), (c, p)])
-                        new_forbidden.extend([(p, c), (c, p)])
+        def DFS(u, lg, previous=None):
+            '''
+            We are currently at u and we want to reach q.
+            The variable 'lg' is the distance already traveled between p and u.
+            '''
 
-        return new_forbidden
+            if u == q:
+                return lg.square_le(max_lg_squared)
 
-    added_edges = []
-    added_points = []
-    new_forbidden = []
+            # pruning using manhattan_with_diagonals which is a lower bound of the length of the path from q to u
+            if not (lg + manhattan_with_diagonals(q, u)).square_le(max_lg_squared):    # the dilation is too big
+                return False  # we end the exploration of the current path
 
-    l = len(path)
-    for i in range(l-1):
-        a = path[i]
-        b = path[i+1]
-        if not (a, b) in edges:
-            added_edges.append((a, b))
-            new_forbidden.extend(add_edge(a, b))
+            for d, norm in directions:
+                v = translate(u, d)
+                if (v != previous) and ((u, v) in edges):   # we don't go back and use an existing edge
+                    if DFS(v, lg+norm, u):
+                        return True
+                    # else we continue to explore all possible paths
+            return False    # we did not find any valid end to the current path
 
-        for p in [a, b]:
-            if not p in points:
-                added_points.append(p)
-                points.add(p)
+        return DFS(p, ZERO)
 
-    return added_edges, added_points, new_forbidden
+    def find_paths_dfs(self, p, q, max_nb_paths=math.inf):
+        '''
+        Same as 'find_paths', with a depth-first search instead of the catalog of short paths.
+        '''
+        forbidden_edges = self.forbidden_edges
+        can_add_path = self.can_add_path
+        max_lg_squared = dilated_squared(dist_squared(p, q))  # (DIL*|pq|)**2
+
+        paths = []
+
+        def DFS(u, lg, path):   # we are currently at u and we want to reach q
+            '''
+            We are currently at u and we want to reach q.
+            The variable 'path' is the current path from p to u, and 'lg' is the length of this path.
+
+            Returns True if enough paths are found and we can stop the search,
+            False if more paths needs to be considered.
+            Valid paths are added to the list 'paths'.
+            '''
+
+            if u == q and lg.square_le(max_lg_squared) and can_add_path(path):
+                paths.append(path)
+                return len(paths) == max_nb_paths    # True if we must stop
+
+            # pruning
+            if not (lg + manhattan_with_diagonals(q, u)).square_le(max_lg_squared):
+                return False  # we end the exploration of the current path
+
+            for d, norm in directions:
+                v = translate(u, d)
+                # we don't go back and go through an allowed edge
+                if ((len(path) == 1) or (v != path[-2])) and not (u, v) in forbidden_edges:
+                    if DFS(v, lg+norm, path+[v]):
+                        return True
+            return False
 
+        DFS(p, ZERO, [p])
+        return paths
 
-def remove_path(added_edges, added_points, new_forbidden):
-    '''
-    Undoes the changes made by a previous call to add_path.
-    '''
-    for edge in added_edges:
-        a, b = edge
-        deg[a] -= 1
-        deg[b] -= 1
-        edges.difference_update({(a, b), (b, a)})
-    points.difference_update(added_points)
-    forbidden_edges.difference_update(new_forbidden)
+    def find_shortcut(self, p, q, c):
+        '''
+        If we can infer that there exists a path between p and q,
+        with length strictly less than c, it returns this path. Otherwise, returns None.
 
 
-# -----------------------------------------------------------------------------------------------------------------
-# PATTERN DETECTION
+        The strategy is as follows: if a and b are two vertices with |ab| <= sqrt(5),
+        - if ab is in 'edges', we know that there is a segment of length |ab| between a and b;
+        - in all cases, we know that there is a path of length at most |ab|*DIL between them (*)
+          (since the geometric graph has local dilation DIL = 1+sqrt(2)).
+        '''
+        edges = self.edges
+        nb_nodes = 0    # the number of nodes visited by the search (see the section PROFILING)
+
+        def DFS(u, lg, prev=None):   # we are currently at u and we want to reach q, length of current path is 'lg'
+            nonlocal nb_nodes
+            nb_nodes += 1
+            if u == q and lg < c:
+                return [q]
+
+            # pruning
+            if lg + manhattan_with_diagonals(q, u) >= c:
+                return None  # we end the exploration of the current path
+
+            for d, norm, dilated_norm in dilated_directions:
+                v = translate(u, d)
+                if (u, v) not in edges:
+                    norm = dilated_norm  # explanation above, see (*)
+
+                if v != prev:
+                    shortcut = DFS(v, lg+norm, v)
+                    if shortcut is not None:
+                        return [u] + shortcut
+            return None
+        shortcut = DFS(p, ZERO)
+        self.shortcut_nodes = nb_nodes
+        return shortcut
+
+    def add_path(self, path):
+        '''
+        Adds all the edges from a path given as a list of points,
+        assuming it can be added (needs to be checked earlier by can_add_path).
+        The changes are recorded on 'trail' (with exactly one of (a, b) and (b, a) for every edge):
+        - (EDGE_RECORD, a, b) for an added edge (a, b);
+        - (FORBIDDEN_RECORD, c, d) for a new forbidden edge (c, d);
+        - (POINT_RECORD, p, None) for an added point p.
+        '''
+        edges = self.edges
+        forbidden_edges = self.forbidden_edges
+        deg = self.deg
+        points = self.points
+        trail = self.trail
+
+        def forbid(c, d):
+            forbidden_edges.add((c, d))
+            forbidden_edges.add((d, c))
+            trail.append((FORBIDDEN_RECORD, c, d))
+
+        def add_edge(a, b):
+            '''
+            Adds a bidirectional edge between points a and b to 'edges', and the new forbidden edges to 'forbidden_edges'.
+            Assumes that it is possible and that the edge does not already exist.
+            '''
+            trail.append((EDGE_RECORD, a, b))
 
-def detect_pattern(p, pattern):
-    '''
-    Given a point p and a pattern (a set of edges),
-    checks if the pattern is present in 'edges' at the point p.
+            for p in [a, b]:
+                deg[p] = deg.get(p, 0) + 1
 
-    If the pattern is not there, returns None;
-    otherwise returns the point of the pattern corresponding to p.
-    '''
-    points_of_pattern = set()
-    for a, b in pattern:
-        points_of_pattern.update([a, b])
+            edges.add((a, b))
+            edges.add((b, a))
+
+            if manhattan(a, b) == 2:  # (a, b) is a diagonal edge -> the crossing diagonal becomes forbidden
+                dx, dy = vec(a, b)
+                c = translate(a, (dx, 0))
+                # (c, d) is the diagonal that crosses (a, b)
+                d = translate(a, (0, dy))
+                if ((c, d) not in edges) and ((c, d) not in forbidden_edges):
+                    forbid(c, d)
+
+            # if one of the endpoints of the edge now has degree 3, more forbidden edges need to be added
+            for p in [a, b]:
+                if deg[p] == 3:
+                    for d, _ in directions:
+                        c = translate(p, d)
+                        if ((p, c) not in edges) and ((p, c) not in forbidden_edges):
+                            forbid(p, c)
+
+        l = len(path)
+        for i in range(l-1):
+            a = path[i]
+            b = path[i+1]
+            if not (a, b) in edges:
+                add_edge(a, b)
+
+            for p in [a, b]:
+                if not p in points:
+                    trail.append((POINT_RECORD, p, None))
+                    points[p] = len(points)
+
+    def backtrack(self, height):
+        '''
+        Undoes the changes recorded on 'trail' after its first 'height' records, in the reverse order,
+        so that 'trail' has length 'height' again.
+
+        The trail is the only record of the changes (as the trail of a SAT solver): the calls to 'expand' only
+        remember the length of the trail when they start, and no list or set is built to undo a branch.
+        '''
+        trail = self.trail
+        edges = self.edges
+        forbidden_edges = self.forbidden_edges
+        deg = self.deg
+        points = self.points
+        known_satisfaction = self.known_satisfaction
+
+        while len(trail) > height:
+            kind, a, b = trail.pop()
+            if kind == EDGE_RECORD:
+                deg[a] -= 1
+                deg[b] -= 1
+                edges.discard((a, b))
+                edges.discard((b, a))
+            elif kind == FORBIDDEN_RECORD:
+                forbidden_edges.discard((a, b))
+                forbidden_edges.discard((b, a))
+            elif kind == POINT_RECORD:
+                del points[a]
+            else:   # SATISFACTION_RECORD
+                known_satisfaction.discard((a, b))
+                known_satisfaction.discard((b, a))
+
+    def edges_on_trail(self, height):
+        '''Returns the list of the edges added after the first 'height' records of 'trail'.'''
+        return [(a, b) for kind, a, b in self.trail[height:] if kind == EDGE_RECORD]
+
+    # -------------------------------------------------------------------------------------------------------------
+    # TRANSPOSITIONS (see the section TRANSPOSITION TABLE)
+
+    def update_zobrist_hashes(self, changed_edges):
+        '''Adds or removes the edges of 'changed_edges' to the Zobrist hashes of the configuration.'''
+        zobrist_hashes = self.zobrist_hashes
+        for i, isometry in enumerate(self.symmetries):
+            h = zobrist_hashes[i]
+            for a, b in changed_edges:
+                h ^= zobrist_key(apply_isometry(isometry, a), apply_isometry(isometry, b))
+            zobrist_hashes[i] = h
+
+    def hashed_add_path(self, path):
+        '''Same as 'add_path', but the Zobrist hashes are updated.'''
+        height = len(self.trail)
+        type(self).add_path(self, path)
+        self.update_zobrist_hashes(self.edges_on_trail(height))
+
+    def hashed_backtrack(self, height):
+        '''Same as 'backtrack', but the Zobrist hashes are updated.'''
+        self.update_zobrist_hashes(self.edges_on_trail(height))
+        type(self).backtrack(self, height)
+
+    def canonical_configuration(self):
+        '''
+        Returns the key of the current configuration in the transposition table, and its image under the
+        corresponding isometry (as a set of edges {a, b}).
+        '''
+        zobrist_hashes = self.zobrist_hashes
+        key = min(zobrist_hashes)
+        isometry = self.symmetries[zobrist_hashes.index(key)]
+        image = frozenset([frozenset([apply_isometry(isometry, a), apply_isometry(isometry, b)]) for a, b in self.edges])
+        return key, image
+
+    def is_refuted(self):
+        '''Returns True iff the current configuration (up to the symmetries of the result) was already refuted.'''
+        key = min(self.zobrist_hashes)
+        if key not in self.refuted_configurations:
+            return False
+        return self.canonical_configuration() == (key, self.refuted_configurations[key])
+
+    def store_refuted(self):
+        '''Stores the current configuration in the transposition table.'''
+        key, image = self.canonical_configuration()
+        self.refuted_configurations[key] = image
+
+    # -------------------------------------------------------------------------------------------------------------
+    # PAIRS EXAMINED BY 'expand'
+
+    def candidate_pairs(self, recent_points):
+        '''
+        Generates the pairs of points (p, q) examined by 'expand' after the points of 'recent_points' were changed:
+        p is a point of the configuration at distance at most 3 from 'recent_points', 1 <= |pq| <= sqrt(5),
+        and q is at distance at most 2 from 'recent_points' (for the Manhattan distance, see 'is_close_to').
+        Only one of (p, q) and (q, p) is generated.
+
+        The pairs are generated in the order of the first points in 'points', and then in the order of PAIR_OFFSETS.
+        They are enumerated from the neighbourhoods of the points of 'recent_points' (instead of a scan of 'points'),
+        and lazily, so that 'expand' can stop at the first contradiction.
+        '''
+        points = self.points
+
+        first_points = set()
+        close_points = set()    # the points at distance at most 2 from 'recent_points'
+        for rx, ry in recent_points:
+            for dx, dy in MANHATTAN_BALL_3:
+                p = (rx+dx, ry+dy)
+                if p in points:
+                    first_points.add(p)
+            for dx, dy in MANHATTAN_BALL_2:
+                close_points.add((rx+dx, ry+dy))
+
+        generated_pairs = set()
+        for p in sorted(first_points, key=points.get):
+            px, py = p
+            for dx, dy in PAIR_OFFSETS:
+                q = (px+dx, py+dy)
+                if q in close_points and (q, p) not in generated_pairs:  # To avoid duplicates
+                    generated_pairs.add((p, q))
+                    yield (p, q)
+
+    # -------------------------------------------------------------------------------------------------------------
+    # BRANCHING PAIR
+
+    def branching_pair(self):
+        '''
+        Returns the pair (p, q) with |pq| = 1 on which 'expand' branches (static order):
+        the first pair of 'ls_edges_to_consider' which is not in 'known_satisfaction'.
+        '''
+        known_satisfaction = self.known_satisfaction
+        for p, q in self.ls_edges_to_consider:
+            if (p, q) not in known_satisfaction:
+                return p, q
 
-    for pattern_point in points_of_pattern:
-        v = vec(pattern_point, p)   # translation vector from pattern to edges
+        # Does not occur with the lists 'ls_edges_to_consider' that we provide
+        raise ValueError(
+            "The list 'ls_edges_to_consider' was not long enough: we could not finish the proof within this depth")
 
-        cur_ok = True
+    def fail_first_branching_pair(self):
+        '''
+        Returns the pair (p, q) with |pq| = 1 on which 'expand' branches (dynamic order, 'fail first'):
+        among the pairs of neighbours with a point in 'points' which are not joined by a good path, the pair with
+        the fewest paths of 'the_five_short_paths' which can be added, and then the pair closest to the configuration
+        (with both points in 'points' rather than one, and then closest to the initial configuration).
+        The remaining ties are broken by the order of 'points'.
+
+        The pairs found to be joined by a good path are added to 'known_satisfaction' (a pair which is already
+        joined cannot be chosen: its branches would not change the configuration).
+        '''
+        points = self.points
+        known_satisfaction = self.known_satisfaction
+        trail = self.trail
+        can_add_path = self.can_add_path
+        initial_points = self.to_prove.path_of_config
+
+        best_pair = None
+        best_score = None
+        for p in points:
+            px, py = p
+            for dx, dy in UNIT_DIRECTIONS:
+                q = (px+dx, py+dy)
+                rank_q = points.get(q)
+                if rank_q is not None and rank_q < points[p]:
+                    continue    # the pair (q, p) was already considered
+                if (p, q) in known_satisfaction:
+                    continue
+                if self.exists_good_path(p, q):
+                    known_satisfaction.update([(p, q), (q, p)])
+                    trail.append((SATISFACTION_RECORD, p, q))
+                    continue
+
+                nb_paths = 0
+                for path in the_five_short_paths(p, q):
+                    if can_add_path(path):
+                        nb_paths += 1
+                distance = min([manhattan(p, c) + manhattan(q, c) for c in initial_points])
+                score = (nb_paths, 0 if rank_q is not None else 1, distance)
+                if best_score is None or score < best_score:
+                    best_pair = (p, q)
+                    best_score = score
+                    if nb_paths == 0:   # the pair cannot be joined: no score can be better
+                        return best_pair
+
+        if best_pair is None:
+            raise ValueError("Every pair of neighbours of the configuration is joined by a good path")
+        return best_pair
+
+    # -------------------------------------------------------------------------------------------------------------
+    # PATTERN DETECTION
+
+    def detect_pattern(self, p, pattern):
+        '''
+        Given a point p and a pattern (a set of edges),
+        checks if the pattern is present in 'edges' at the point p.
+
+        If the pattern is not there, returns None;
+        otherwise returns the point of the pattern corresponding to p.
+        '''
+        edges = self.edges
+
+        points_of_pattern = set()
         for a, b in pattern:
-            if (translate(a, v), translate(b, v)) not in edges:
-                cur_ok = False
-                break
+            points_of_pattern.update([a, b])
 
-        if cur_ok:
-            return pattern_point
+        for pattern_point in points_of_pattern:
+            v = vec(pattern_point, p)   # translation vector from pattern to edges
 
-    return None
+            cur_ok = True
+            for a, b in pattern:
+                if (translate(a, v), translate(b, v)) not in edges:
+                    cur_ok = False
+                    break
 
+            if cur_ok:
+                return pattern_point
 
-def pattern_created_by_recent_add(recent_points):
-    '''
-    Checks if one of the patterns in 'list_of_patterns' can be found in 'edges'.
-    It only searches for patterns near recently added points (from the list 'recent_points'). 
+        return None
 
-    If no pattern is found, returns None;
-    otherwise returns the subset of 'edges' that forms a pattern (as a list).
-    '''
-    for p in recent_points:
-        for patt in list_of_patterns:
-            attaching_point = detect_pattern(p, patt)
-            if attaching_point is not None:
-                v = vec(attaching_point, p)
-                translated_pattern = []
-                for a, b in patt:
-                    translated_pattern.append(
-                        (translate(a, v), translate(b, v)))
-                return translated_pattern
-    return None
+    def pattern_created_by_recent_add(self, recent_points):
+        '''
+        Checks if one of the patterns in 'list_of_patterns' can be found in 'edges'.
+        It only searches for patterns near recently added points (from the list 'recent_points').
 
+        If no pattern is found, returns None;
+        otherwise returns the subset of 'edges' that forms a pattern (as a list).
 
-def initialize_patterns(initial_list_of_patterns):
-    '''
-    Given a list of patterns (each one being a list of edges),
-    initializes list_of_patterns so that it contains all the list of edges corresponding
-    to the images of those patterns under rotations and symmetries.
-    '''
-    global list_of_patterns
+        The patterns are tried in the same order as with 'detect_pattern', but only the pairs (pattern, anchor)
+        of 'pattern_index' which are compatible with the edges at p are tried.
+        '''
+        edges = self.edges
+        pattern_index = self.pattern_index
+        for p in recent_points:
+            px, py = p
+            for patt, attaching_point, relative_edges, _, _ in pattern_index[self.signature(p)]:
+                for xa, ya, xb, yb in relative_edges:
+                    if ((px+xa, py+ya), (px+xb, py+yb)) not in edges:
+                        break
+                else:
+                    v = vec(attaching_point, p)
+                    translated_pattern = []
+                    for a, b in patt:
+                        translated_pattern.append(
+                            (translate(a, v), translate(b, v)))
+                    return translated_pattern
+        return None
 
-    list_of_patterns = []
+    def signature(self, p):
+        '''Returns the signature of the point p: the set of the directions of the edges at p (see DIRECTION_BITS).'''
+        edges = self.edges
+        px, py = p
+        signature = 0
+        for (dx, dy), bit in DIRECTION_BITS.items():
+            if (p, (px+dx, py+dy)) in edges:
+                signature |= bit
+        return signature
+
+    def pattern_is_at(self, p, anchored_pattern):
+        '''Returns True iff the pattern of 'anchored_pattern' (see 'build_pattern_index') is in 'edges' with its anchor at p.'''
+        edges = self.edges
+        px, py = p
+        for xa, ya, xb, yb in anchored_pattern[2]:
+            if ((px+xa, py+ya), (px+xb, py+yb)) not in edges:
+                return False
+        return True
+
+    # -------------------------------------------------------------------------------------------------------------
+    # LEARNED NOGOODS
+    #
+    # Every node of the search tree is refuted by a part of its configuration only, its explanation: a set of edges
+    # such that every configuration of the proof containing it is refuted.
+    # - A path of the catalog is rejected by 'can_add_path' because of a reason, a set of edges which rejects it in any
+    #   configuration containing it: the diagonal which crosses one of its edges, or all the edges at a point of
+    #   degree 3 (or at a point whose degree would exceed 3). In the configurations of the proof, an edge is forbidden
+    #   only for one of these reasons (see 'rejection_reasons').
+    # - The explanation of a leaf is the set of the edges of its shortcut which are in 'edges', the edges of its
+    #   pattern, or the reasons of all the catalog paths of its pair in the case Contradiction.
+    # - The explanation of a node with children is the union of the reasons of the paths which cannot be added between
+    #   the pair of its branching (or of its deduction) and of the explanations of its children without the edges of
+    #   their paths: a configuration containing it contains one of the paths of the children, and then the explanation
+    #   of this child. The paths added by 'propagate' are deductions of the node itself, and their edges are replaced
+    #   by their reasons in the same way, from the last one to the first one.
+    #
+    # With the option 'nogood_store_size', the explanation of every branching node is learned as a nogood when its
+    # subtree is explored, and a node where a learned nogood appears is a leaf: its subtree is not explored again.
+    # The explanations are much smaller than the configurations, so they appear again in other branches of the tree
+    # and at other places. The patterns and the contradictions do not depend on the position, so the explanations are
+    # matched by translation (like the patterns, see 'anchor_pattern'), except the explanations of the subtrees with
+    # a shortcut (from u to v), which are only matched at their own position (they are 'absolute', and indexed by
+    # their edges). The explanations of the branching nodes are numbered in the order in which the nodes are left,
+    # so that the certificate of a node refuted by a nogood refers to its number (see the section CERTIFICATE).
+
+    def degree(self, x):
+        '''Returns the degree of the point x in 'edges'.'''
+        return self.deg.get(x, 0)
+
+    def edges_at(self, x):
+        '''Returns the set of the edges (a, b) of 'edges' at the point x, with a < b.'''
+        edges = self.edges
+        xx, xy = x
+        edges_at_x = set()
+        for (dx, dy), _ in directions:
+            y = (xx+dx, xy+dy)
+            if (x, y) in edges:
+                edges_at_x.add((x, y) if x < y else (y, x))
+        return edges_at_x
+
+    def rejection_reasons(self, paths):
+        '''
+        Given paths which cannot be added to the configuration (see 'can_add_path'), returns the union of one reason
+        for every path (a set of edges (a, b) of 'edges' with a < b, see the section LEARNED NOGOODS): for every path
+        which is not rejected by the reasons chosen for the previous paths, the smallest reason is chosen.
+        Raises ValueError if a path has no reason.
+        '''
+        edges = self.edges
+        forbidden_edges = self.forbidden_edges
+        edges_at = {}   # the edges at the points of degree 3 met so far (the paths of a pair share most of their points)
+
+        rejection = set()
+        for path in paths:
+            reasons = []
+            degree_increment = {}
+            for a, b in zip(path, path[1:]):
+                if (a, b) in edges:
+                    continue
+                if (a, b) in forbidden_edges:
+                    (ax, ay), (bx, by) = a, b
+                    if ax != bx and ay != by:   # the crossing diagonal
+                        c, d = (ax, by), (bx, ay)
+                        if (c, d) in edges:
+                            reasons.append({(c, d) if c < d else (d, c)})
+                for x in [a, b]:
+                    degree_increment[x] = degree_increment.get(x, 0) + 1
+                    # x has degree 3 (then (a, b) is forbidden), or x would have a degree > 3 after adding the path
+                    if self.degree(x) + degree_increment[x] > 3:
+                        if x not in edges_at:
+                            edges_at[x] = self.edges_at(x)
+                        reasons.append(edges_at[x])
+            if not reasons:     # cannot happen in the configurations of the proof
+                raise ValueError('The path %s is not rejected by the configuration' % path)
+            if not any(reason <= rejection for reason in reasons):
+                rejection |= min(reasons, key=len)
+        return rejection
+
+    def explain_leaf(self, edges, absolute=False):
+        '''Sets the explanation of the current node, a leaf, to the edges of 'edges' (see the section LEARNED NOGOODS).'''
+        self.explanation[0] = {(a, b) if a < b else (b, a) for a, b in edges}
+        self.explanation[1] = absolute
+
+    def pass_explanation(self, explanation, gamma):
+        '''
+        Adds the explanation of a node which is left (whose path is 'gamma') to the explanation of its parent, the node
+        of the last frame of 'stack'. If 'explanation' is None (it is not known, for instance because some subtrees
+        were left to the worker processes), the explanation of the parent is not known either.
+        '''
+        if not self.stack or self.stack[-1][8] is None:
+            return
+        if explanation is None:
+            self.stack[-1][8] = None
+            return
+        parent_explanation = self.stack[-1][8]
+        parent_explanation[0] |= explanation[0] - edges_of_path(gamma)
+        parent_explanation[1] = parent_explanation[1] or explanation[1]
+
+    def learn_nogood(self, nogood, absolute):
+        '''
+        Stores the explanation 'nogood' of a branching node, and evicts the least recently used nogood if the store
+        is full. The nogoods are identified by their translate whose smallest point is (0, 0) (or by their edges,
+        if they are absolute), and a nogood which is already stored keeps its number.
+        '''
+        self.nogood_number += 1
+        if not nogood:
+            return
+        # (the points of the initial paths may have numpy coordinates, which the bitboards cannot shift)
+        nogood = sorted([((int(ax), int(ay)), (int(bx), int(by))) for (ax, ay), (bx, by) in nogood])
+        if absolute:
+            key = ('absolute', frozenset(nogood))
+        else:
+            ox, oy = nogood[0][0]
+            key = frozenset([((ax-ox, ay-oy), (bx-ox, by-oy)) for (ax, ay), (bx, by) in nogood])
+        nogoods = self.nogoods
+        if key in nogoods:
+            nogoods.move_to_end(key)
+            return
+
+        nogood_index = self.nogood_index
+        absolute_nogoods = self.absolute_nogoods
+        anchored_patterns = [] if absolute else anchor_pattern(nogood)
+        nogoods[key] = (self.nogood_number, nogood, anchored_patterns)
+        if absolute:
+            for edge in nogood:
+                absolute_nogoods.setdefault(edge, {})[key] = None
+        for signature, anchored_pattern in anchored_patterns:
+            nogood_index.setdefault(signature, {}).setdefault(key, []).append(anchored_pattern)
+        self.counters['nogoods_learned'] += 1
+
+        if len(nogoods) > self.nogood_store_size:
+            old_key, (_, old_nogood, old_anchored_patterns) = nogoods.popitem(last=False)
+            if not old_anchored_patterns:   # an absolute nogood
+                for edge in old_nogood:
+                    keys_with_edge = absolute_nogoods[edge]
+                    del keys_with_edge[old_key]
+                    if not keys_with_edge:
+                        del absolute_nogoods[edge]
+            # several anchors of the nogood may have the same signature, whose entry is then removed only once
+            for signature in {signature for signature, _ in old_anchored_patterns}:
+                patterns_with_signature = nogood_index[signature]
+                del patterns_with_signature[old_key]
+                if not patterns_with_signature:
+                    del nogood_index[signature]
+            self.counters['nogood_evictions'] += 1
+
+    def nogood_created_by_recent_add(self, recent_points, recent_edges):
+        '''
+        Same as 'pattern_created_by_recent_add' for the learned nogoods: returns a translate of a learned nogood
+        which is in 'edges' at one of the points of 'recent_points' (an absolute nogood, at its own position, with one
+        of the edges of 'recent_edges'), or None. The number of the nogood, the translation and True iff the nogood is
+        absolute are stored in 'nogood_hit'.
 
-    # Construct 'all_transfo', a list of 8 matrices corresponding to the possible symmetries
-    rotation = np.array([np.array([0, -1]), np.array([1, 0])])
-    flip = np.array([np.array([-1, 0]), np.array([0, 1])])
-    all_transfo = [matrix_power(rotation, i) for i in range(
-        4)] + [matrix_power(rotation, i).dot(flip) for i in range(4)]
+        The nogoods anchored at p whose signature at the anchor is a subset of the signature of p are tried
+        (a point has at most 3 edges, so there are at most 8 such subsets).
+        '''
+        nogoods = self.nogoods
+        edges = self.edges
+        absolute_nogoods = self.absolute_nogoods
+        # (in the same order with sets and with bitboards, whose trails do not list the edges in the same order)
+        for edge in sorted([(a, b) if a < b else (b, a) for a, b in recent_edges]):
+            for key in absolute_nogoods.get(edge, ()):
+                number, nogood, _ = nogoods[key]
+                if all([edge in edges for edge in nogood]):
+                    nogoods.move_to_end(key)
+                    self.nogood_hit = (number, (0, 0), True)
+                    return nogood
+
+        nogood_index = self.nogood_index
+        pattern_is_at = self.pattern_is_at
+        for p in recent_points:
+            signature = self.signature(p)
+            subset = signature
+            while True:
+                for key, anchored_patterns in nogood_index.get(subset, {}).items():
+                    for anchored_pattern in anchored_patterns:
+                        if pattern_is_at(p, anchored_pattern):
+                            nogoods.move_to_end(key)
+                            number, nogood, _ = nogoods[key]
+                            v = vec(anchored_pattern[1], p)
+                            self.nogood_hit = (number, v, False)
+                            return [(translate(a, v), translate(b, v)) for a, b in nogood]
+                if subset == 0:
+                    break
+                subset = (subset - 1) & signature
+        return None
 
-    for pattern in initial_list_of_patterns:
-        for mat in all_transfo:
-            transformed_pattern = []
+    def nogood_refutes(self, recent_points, recent_edges):
+        '''
+        Returns True iff a learned nogood appears in the configuration after the changes of 'recent_points' and
+        'recent_edges' (see 'nogood_created_by_recent_add'). The node is then a leaf, and the nogood is sent to the
+        interface as a pattern.
+        '''
+        nogood = self.nogood_created_by_recent_add(recent_points, recent_edges)
+        if nogood is None:
+            return False
+        self.counters['nogood_hits'] += 1
+        self.interface.notify_pattern(self.edges, self.forbidden_edges, nogood)
+        number, (vx, vy), absolute = self.nogood_hit
+        if self.certificate is not None:
+            self.certificate.write('N %d %d %d\n' % (number, vx, vy))
+        self.explain_leaf(nogood, absolute)
+        return True
+
+    # -------------------------------------------------------------------------------------------------------------
+    # EXPLORATION
+
+    def expand(self, gamma):
+        '''
+        Main function. Implements Algorithm 2 (see the article): explores the subtree of the node obtained by adding
+        the path 'gamma' to the current configuration, and then removes 'gamma' (and everything added below it).
+
+        The search is iterative: 'stack' holds one frame per node between the root of the subtree and the current
+        node which still has children to explore, as a list [gamma, height, nb_paths, nb_subtrees, children, branching,
+        nb_children, width, explanation], where 'height' and 'nb_paths' are the heights of 'trail' and 'current_paths'
+        before 'gamma' was added (see 'leave_node'), 'children' is an iterator over the paths of the children which are
+        not explored yet, 'branching' is True iff the children are the choices of a branching (see 'branch_paths'),
+        'nb_children' is the number of children entered so far and 'width' is the number of children of the node
+        (including the subtrees left to the worker processes in parallel mode). With the option 'nogood_store_size',
+        'explanation' is the list [edges, absolute, deductions] of the explanation of the node (see the section LEARNED
+        NOGOODS): the set of its edges so far, True iff it is absolute, and the list of the pairs (path, reasons) of the
+        paths added by 'propagate'. It is None if the option is not used or if the explanation is not known.
+        The nodes are visited in the order of a recursive depth-first search, where 'expand' would be called
+        for every child in the order of 'children' (so the interface receives the same notifications),
+        but the depth of the tree is not limited by the recursion limit of Python.
+        '''
+        bottom = len(self.stack)
+        if self.enter_node(gamma):
+            self.explore(bottom)
+
+    def explore(self, bottom):
+        '''Explores the remaining children of the frames of 'stack' above the first 'bottom' frames (see 'expand').'''
+        stack = self.stack
+        checkpoint_file = self.checkpoint_file
+        while len(stack) > bottom:
+            if checkpoint_file is not None and time.monotonic() >= self.next_checkpoint:
+                self.write_checkpoint()
+            frame = stack[-1]
+            path = next(frame[4], None)
+            if path is None:    # all the children were explored
+                self.leave_node(stack.pop())
+                if len(stack) > bottom and stack[-1][5]:
+                    self.branch_depth -= 1
+            elif frame[5]:
+                self.branch_depth += 1
+                if not self.enter_node(path):
+                    self.branch_depth -= 1
+                frame[6] += 1
+            else:
+                self.enter_node(path)
+                frame[6] += 1
+
+    def enter_node(self, gamma):
+        '''
+        Adds the path 'gamma' to the configuration and examines the new node. If the node has children (a unique path
+        or the choices of a branching), pushes its frame on 'stack' (see 'expand') and returns True; otherwise
+        the node is a leaf, which is left at once (see 'leave_node'), and returns False.
 
-            for edge in pattern:
-                a, b = edge
-                new_a = tuple(mat.dot(np.array(a)))
-                new_b = tuple(mat.dot(np.array(b)))
-                transformed_pattern.append((new_a, new_b))
+        In the comments, we will use [i:] to denote the i-th line of Algorithm 2.
+        '''
+        to_prove = self.to_prove
+        interface = self.interface
+        counters = self.counters
+
+        trail = self.trail
+        height = len(trail)  # the changes made by the node are the records of 'trail' after 'height' (to remove them when the branch is finished)
+        nb_paths = len(self.current_paths)
+        self.add_path(gamma)
+        self.current_paths.append(gamma)
+        edges = self.edges  # the configuration is sent to the interface
+        forbidden_edges = self.forbidden_edges
+        # the explanation of the node (see the section LEARNED NOGOODS), completed by the methods which examine it
+        self.explanation = [set(), False, []] if self.nogood_store_size > 0 else None
+
+        if self.transpositions:
+            if self.is_refuted():   # the subtree of this node was already explored from another node
+                counters['transpositions'] += 1
+                if self.explanation is not None:    # the configuration was refuted, at this position
+                    self.explain_leaf(edges, True)
+                    self.pass_explanation(self.explanation, gamma)
+                del self.current_paths[nb_paths:]
+                self.backtrack(height)
+                return False
+        nb_subtrees = len(self.subtrees)
+        children = None     # the leaves have no children
+        branching = False
+        width = 1
+
+        recent_edges = self.edges_on_trail(height)
+        recent_points = set()
+        for a, b in recent_edges:
+            recent_points.update([a, b])
+
+        shortcut = None
+        if to_prove.u is not None and to_prove.v is not None:
+            shortcut = self.find_shortcut(
+                to_prove.u, to_prove.v, to_prove.length_of_path)
+
+        if shortcut is not None:  # Corresponds to line [2:] of Algorithm 2
+            counters['shortcuts'] += 1
+            interface.notify_shortcut(edges, forbidden_edges, shortcut)
+            if self.certificate is not None:
+                self.certify('S', *shortcut)
+            if self.explanation is not None:
+                self.explain_leaf([(a, b) for a, b in zip(shortcut, shortcut[1:]) if (a, b) in edges], True)
+        else:
+            created_pattern = self.pattern_created_by_recent_add(recent_points)
+            if created_pattern is not None:  # [4:]
+                counters['patterns'] += 1
+                interface.notify_pattern(edges, forbidden_edges, created_pattern)
+                if self.certificate is not None:
+                    self.certify_pattern(created_pattern)
+                if self.explanation is not None:
+                    self.explain_leaf(created_pattern)
+            elif self.nogood_store_size > 0 and self.nogood_refutes(recent_points, recent_edges):
+                pass    # the node is a leaf (see 'nogood_refutes')
+            else:
+                counters['branches'] += 1
+                if counters['branches'] > self.max_branches:
+                    raise BudgetExceeded
+                interface.notify_branch(edges, forbidden_edges, counters['branches'])
+                if counters['branches'] >= self.next_estimate:
+                    self.notify_estimate()
+
+                # We examine pairs of points (p, q) [with |pq|<=sqrt(5)] close to the points changed in the last step
+                # (see 'candidate_pairs' and 'examine_pairs'):
+                # (Satisfaction) if there is already a path between p and q in 'edges' of length at most |pq|*DIL,
+                #     the pair is good and there is nothing to do.
+                #     We add the pair to 'known_satisfaction' so that we do not consider it again in the future (if not in 'known_satisfaction' already).
+                # (Deduction) if there is only one possible path (not entirely in 'edges') between p and q of length at most |pq|*DIL,
+                #     we deduce that it must be present. We store it in 'unique_paths' so that it can be added to
+                #     'edges' in the child node (unless a contradiction is found in the meantime).
+                # (Contradiction) if there cannot be any path between p and q of length at most |pq|*DIL,
+                #     we found a contradiction ('edges' is not part of a locally optimal geometric graph).
+                #     We end the exploration of this branch.
+                # (Exploration) otherwise, we cannot conclude anything yet because there are several possibilities for a path between
+                #     p and q of length at most DIL*|pq|, none of which is already in 'edges'
+
+                contradiction, unique_paths = self.examine_pairs(self.candidate_pairs(recent_points))
+
+                if not contradiction:
+                    if unique_paths and not self.propagation:  # Line [:8]: Deduction
+                        a_unique_path = unique_paths[0][2]  # The first unique valid path found
+                        counters['unique_paths'] += 1
+                        interface.notify_unique_path(
+                            edges, forbidden_edges, a_unique_path)
+                        if self.certificate is not None:
+                            self.certify('U', *unique_paths[0])
+                        if self.explanation is not None:    # the reasons of the other paths of the pair
+                            p, q = unique_paths[0][:2]
+                            self.explanation[0] = self.rejection_reasons(
+                                [path for path in paths_of_catalog(p, q) if path != a_unique_path])
+                        # Go deeper to add the unique path [no choice is made]
+                        children = iter([a_unique_path])
+                    elif not unique_paths or self.propagate(unique_paths):  # Line [:12]
+                        # With 'propagation', the unique paths are added to this node, and we only branch if
+                        # 'propagate' ends without contradiction, shortcut or pattern.
+                        paths, width = self.branch_paths()
+                        children = iter(paths)
+                        branching = True
+
+        frame = [gamma, height, nb_paths, nb_subtrees, children, branching, 0, width, self.explanation]
+        if children is None:
+            self.leave_node(frame)
+            return False
+        self.stack.append(frame)
+        return True
+
+    def leave_node(self, frame):
+        '''Removes the path of the node of 'frame' (see 'expand') and everything added below it, once its subtree is explored.'''
+        gamma, height, nb_paths, nb_subtrees, _, branching, _, _, explanation = frame
+
+        # In parallel mode, the configuration is only refuted if no subtree was left to the worker processes
+        if self.transpositions and len(self.subtrees) == nb_subtrees:
+            self.store_refuted()
+
+        if self.nogood_store_size > 0:
+            if explanation is not None and len(self.subtrees) == nb_subtrees:
+                edges, absolute, deductions = explanation
+                if branching:
+                    self.learn_nogood(edges, absolute)
+                for path, reasons in reversed(deductions):  # the paths of 'propagate' (see the section LEARNED NOGOODS)
+                    edges = (edges - edges_of_path(path)) | reasons
+                explanation = [edges, absolute, []]
+            else:
+                explanation = None
+            self.pass_explanation(explanation, gamma)
+
+        # Undo the changes that were made when the node was entered
+        del self.current_paths[nb_paths:]
+        self.backtrack(height)
+
+    def examine_pairs(self, pairs):
+        '''
+        Examines the pairs (p, q) of 'pairs' in this order, as described in 'enter_node' (the new pairs in the case
+        Satisfaction are added to 'known_satisfaction'), until a pair in the case Contradiction is found.
 
-            list_of_patterns.append(transformed_pattern)
+        Returns (contradiction, unique_paths), where 'contradiction' is True iff a pair in the case Contradiction
+        was found, and 'unique_paths' is the list of the triples (p, q, path) for the pairs in the case Deduction.
+        '''
+        known_satisfaction = self.known_satisfaction
+        trail = self.trail
+
+        unique_paths = []
+        for (p, q) in pairs:
+            if (p, q) in known_satisfaction:  # Satisfaction (already known)
+                continue
+            else:
+                if self.exists_good_path(p, q):  # Satisfaction (new)
+                    known_satisfaction.update([(p, q), (q, p)])
+                    trail.append((SATISFACTION_RECORD, p, q))
+                    continue
+
+            # We want to figure out whether there are 0, 1 or at least 2 paths between p and q.
+            # The variable 'valid_paths' contains the list of valid paths between p and q (we limit the search to at most 2 paths).
+            valid_paths = self.find_paths(p, q, 2)
+
+            if len(valid_paths) == 0:  # Line [:6]: Contradiction
+                self.counters['contradictions'] += 1
+                if self.certificate is not None:
+                    self.certify('C', p, q)
+                if self.explanation is not None:
+                    self.explain_leaf(self.rejection_reasons(paths_of_catalog(p, q)))
+                self.interface.notify_impossible_to_join(
+                    self.edges, self.forbidden_edges, p, q)
+                return True, unique_paths  # We can stop immediately
+            elif len(valid_paths) == 1:
+                unique_paths.append((p, q, valid_paths[0]))
+
+        return False, unique_paths
+
+    def propagate(self, unique_paths):
+        '''
+        Adds the unique paths found by 'examine_pairs' to the configuration of the current node, as the unit
+        propagation of a SAT solver: all the unique paths of a scan are added, then only the pairs close to the new
+        edges are examined again, until no unique path remains or a contradiction is found. This avoids a child node
+        (with a new check of shortcuts and patterns, and a new scan) for every unique path.
+
+        A unique path which cannot be added anymore (because of the paths added before it) is not added, and its
+        pair is examined again. The paths are added to 'current_paths' and recorded on 'trail', so they are removed
+        with the changes of the current node.
+
+        Returns True iff no contradiction, shortcut or pattern was found (then 'expand' branches).
+        '''
+        to_prove = self.to_prove
+        interface = self.interface
+        counters = self.counters
+        known_satisfaction = self.known_satisfaction
+        trail = self.trail
+
+        while unique_paths:
+            height = len(trail)
+            pairs_to_examine = []
+            for p, q, path in unique_paths:
+                if (p, q) in known_satisfaction:
+                    continue
+                if self.exists_good_path(p, q):    # the pair was joined by the paths added before
+                    known_satisfaction.update([(p, q), (q, p)])
+                    trail.append((SATISFACTION_RECORD, p, q))
+                    continue
+                if not self.can_add_path(path):
+                    pairs_to_examine.append((p, q))
+                    continue
+                counters['unique_paths'] += 1
+                interface.notify_unique_path(self.edges, self.forbidden_edges, path)
+                if self.certificate is not None:
+                    self.certify('U', p, q, path)
+                if self.explanation is not None:    # the reasons of the other paths of the pair
+                    self.explanation[2].append(
+                        (path, self.rejection_reasons([other for other in paths_of_catalog(p, q) if other != path])))
+                self.add_path(path)
+                self.current_paths.append(path)
+
+            recent_edges = self.edges_on_trail(height)
+            recent_points = set()
+            for a, b in recent_edges:
+                recent_points.update([a, b])
+
+            if to_prove.u is not None and to_prove.v is not None:
+                shortcut = self.find_shortcut(to_prove.u, to_prove.v, to_prove.length_of_path)
+                if shortcut is not None:
+                    counters['shortcuts'] += 1
+                    interface.notify_shortcut(self.edges, self.forbidden_edges, shortcut)
+                    if self.certificate is not None:
+                        self.certify('S', *shortcut)
+                    if self.explanation is not None:
+                        edges = self.edges
+                        self.explain_leaf([(a, b) for a, b in zip(shortcut, shortcut[1:]) if (a, b) in edges], True)
+                    return False
+
+            created_pattern = self.pattern_created_by_recent_add(recent_points)
+            if created_pattern is not None:
+                counters['patterns'] += 1
+                interface.notify_pattern(self.edges, self.forbidden_edges, created_pattern)
+                if self.certificate is not None:
+                    self.certify_pattern(created_pattern)
+                if self.explanation is not None:
+                    self.explain_leaf(created_pattern)
+                return False
+
+            if self.nogood_store_size > 0 and self.nogood_refutes(recent_points, recent_edges):
+                return False
+
+            contradiction, unique_paths = self.examine_pairs(
+                itertools.chain(self.candidate_pairs(recent_points), pairs_to_examine))
+            if contradiction:
+                return False
+
+        return True
+
+    def branch_paths(self):
+        '''
+        Branches on a pair (p, q) [several choices]: returns the list of the paths of the children of the current
+        node, one for every possibility of a path between p and q (see 'expand'), and the number of these paths.
+        (The paths are listed when the node is entered, so that its number of children is known by the estimates
+        of the section TREE SIZE ESTIMATION.)
+
+        The pair (p, q) is chosen by 'branching_pair' (by default, it is the first pair (p, q)
+        of 'ls_edges_to_consider' that is not known as good).
+        '''
+        p, q = self.branching_pair()
+        if self.certificate is not None:
+            self.certify('B', p, q)
+        paths = []
+        rejected_paths = []
+        for path in the_five_short_paths(p, q):
+            (paths if self.can_add_path(path) else rejected_paths).append(path)
+        if self.explanation is not None:
+            self.explanation[0] = self.rejection_reasons(rejected_paths)
+        if self.branch_depth == self.split_depth and paths:
+            # Parallel mode: the subtrees are not explored here, but recorded so that a worker process can rebuild
+            # the current state and explore them later (the frame of the current node is not on 'stack' yet).
+            # Every subtree is recorded with its share of the tree (see the section TREE SIZE ESTIMATION).
+            weight = self.weight_of_node() / len(paths)
+            for path in paths:
+                self.subtrees.append((list(self.current_paths), set(self.known_satisfaction), path, len(self.stack) + 1, weight))
+            self.unexplored_weight += weight * len(paths)
+            return [], len(paths)
+        return paths, len(paths)
+
+    # -------------------------------------------------------------------------------------------------------------
+    # CERTIFICATE
+    #
+    # The certificate of a proof is its tree, written in preorder with one line per claim made by the search:
+    # - 'S x0 y0 x1 y1 ...': the points of a shortcut (a path from u to v shorter than 'length_of_path');
+    # - 'P i vx vy': the pattern 'list_of_patterns[i]' translated by (vx, vy) is in the configuration;
+    # - 'C px py qx qy': the pair (p, q) cannot be joined (case Contradiction);
+    # - 'U px py qx qy x0 y0 x1 y1 ...': the path (x0, y0), (x1, y1), ... is the only possible path between p and q
+    #   (case Deduction); it is added to the configuration, and the next line is about the new configuration;
+    # - 'B px py qx qy': the search branches on the pair (p, q); the subtrees of the paths of 'the_five_short_paths'
+    #   which can be added follow, in this order;
+    # - 'N k vx vy': the k-th explanation of a branching node (see the section LEARNED NOGOODS), translated by
+    #   (vx, vy), is in the configuration. The checker computes the explanations of the branching nodes from the
+    #   certificate itself, in the same order, so that it does not have to trust the learned nogoods.
+    # The lines 'S', 'P', 'C' and 'N' close the current node. The first line is 'R name', where 'name' is the name
+    # of the result, or 'R name nogoods' with the option 'nogood_store_size' (the checker then computes the
+    # explanations, which it does not need otherwise).
+    # The certificate is checked without search by certificate.py.
+
+    def certify(self, kind, *points):
+        '''Writes a line of the certificate: 'kind' followed by the coordinates of 'points' (points or lists of points).'''
+        numbers = []
+        for point in points:
+            for x, y in (point if isinstance(point, list) else [point]):
+                numbers.extend([int(x), int(y)])
+        self.certificate.write(' '.join([kind] + [str(n) for n in numbers]) + '\n')
+
+    def certify_pattern(self, pattern):
+        '''Writes the line of the certificate of a pattern returned by 'pattern_created_by_recent_add'.'''
+        (ax, ay), _ = pattern[0]
+        for i, known_pattern in enumerate(self.list_of_patterns):
+            (bx, by), _ = known_pattern[0]
+            v = (ax-bx, ay-by)
+            if len(known_pattern) == len(pattern) and \
+                    all([translate(a, v) == c and translate(b, v) == d for (a, b), (c, d) in zip(known_pattern, pattern)]):
+                self.certificate.write('P %d %d %d\n' % (i, v[0], v[1]))
+                return
+        raise ValueError('The pattern is not a translate of a known pattern')
+
+    # -------------------------------------------------------------------------------------------------------------
+    # CHECKPOINTS
+    #
+    # The state of the exploration is determined by the path of choices from the root to the current node:
+    # the number of children entered by every frame of 'stack' (the last child entered by a frame is the node of
+    # the next frame, and all the children entered by the last frame are explored). Replaying these choices
+    # from the root rebuilds the configuration, 'known_satisfaction' and 'stack' (the completed siblings are skipped
+    # without being explored), and the counters are restored from the checkpoint.
+    #
+    # The learned nogoods, the cache and the transposition table are not saved: after a resume they only contain what
+    # was learned since, so with these options the remaining tree can be larger than without interruption. The nodes
+    # entered by the replay of the choices learn no nogood, since their explanations miss the completed siblings.
+
+    def write_checkpoint(self):
+        '''
+        Writes the checkpoint of the current node in 'checkpoint_file': a JSON object with the initial path 'root',
+        the numbers of children entered by the frames of 'stack' ('choices') and the counters.
+        The checkpoint is first written in a temporary file which then replaces 'checkpoint_file', so that
+        an interruption never leaves a partial checkpoint.
+        '''
+        checkpoint = {'root': self.stack[0][0] if self.stack else None,
+                      'choices': [frame[6] for frame in self.stack],
+                      'counters': self.counters}
+        temporary_file = self.checkpoint_file + '.tmp'
+        with open(temporary_file, 'w') as f:
+            json.dump(checkpoint, f, default=Profile.as_dict)     # the counter 'profile' is written as a dictionary
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_file, self.checkpoint_file)
+        self.next_checkpoint = time.monotonic() + self.checkpoint_interval
+
+    def resume(self, gamma, checkpoint):
+        '''
+        Same as 'expand', but the exploration starts at the node of 'checkpoint' (see 'write_checkpoint'),
+        as if the subtrees before this node had already been explored.
+        The replay of the choices does not send notifications to the interface.
+        '''
+        from interface import SilentInterface
+
+        if checkpoint['root'] != [list(p) for p in gamma]:
+            raise ValueError('The checkpoint was not written for this result')
+
+        stack = self.stack
+        interface = self.interface
+        self.interface = SilentInterface()
+        if not self.enter_node(gamma):
+            raise ValueError('The checkpoint does not match the search tree')
+        choices = checkpoint['choices']
+        for i, nb_children in enumerate(choices):
+            frame = stack[-1]
+            is_last = (i == len(choices) - 1)
+            for _ in range(nb_children if is_last else nb_children - 1):   # the completed children
+                if next(frame[4], None) is None:
+                    raise ValueError('The checkpoint does not match the search tree')
+            frame[6] = nb_children
+            if not is_last:
+                path = next(frame[4], None)
+                if frame[5]:
+                    self.branch_depth += 1
+                if path is None or not self.enter_node(path):
+                    raise ValueError('The checkpoint does not match the search tree')
+        self.interface = interface
+        if self.nogood_store_size > 0:
+            for frame in stack:
+                frame[8] = None
+        counters = checkpoint['counters']
+        if self.profile is not None and 'profile' in counters:
+            self.profile.load(counters.pop('profile'))
+        self.counters.update(counters)
+        if self.estimate_interval > 0:    # the estimates are made at the same numbers of branches as without interruption
+            self.next_estimate = (self.counters['branches'] // self.estimate_interval + 1) * self.estimate_interval
+
+        self.explore(0)
+
+    def explore_subtree(self, subtree):
+        '''
+        Explores a subtree recorded by 'expand' in parallel mode (in a worker process).
+        The state at the root of the subtree is rebuilt from the paths added from the root of the proof.
+        Returns the counters of the subtree.
+        '''
+        prefix, satisfied_pairs, gamma, self.depth_offset, _ = subtree
+        for path in prefix:
+            self.add_path(path)
+            self.current_paths.append(path)
+        self.known_satisfaction = satisfied_pairs
+        self.counters = dict.fromkeys(self.counters, 0)
+        if self.profile is not None:    # the statistics of the prefix are not counted
+            self.profile.clear()
+            self.counters['profile'] = self.profile
+
+        self.expand(gamma)
+
+        self.current_paths.clear()
+        self.backtrack(0)
+        return self.counters
+
+    # -------------------------------------------------------------------------------------------------------------
+    # TREE SIZE ESTIMATION
+    #
+    # The number of branches of the whole proof is estimated during the exploration, as the number of branches so far
+    # divided by the share of the tree already explored. The share of a node is the share of its parent divided by
+    # the number of children ('width') of the parent (the root has share 1), that is, the subtrees of the children of
+    # a node are assumed to have the same size. The explored share is then read on 'stack': the children of every
+    # frame entered before the current one are explored. As the exploration goes on, the estimate converges to the
+    # exact number of branches, which it reaches at the end of the proof.
+    # In parallel mode, the share of every subtree left to the worker processes is counted when its counters are
+    # received (see 'prove').
+    #
+    # Before the proof, the number of branches can be estimated by random probes (Knuth's estimator, see 'probe'
+    # and 'estimate_branches'): a probe goes down from the root to a leaf by choosing a random child at every node,
+    # and the product of the numbers of children met on the way is an unbiased estimate of the number of nodes at
+    # every depth.
+
+    def weight_of_node(self):
+        '''Returns the share of the tree of the node whose frame would be the next one on 'stack'.'''
+        weight = 1.0
+        for frame in self.stack:
+            if frame[7] > 0:
+                weight /= frame[7]
+        return weight
+
+    def estimated_fraction(self):
+        '''Returns the share of the tree already explored, as read on 'stack' (see the section TREE SIZE ESTIMATION).'''
+        stack = self.stack
+        fraction = 0.0
+        weight = 1.0
+        for i, frame in enumerate(stack):
+            width = frame[7]
+            if width == 0:  # (no path can be added between the pair of the branching: the subtree is explored)
+                return fraction + weight - self.unexplored_weight
+            # the child entered last by a frame below the top of 'stack' is the node of the next frame
+            nb_explored = frame[6] if i == len(stack) - 1 else frame[6] - 1
+            fraction += weight * nb_explored / width
+            weight /= width
+        return fraction - self.unexplored_weight
+
+    def estimated_branches(self, fraction=None):
+        '''
+        Returns the estimated number of branches of the whole proof, from the share of the tree already explored
+        ('fraction', by default given by 'estimated_fraction'), or None if nothing is explored yet.
+        '''
+        if fraction is None:
+            fraction = self.estimated_fraction()
+        if fraction <= 0:
+            return None
+        return max(self.counters['branches'], round(self.counters['branches'] / min(fraction, 1.0)))
+
+    def notify_estimate(self, fraction=None):
+        '''Sends the estimated number of branches of the proof to the interface (see 'estimated_branches').'''
+        estimate = self.estimated_branches(fraction)
+        if estimate is not None:
+            self.interface.notify_estimate(self.counters['branches'], estimate)
+        self.next_estimate = self.counters['branches'] + self.estimate_interval
+
+    def probe(self, gamma, generator):
+        '''
+        Makes a probe of Knuth's estimator: goes down from the node obtained by adding the path 'gamma' to a leaf,
+        by choosing a random child (with the random generator 'generator') at every node, and then removes 'gamma'.
+        Returns the sum, over the branches met, of the product of the numbers of children of their ancestors.
+        '''
+        stack = self.stack
+        counters = self.counters
+        bottom = len(stack)
+        branch_depth = self.branch_depth
+        estimate = 0
+        weight = 1
+        path = gamma
+        while True:
+            nb_branches = counters['branches']
+            is_inner_node = self.enter_node(path)
+            if counters['branches'] > nb_branches:
+                estimate += weight
+            if not is_inner_node:
+                break
+            frame = stack[-1]
+            children = list(frame[4])
+            if not children:
+                break
+            weight *= len(children)
+            path = generator.choice(children)
+            frame[6] = 1
+            if frame[5]:
+                self.branch_depth += 1
+        while len(stack) > bottom:
+            self.leave_node(stack.pop())
+        self.branch_depth = branch_depth
+        return estimate
+
+    # -------------------------------------------------------------------------------------------------------------
+    # PROFILING (see the section PROFILING above Prover)
+
+    def profile_phase(self, phase):
+        '''Replaces the method 'phase' of the prover by a wrapper which adds its time and its calls to 'profile'.'''
+        method = getattr(self, phase)
+        times = self.profile.times
+        calls = self.profile.calls
+        shortcut_nodes = self.profile.shortcut_nodes
+        clock = time.perf_counter
+
+        def timed_method(*args):
+            start = clock()
+            answer = method(*args)
+            times[phase] += clock() - start
+            calls[phase] += 1
+            if phase == 'find_shortcut':
+                shortcut_nodes[self.shortcut_nodes] = shortcut_nodes.get(self.shortcut_nodes, 0) + 1
+            return answer
+
+        def timed_generator(*args):     # the time of a generator is the time spent to generate its items
+            calls[phase] += 1
+            start = clock()
+            for item in method(*args):
+                times[phase] += clock() - start
+                yield item
+                start = clock()
+            times[phase] += clock() - start
+
+        setattr(self, phase, timed_generator if phase == 'candidate_pairs' else timed_method)
+
+    def profiled_enter_node(self, gamma):
+        '''Same as 'enter_node', but the depth of the node is added to the histogram 'depths' of 'profile'.'''
+        depths = self.profile.depths
+        depth = len(self.stack) + self.depth_offset
+        depths[depth] = depths.get(depth, 0) + 1
+        return type(self).enter_node(self, gamma)
 
 
 # -----------------------------------------------------------------------------------------------------------------
-# EXPLORATION
+# PROVER WITH BITBOARDS
 
-def expand(gamma):
+def build_bitboard_catalog():
+    '''
+    Returns the catalog of short paths (see 'build_path_catalog') adapted to bitboards:
+    a dictionary which maps every vector q with 1 <= |q| <= sqrt(5) to a triple (lowest_id, span, catalog_paths), where
+    - 'lowest_id' is the smallest id of an edge used by the paths from (0, 0) to q;
+    - 'span' is the bitmask of the ids between 'lowest_id' and the largest id of those edges (shifted by 'lowest_id');
+    - 'catalog_paths' is the list of the pairs (points, mask), where 'mask' is the bitboard of the edges of the path
+      shifted by 'lowest_id'.
     '''
-    Main recursive function. Implements Algorithm 2 (see the article).
+    catalog = {}
+    for q, (relative_edges, catalog_paths) in PATH_CATALOG.items():
+        ids = [edge_id((xa, ya), (xb, yb)) for xa, ya, xb, yb in relative_edges]
+        lowest_id = min(ids)
+        span = (1 << (max(ids) - lowest_id + 1)) - 1
+        bitboard_paths = []
+        for points, edge_ids, _ in catalog_paths:
+            mask = 0
+            for i in edge_ids:
+                mask |= 1 << (ids[i] - lowest_id)
+            bitboard_paths.append((points, mask))
+        catalog[q] = (lowest_id, span, bitboard_paths)
+    return catalog
 
-    In the comments, we will use [i:] to denote the i-th line of Algorithm 2.
+
+BITBOARD_CATALOG = build_bitboard_catalog()
+
+# The 8 directions, with their norm, their norm multiplied by DIL and the offset of the id of the corresponding edges (see bitboard.py)
+BITBOARD_DIRECTIONS = [(d, norm, dilated_norm, EDGE_OFFSETS[d]) for d, norm, dilated_norm in dilated_directions]
+
+
+class BitboardProver(Prover):
     '''
+    Same as Prover, but the configuration is stored in bitboards (see bitboard.py) instead of sets of pairs of points:
+    - 'edge_bits' and 'forbidden_bits' are integers whose bit i is set iff the edge with id i is
+      in the configuration (respectively forbidden);
+    - 'degrees' is a list which maps point ids to their current degree.
+
+    Every edge is stored once, every membership test is a bit test, and the paths of the catalog are selected
+    with one shift of the bitboards per query. The attributes 'edges' and 'forbidden_edges' are read-only views
+    (sent to the interfaces), so that the results can be compared with Prover.
+    '''
+
+    def __init__(self, result_to_prove, communication_interface, depth_of_split=None, check_catalog=False, cache_size=0,
+                 transpositions=False, branching='static', max_branches=math.inf, propagation=False,
+                 nogood_store_size=0, checkpoint_file=None, checkpoint_interval=5, certificate=None, profile=False,
+                 estimate_interval=64):
+        super().__init__(result_to_prove, communication_interface, depth_of_split, check_catalog, cache_size,
+                         transpositions, branching, max_branches, propagation, nogood_store_size,
+                         checkpoint_file, checkpoint_interval, certificate, profile, estimate_interval)
+
+    def initialize_configuration(self):
+        self.edge_bits = 0
+        self.forbidden_bits = 0
+        self.degrees = [0]*NB_POINTS
+        self.points = {}
+
+    @property
+    def edges(self):
+        return EdgeSet(self.edge_bits)
+
+    @property
+    def forbidden_edges(self):
+        return EdgeSet(self.forbidden_bits)
+
+    def can_add_path(self, path):
+        edge_bits = self.edge_bits
+        forbidden_bits = self.forbidden_bits
+        degrees = self.degrees
+
+        degree_increment = {}    # maps point ids to the increment in degree they receive
+        l = len(path)
+        for i in range(l-1):
+            a = path[i]
+            b = path[i+1]
+            e = edge_id(a, b)
+
+            if (forbidden_bits >> e) & 1:
+                return False
+
+            if not (edge_bits >> e) & 1:  # already existing edges are fine
+                for p in [point_id(a), point_id(b)]:
+                    degree_increment[p] = degree_increment.get(p, 0) + 1
+                    # p will have a degree > 3 after adding the edge
+                    if degree_increment[p] + degrees[p] > 3:
+                        return False
+        return True
+
+    def exists_good_path(self, p, q):
+        lowest_id, _, catalog_paths = BITBOARD_CATALOG[vec(p, q)]
+        existing = self.edge_bits >> (shift_of(p) + lowest_id)
+
+        for _, mask in catalog_paths:
+            if mask & existing == mask:
+                return True
+        return False
+
+    def find_paths(self, p, q, max_nb_paths=math.inf):
+        can_add_path = self.can_add_path
+        px, py = p
+        lowest_id, _, catalog_paths = BITBOARD_CATALOG[vec(p, q)]
+        forbidden = self.forbidden_bits >> (shift_of(p) + lowest_id)
+
+        paths = []
+        for points, mask in catalog_paths:
+            if not mask & forbidden:
+                path = [(px+x, py+y) for x, y in points]
+                if can_add_path(path):
+                    paths.append(path)
+                    if len(paths) == max_nb_paths:
+                        break
+        return paths
+
+    def local_edges(self, p, q):
+        lowest_id, span, _ = BITBOARD_CATALOG[vec(p, q)]
+        shift = shift_of(p) + lowest_id
+        return (self.edge_bits >> shift) & span, (self.forbidden_bits >> shift) & span
+
+    def local_degrees(self, p, q):
+        degrees = self.degrees
+        id_p = point_id(p)
+        return tuple([degrees[id_p + x*SIDE + y] for x, y in CATALOG_POINTS[vec(p, q)]])
+
+    def find_shortcut(self, p, q, c):
+        edge_bits = self.edge_bits
+        nb_nodes = 0
+
+        def DFS(u, lg, prev=None):   # we are currently at u and we want to reach q, length of current path is 'lg'
+            nonlocal nb_nodes
+            nb_nodes += 1
+            if u == q and lg < c:
+                return [q]
+
+            # pruning
+            if lg + manhattan_with_diagonals(q, u) >= c:
+                return None  # we end the exploration of the current path
+
+            id_u = 4*point_id(u)
+            for d, norm, dilated_norm, offset in BITBOARD_DIRECTIONS:
+                v = translate(u, d)
+                if not (edge_bits >> (id_u + offset)) & 1:
+                    norm = dilated_norm  # see Prover.find_shortcut
+
+                if v != prev:
+                    shortcut = DFS(v, lg+norm, v)
+                    if shortcut is not None:
+                        return [u] + shortcut
+            return None
+        shortcut = DFS(p, ZERO)
+        self.shortcut_nodes = nb_nodes
+        return shortcut
+
+    def add_path(self, path):
+        '''
+        Same as Prover.add_path, but the new forbidden edges are recorded on 'trail' at once,
+        as (FORBIDDEN_RECORD, bitboard of the new forbidden edges, None).
+        '''
+        edge_bits = self.edge_bits
+        forbidden_bits = self.forbidden_bits
+        degrees = self.degrees
+        points = self.points
+        trail = self.trail
+
+        new_forbidden = 0
+
+        l = len(path)
+        for i in range(l-1):
+            a = path[i]
+            b = path[i+1]
+            e = edge_id(a, b)
+            if not (edge_bits >> e) & 1:
+                if not (is_in_window(a) and is_in_window(b)):
+                    raise ValueError('The configuration does not fit in the window of the bitboards (see bitboard.py)')
+                trail.append((EDGE_RECORD, a, b))
+
+                id_a = point_id(a)
+                id_b = point_id(b)
+                degrees[id_a] += 1
+                degrees[id_b] += 1
+                edge_bits |= 1 << e
+
+                if manhattan(a, b) == 2:  # (a, b) is a diagonal edge -> the crossing diagonal becomes forbidden
+                    dx, dy = vec(a, b)
+                    crossing = edge_id(translate(a, (dx, 0)), translate(a, (0, dy)))
+                    if not ((edge_bits | forbidden_bits) >> crossing) & 1:
+                        forbidden_bits |= 1 << crossing
+                        new_forbidden |= 1 << crossing
+
+                # if one of the endpoints of the edge now has degree 3, more forbidden edges need to be added
+                for id_p in [id_a, id_b]:
+                    if degrees[id_p] == 3:
+                        for _, _, _, offset in BITBOARD_DIRECTIONS:
+                            f = 4*id_p + offset
+                            if not ((edge_bits | forbidden_bits) >> f) & 1:
+                                forbidden_bits |= 1 << f
+                                new_forbidden |= 1 << f
+
+            for p in [a, b]:
+                if not p in points:
+                    trail.append((POINT_RECORD, p, None))
+                    points[p] = len(points)
+
+        if new_forbidden:
+            trail.append((FORBIDDEN_RECORD, new_forbidden, None))
+        self.edge_bits = edge_bits
+        self.forbidden_bits = forbidden_bits
+
+    def backtrack(self, height):
+        trail = self.trail
+        degrees = self.degrees
+        edge_bits = self.edge_bits
+        forbidden_bits = self.forbidden_bits
+        points = self.points
+        known_satisfaction = self.known_satisfaction
+
+        while len(trail) > height:
+            kind, a, b = trail.pop()
+            if kind == EDGE_RECORD:
+                degrees[point_id(a)] -= 1
+                degrees[point_id(b)] -= 1
+                edge_bits &= ~(1 << edge_id(a, b))
+            elif kind == FORBIDDEN_RECORD:
+                forbidden_bits &= ~a
+            elif kind == POINT_RECORD:
+                del points[a]
+            else:   # SATISFACTION_RECORD
+                known_satisfaction.discard((a, b))
+                known_satisfaction.discard((b, a))
+        self.edge_bits = edge_bits
+        self.forbidden_bits = forbidden_bits
+
+    def pattern_created_by_recent_add(self, recent_points):
+        edge_bits = self.edge_bits
+        pattern_index = self.pattern_index
+        for p in recent_points:
+            shift = shift_of(p)
+            for patt, attaching_point, _, offset, mask in pattern_index[self.signature(p)]:
+                if (edge_bits >> (shift + offset)) & mask == mask:
+                    v = vec(attaching_point, p)   # translation vector from pattern to edges
+                    translated_pattern = []
+                    for a, b in patt:
+                        translated_pattern.append(
+                            (translate(a, v), translate(b, v)))
+                    return translated_pattern
+        return None
+
+    def pattern_is_at(self, p, anchored_pattern):
+        _, _, _, offset, mask = anchored_pattern
+        shift = shift_of(p) + offset
+        return shift >= 0 and (self.edge_bits >> shift) & mask == mask
+
+    def signature(self, p):
+        edge_bits = self.edge_bits
+        first_id = 4*point_id(p)
+        signature = 0
+        for d, _, _, offset in BITBOARD_DIRECTIONS:
+            if (edge_bits >> (first_id + offset)) & 1:
+                signature |= DIRECTION_BITS[d]
+        return signature
+
+    def degree(self, x):
+        return self.degrees[point_id(x)]
+
+    def edges_at(self, x):
+        edge_bits = self.edge_bits
+        first_id = 4*point_id(x)
+        xx, xy = x
+        edges_at_x = set()
+        for (dx, dy), _, _, offset in BITBOARD_DIRECTIONS:
+            if (edge_bits >> (first_id + offset)) & 1:
+                y = (xx+dx, xy+dy)
+                edges_at_x.add((x, y) if x < y else (y, x))
+        return edges_at_x
+
 
-    global progress_counter
+# -----------------------------------------------------------------------------------------------------------------
+# PARALLEL EXPLORATION
+
+worker_prover = None    # the prover of a worker process in parallel mode
 
-    added_edges, added_points, new_forbidden = add_path(gamma)  # Variables to store changes made in 'expand' to remove them when the branch is finished
 
-    recent_points = set()
-    for edge in added_edges:
-        a, b = edge
-        recent_points.update([a, b])
+def initialize_worker(result_to_prove, prover_class, options):
+    '''Initializer of the worker processes used in parallel mode.'''
+    global worker_prover
+    from interface import SilentInterface
+    # the number of branches of the proof is only estimated by the main process (see 'prove')
+    worker_prover = prover_class(result_to_prove, SilentInterface(), **dict(options, estimate_interval=0))
 
-    new_known_satisfaction = []
 
-    shortcut = None
-    if to_prove.u is not None and to_prove.v is not None:
-        shortcut = find_shortcut(
-            to_prove.u, to_prove.v, to_prove.length_of_path)
+def explore_subtree(subtree):
+    '''Explores a subtree in a worker process (see Prover.explore_subtree), and returns its share of the tree and its counters.'''
+    return subtree[4], worker_prover.explore_subtree(subtree)
 
-    if shortcut is not None:  # Corresponds to line [2:] of Algorithm 2
-        interface.notify_shortcut(edges, forbidden_edges, shortcut)
+
+def prove(result_to_prove, communication_interface, nb_processes=1, depth_of_split=3, bitboard=False, resume=None,
+          certificate_file=None, **options):
+    '''
+    Proves 'result_to_prove' and returns the counters of the exploration
+    (number of branches, shortcuts, patterns, unique paths and contradictions).
+
+    If 'nb_processes' > 1, the subtrees rooted at the branching nodes of depth 'depth_of_split' are explored
+    in parallel by a pool of worker processes. Idle workers take the next unexplored subtree,
+    so the load is balanced even though the subtrees have very different sizes.
+    The counters are the same as with a serial exploration, except with the options 'transpositions' and
+    'nogood_store_size': every worker has its own table of refuted configurations and its own store of nogoods,
+    which only contain what it learned in its own subtrees, so fewer nodes are pruned than in a serial exploration
+    (6184 branches instead of 6120 for p4 with 'transpositions'), and the counters can change from one run to the next,
+    since they depend on the subtrees explored before by the same worker.
+
+    If 'bitboard' is True, the configuration is stored in bitboards (see BitboardProver) instead of sets.
+
+    If 'resume' is the name of a checkpoint file (see Prover.write_checkpoint), the exploration starts at the node
+    of the checkpoint. When the proof is complete, the checkpoint file (option 'checkpoint_file') is removed.
+    The checkpoints are only available with one process.
+
+    If 'certificate_file' is not None, the certificate of the proof (see Prover.certify) is written in this file
+    (compressed with gzip if its name ends with '.gz'). It is only available with one process, without the option
+    'transpositions' and without 'resume'.
+
+    The other options ('check_catalog', 'cache_size', 'transpositions', 'branching', 'max_branches',
+    'propagation', 'nogood_store_size', 'checkpoint_file', 'checkpoint_interval', 'profile', 'estimate_interval')
+    are passed to the constructor of the prover (see Prover). With 'profile', the counter 'profile' is a Profile.
+    In parallel mode, an estimate of the number of branches is sent to the interface after every subtree.
+    '''
+    if nb_processes > 1 and (resume is not None or options.get('checkpoint_file') is not None):
+        raise ValueError('The checkpoints are only available with one process')
+    if certificate_file is not None:
+        if nb_processes > 1 or resume is not None:
+            raise ValueError('The certificates are only available with one process and without resume')
+        options['certificate'] = (gzip.open if certificate_file.endswith('.gz') else open)(certificate_file, 'wt')
+        options['certificate'].write('R %s%s\n' % (result_to_prove.name,
+                                                   ' nogoods' if options.get('nogood_store_size', 0) > 0 else ''))
+
+    prover_class = BitboardProver if bitboard else Prover
+    if nb_processes == 1:
+        prover = prover_class(result_to_prove, communication_interface, **options)
     else:
-        created_pattern = pattern_created_by_recent_add(recent_points)
-        if created_pattern is not None:  # [4:]
-            interface.notify_pattern(edges, forbidden_edges, created_pattern)
-        else:
-            progress_counter += 1
-            interface.notify_branch(edges, forbidden_edges, progress_counter)
-
-            list_of_couples = []
-            # We construct a list of pairs of points (p, q) [with |pq|<=sqrt(5)] which we will examine:
-            # (Satisfaction) if there is already a path between p and q in 'edges' of length at most |pq|*DIL,
-            #     the pair is good and there is nothing to do.
-            #     We add the pair to 'known_satisfaction' so that we do not consider it again in the future (if not in 'known_satisfaction' already).
-            # (Deduction) if there is only one possible path (not entirely in 'edges') between p and q of length at most |pq|*DIL,
-            #     we deduce that it must be present. We store in 'a_unique_path' so that it can be added to
-            #     'edges' in the next call to 'expand' (unless a contradiction is found in the meantime).
-            # (Contradiction) if there cannot be any path between p and q of length at most |pq|*DIL,
-            #     we found a contradiction ('edges' is not part of a locally optimal geometric graph).
-            #     We end the exploration of this branch.
-            # (Exploration) otherwise, we cannot conclude anything yet because there are several possibilities for a path between
-            #     p and q of length at most DIL*|pq|, none of which is already in 'edges'
-
-            for p in points:  # First point of the pair
-                if is_close_to(p, recent_points, 3):    # We focus on the zones where changes have been made in the last step
-                    for dx in [-2, -1, 0, 1, 2]:
-                        for dy in [-2, -1, 0, 1, 2]:
-                            if abs(dx) + abs(dy) in [1, 2, 3]:
-                                q = translate(p, (dx, dy))  # The second point of the pair is such that 1 <= |pq| <= sqrt(5)
-                                if is_close_to(q, recent_points, 2):    # We focus on the zones where changes have been made in the last step
-                                    if (q, p) not in list_of_couples:  # To avoid duplicates
-                                        list_of_couples.append((p, q))
-
-            contradiction = False
-            deduction = False
-            a_unique_path = None  # The unique valid path in the case Deduction
-
-            for (p, q) in list_of_couples:
-                if (p, q) in known_satisfaction:  # Satisfaction (already known)
-                    continue
-                else:
-                    if exists_good_path(p, q):  # Satisfaction (new)
-                        known_satisfaction.update([(p, q), (q, p)])
-                        new_known_satisfaction.extend([(p, q), (q, p)])
-                        continue
-
-                # We want to figure out whether there are 0, 1 or at least 2 paths between p and q.
-                # The variable 'valid_paths' contains the list of valid paths between p and q (we limit the search to at most 2 paths).
-                valid_paths = find_paths(p, q, 2)
-
-                if len(valid_paths) == 0:  # Line [:6]: Contradiction
-                    interface.notify_impossible_to_join(
-                        edges, forbidden_edges, p, q)
-                    contradiction = True
-                    break  # We can stop immediately
-                elif not deduction and len(valid_paths) == 1:
-                    deduction = True
-                    a_unique_path = valid_paths[0]
-
-            if not contradiction:
-                if deduction:  # Line [:8]: Deduction
-                    interface.notify_unique_path(
-                        edges, forbidden_edges, a_unique_path)
-                    # Go deeper in the recursion to add the unique path [no choice is made]
-                    expand(a_unique_path)
-                else:  # Line [:12]
-                    # Go deeper in the recursion by trying all possibilities for some pair (p, q) [several choices]
-                    #
-                    # The pair (p, q) is chosen as follows: it is the first pair (p, q) of 'ls_edges_to_consider'
-                    # that is not known as good.
-
-                    id_edge = 0
-                    while id_edge < len(ls_edges_to_consider):
-                        p, q = ls_edges_to_consider[id_edge]
-
-                        if (p, q) not in known_satisfaction:
-                            for path in the_five_short_paths(p, q):
-                                if can_add_path(path):
-                                    expand(path)
-                            break
-
-                        id_edge += 1
-
-                    # Does not occur with the lists 'ls_edges_to_consider' that we provide
-                    if id_edge == len(ls_edges_to_consider):
-                        raise ValueError(
-                            "The list 'ls_edges_to_consider' was not long enough: we could not finish the proof within this depth")
-
-    # Undo the changes that were made at the start of this call to 'expand'
-    remove_path(added_edges, added_points, new_forbidden)
-    known_satisfaction.difference_update(new_known_satisfaction)
-
-
-def prove(result_to_prove, communication_interface):
-    global to_prove, edges, forbidden_edges, deg, points, known_satisfaction, ls_edges_to_consider, progress_counter, interface
-    to_prove = result_to_prove
-    interface = communication_interface
-
-    edges = set()
-    deg = {}
-    points = set()
-
-    forbidden_edges = set()
-    known_satisfaction = set()
-
-    progress_counter = 0
-
-    initialize_patterns([path_to_list_of_edges(lemma.path_of_config)
-                         for lemma in to_prove.known_lemmas])
-    # now list_of_patterns is the full list of forbidden patterns, taking rotations and symmetries into account
-
-    ls_edges_to_consider = to_prove.edges_to_consider
-
-    interface.notify_start(edges, forbidden_edges, to_prove)
-    expand(to_prove.path_of_config)
-    interface.notify_end(to_prove)
+        prover = prover_class(result_to_prove, communication_interface, depth_of_split, **options)
+    interface = prover.interface
+    counters = prover.counters
+    start_time = time.perf_counter()
+
+    interface.notify_start(prover.edges, prover.forbidden_edges, result_to_prove)
+    if resume is None:
+        prover.expand(result_to_prove.path_of_config)
+    else:
+        with open(resume) as f:
+            checkpoint = json.load(f)
+        prover.resume(result_to_prove.path_of_config, checkpoint)
+    if prover.checkpoint_file is not None and os.path.exists(prover.checkpoint_file):
+        os.remove(prover.checkpoint_file)
+
+    if nb_processes > 1:
+        with multiprocessing.Pool(nb_processes, initializer=initialize_worker, initargs=(result_to_prove, prover_class, options)) as pool:
+            for weight, subtree_counters in pool.imap_unordered(explore_subtree, prover.subtrees, chunksize=1):
+                for key, value in subtree_counters.items():
+                    counters[key] += value
+                interface.notify_progress(counters['branches'])
+                prover.unexplored_weight -= weight
+                if prover.estimate_interval > 0:
+                    prover.notify_estimate(1 - prover.unexplored_weight)
+
+    if certificate_file is not None:
+        options['certificate'].close()
+
+    interface.notify_end(result_to_prove)
 
     interface.notify_finished()
+    if prover.profile is not None:
+        counters['profile'].total_time += time.perf_counter() - start_time   # (after a resume, with the time before)
+    return counters
+
+
+# -----------------------------------------------------------------------------------------------------------------
+# ESTIMATE OF THE SIZE OF A PROOF
+
+def estimate_branches(result_to_prove, nb_probes, seed=0, bitboard=False, branching='static', propagation=False):
+    '''
+    Estimates the number of branches of the proof of 'result_to_prove' (with the options 'bitboard', 'branching'
+    and 'propagation' of 'prove') by 'nb_probes' probes of Knuth's estimator (see Prover.probe), without the whole
+    proof. Returns the mean of the estimates of the probes and its standard error.
+    '''
+    from interface import SilentInterface
+
+    prover_class = BitboardProver if bitboard else Prover
+    prover = prover_class(result_to_prove, SilentInterface(), branching=branching, propagation=propagation, estimate_interval=0)
+    generator = random.Random(seed)
+    estimates = [prover.probe(result_to_prove.path_of_config, generator) for _ in range(nb_probes)]
+
+    mean = sum(estimates) / nb_probes
+    if nb_probes < 2:
+        return mean, math.inf
+    variance = sum([(estimate - mean)**2 for estimate in estimates]) / (nb_probes - 1)
+    return mean, math.sqrt(variance / nb_probes)
@@ -24,12 +24,16 @@ from docopt import docopt
 
 import matplotlib
 import matplotlib.pyplot as plt
-matplotlib.use('qt5agg')
+try:
+    matplotlib.use('qt5agg')
+except ImportError:     # no display (for instance when 'verify_shortest_paths' is imported by benchmark.py)
+    pass
 from matplotlib.widgets import Button, Slider
 
 from queue import PriorityQueue
 
 from util import *
+from rendering import Renderer, undirected
 
 
 def translate(p, vec):
@@ -169,6 +173,12 @@ class GUI:
         self.ax = self.fig.add_subplot(111, aspect='equal')
         self.__init_axes()
         
+        # the layers of the configuration, drawn in this order (see rendering.py)
+        self.renderer = Renderer(self.fig, self.ax)
+        self.edges_layer = self.renderer.segments(color='blue')
+        self.new_edges_layer = self.renderer.segments(linewidth=3, color='orange')
+        self.points_layer = self.renderer.points(marker='o', markersize=10, color='purple')
+        
         def handle_close(evt):
             print('Execution terminated')
             plt.close('all')
@@ -204,24 +214,11 @@ class GUI:
         self.ax.grid(which='both')
 
     def visualize(self, edges, new_edges=[], possible_values_for_p1=[]):
-        self.ax.cla()
-        self.__init_axes()
-        
-        for seg in edges:
-            a, b = seg
-            xa, ya = a
-            xb, yb = b
-            self.ax.plot((xa, xb), (ya, yb), color='blue')
-        
-        for seg in new_edges:
-            a, b = seg
-            xa, ya = a
-            xb, yb = b
-            self.ax.plot((xa, xb), (ya, yb), linewidth=3, color='orange')
-        
-        for pt in possible_values_for_p1:
-            x, y = pt
-            self.ax.plot([x], [y], marker='o', markersize=10, color='purple')
+        # only the segments which changed since the previous frame are updated
+        self.edges_layer.update(undirected(edges))
+        self.new_edges_layer.update(undirected(new_edges))
+        self.points_layer.update(possible_values_for_p1)
+        self.renderer.update()
         
         plt.pause(0.001)
     
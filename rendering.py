@@ -0,0 +1,128 @@
+import numpy as np
+
+from matplotlib.collections import LineCollection
+
+
+# -----------------------------------------------------------------------------------------------------------------
+# INCREMENTAL RENDERING
+#
+# The graphical interfaces (GUIInterface of interface.py and GUI of proposition_2_1.py) draw their configurations
+# with a Renderer: every kind of segment (edges, forbidden edges, shortcut, pattern, ...) is a single LineCollection
+# (a SegmentLayer) instead of one Line2D per segment, and a frame only adds and removes the segments which changed
+# since the previous frame. The layers are animated artists drawn with blitting: the axes (grid and ticks) are
+# saved as a background when the whole figure is drawn, and a frame only restores this background and draws the
+# layers on it.
+
+def undirected(edges):
+    '''Returns the set of the edges (a, b) with a < b, once for every edge of 'edges' (in either orientation).'''
+    return {(a, b) if a < b else (b, a) for a, b in edges}
+
+
+def curly_segment(a, b):
+    '''Returns the points (an array of shape (200, 2)) of a wavy line from a to b.'''
+    # modified from the answer https://stackoverflow.com/a/50918519/3350732
+    # of user hayk-hakobyan https://stackoverflow.com/users/4888158/hayk-hakobyan
+    # from https://stackoverflow.com/questions/45365158/matplotlib-wavy-arrow
+    xa, ya = a
+    xb, yb = b
+    dist = np.hypot(xb - xa, yb - ya)
+    theta = np.arctan2(yb - ya, xb - xa)
+
+    n = 3 * round(dist)
+    x = np.linspace(0, dist, 200)
+    y = 0.2 * np.sin(2*np.pi * x * n / dist)
+    return np.column_stack((xa + np.cos(theta)*x - np.sin(theta)*y, ya + np.sin(theta)*x + np.cos(theta)*y))
+
+
+class SegmentLayer:
+    '''
+    Segments of the same style, drawn as one LineCollection. Every segment has a key (for instance an edge (a, b),
+    or a path given as a tuple of points), and its points are computed once, when the segment is added.
+    '''
+
+    def __init__(self, ax, **style):
+        self.artist = LineCollection([], animated=True, **style)
+        ax.add_collection(self.artist, autolim=False)
+        self.keys = []          # the key of every segment of the collection
+        self.segments = []      # the points of every segment of the collection
+        self.index = {}         # maps the key of a segment to its position in the two lists
+
+    def update(self, keys, points_of_key=None):
+        '''
+        Displays the segments of the set 'keys': the segments which are not in 'keys' anymore are removed, and the
+        new ones are added with the points 'points_of_key(key)' (by default the key itself, as for an edge (a, b)).
+        '''
+        removed = self.index.keys() - keys
+        added = keys - self.index.keys()
+        if not removed and not added:
+            return
+        for key in removed:
+            i = self.index.pop(key)
+            last_key = self.keys.pop()
+            last_segment = self.segments.pop()
+            if last_key != key:     # the last segment takes the place of the removed one
+                self.keys[i] = last_key
+                self.segments[i] = last_segment
+                self.index[last_key] = i
+        for key in added:
+            self.index[key] = len(self.keys)
+            self.keys.append(key)
+            self.segments.append(key if points_of_key is None else points_of_key(key))
+        self.artist.set_segments(self.segments)
+
+
+class PointLayer:
+    '''Points of the same style (markers), drawn as one Line2D.'''
+
+    def __init__(self, ax, **style):
+        self.artist, = ax.plot([], [], linestyle='', animated=True, **style)
+        self.points = []
+
+    def update(self, points):
+        points = list(points)
+        if points != self.points:
+            self.points = points
+            self.artist.set_data([x for x, _ in points], [y for _, y in points])
+
+
+class Renderer:
+    '''
+    Draws layers of segments and points on the axes 'ax' of the figure 'fig' with blitting.
+    The layers are drawn in the order in which they are created.
+    '''
+
+    def __init__(self, fig, ax):
+        self.fig = fig
+        self.ax = ax
+        self.layers = []
+        self.background = None      # the axes without the layers, saved at the last drawing of the whole figure
+        self.fig.canvas.mpl_connect('draw_event', self.on_draw)
+
+    def segments(self, **style):
+        '''Returns a new SegmentLayer with the given style (arguments of LineCollection).'''
+        self.layers.append(SegmentLayer(self.ax, **style))
+        return self.layers[-1]
+
+    def points(self, **style):
+        '''Returns a new PointLayer with the given style (arguments of plot).'''
+        self.layers.append(PointLayer(self.ax, **style))
+        return self.layers[-1]
+
+    def on_draw(self, event):
+        # the layers are animated, so the whole figure is drawn without them
+        self.background = self.fig.canvas.copy_from_bbox(self.ax.bbox)
+        self.draw_layers()
+
+    def draw_layers(self):
+        for layer in self.layers:
+            self.ax.draw_artist(layer.artist)
+
+    def update(self):
+        '''Draws a frame with the current state of the layers.'''
+        canvas = self.fig.canvas
+        if self.background is None or not canvas.supports_blit:
+            canvas.draw_idle()      # the whole figure is drawn (and then the layers, by 'on_draw')
+            return
+        canvas.restore_region(self.background)
+        self.draw_layers()
+        canvas.blit(self.ax.bbox)
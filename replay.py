@@ -0,0 +1,184 @@
+"""A NOTE ON OPTIMAL DEGREE-THREE SPANNERS OF THE SQUARE LATTICE - REPLAY OF A LOG
+
+Usage:
+    replay.py <log_file> [--result=<name>] [--branch=<n> | --contradiction=<k> | --pattern=<k> | --shortcut=<k> | --event=<i>] [--keyframe-interval=<n>] [--info]
+    replay.py (-h | --help)
+
+Options:
+    -h --help                   Show this screen.
+    --result=<name>             Only consider the events of the proof of this result (h1, h2, p1, p2, p3 or p4).
+    --branch=<n>                Start at the branch number n.
+    --contradiction=<k>         Start at the k-th pair which cannot be joined.
+    --pattern=<k>               Start at the k-th pattern found.
+    --shortcut=<k>              Start at the k-th shortcut found.
+    --event=<i>                 Start at the i-th event of the log (the first event is 1).
+    --keyframe-interval=<n>     Number of events between two full configurations stored in the index [default: 256].
+    --info                      Only print the event where the replay would start and its configuration (without GUI).
+
+Explanation:
+    This program replays in the graphical interface a proof recorded with the option --log of launch.py,
+    without running the proof again. The log is read once and indexed: the configuration is stored in full
+    every 'keyframe-interval' events, so the configuration of any event is rebuilt from the closest keyframe
+    with at most 'keyframe-interval' changes, and the replay can start at any event.
+"""
+
+import time
+import bisect
+
+from docopt import docopt
+
+import interface
+from interface import symmetric_edges
+
+
+# -----------------------------------------------------------------------------------------------------------------
+# INDEX OF A LOG
+
+# The names of the events of the log which can be searched, as given on the command line
+SEARCHED_EVENTS = {'branch': 'branch', 'contradiction': 'impossible_to_join', 'pattern': 'pattern', 'shortcut': 'shortcut'}
+
+
+class LogIndex:
+    '''
+    Index of the events of a log file written by LogInterface (see 'read_log' of interface.py).
+
+    'events' is the list of the events, 'keyframes' the list of the configurations (edges, forbidden_edges)
+    after the events number 0, K, 2K, ... where K is 'keyframe_interval' (the edges are stored once, as (a, b)
+    with a < b), and 'starts' the list of the numbers of the events 'start'. 'positions' maps every pair
+    (result, event name) to the list of the numbers of these events in the proof of the result, and (None, event name)
+    to the list of the numbers of these events in the whole log; 'branches' maps every pair (result, number of
+    the branch) to the number of its event 'branch'.
+    '''
+
+    def __init__(self, log_file, keyframe_interval=256):
+        self.keyframe_interval = keyframe_interval
+        self.events = []
+        self.keyframes = []
+        self.starts = []
+        self.positions = {}
+        self.branches = {}
+
+        result = None
+        edges = set()
+        forbidden_edges = set()
+        for i, event in enumerate(interface.read_log(log_file)):
+            name, added, removed, forbidden_added, forbidden_removed, _ = event
+            edges.difference_update(removed)
+            edges.update(added)
+            forbidden_edges.difference_update(forbidden_removed)
+            forbidden_edges.update(forbidden_added)
+            if i % keyframe_interval == 0:
+                self.keyframes.append((frozenset(edges), frozenset(forbidden_edges)))
+            if name == 'start':
+                self.starts.append(i)
+                result = event[5][0]
+            elif name == 'branch':
+                self.branches.setdefault((result, event[5]), i)
+            self.positions.setdefault((result, name), []).append(i)
+            self.positions.setdefault((None, name), []).append(i)
+            self.events.append(event)
+
+    def configuration(self, i):
+        '''
+        Returns the configuration (edges, forbidden_edges) after the event number i, as two sets of edges
+        (a, b) with a < b, rebuilt from the previous keyframe.
+        '''
+        k = i // self.keyframe_interval
+        edges, forbidden_edges = self.keyframes[k]
+        edges = set(edges)
+        forbidden_edges = set(forbidden_edges)
+        for _, added, removed, forbidden_added, forbidden_removed, _ in self.events[k*self.keyframe_interval + 1:i+1]:
+            edges.difference_update(removed)
+            edges.update(added)
+            forbidden_edges.difference_update(forbidden_removed)
+            forbidden_edges.update(forbidden_added)
+        return edges, forbidden_edges
+
+    def start_of(self, i):
+        '''Returns the number of the event 'start' of the proof which contains the event number i.'''
+        return self.starts[bisect.bisect_right(self.starts, i) - 1]
+
+    def find(self, name, k, result=None):
+        '''
+        Returns the number of the k-th event 'name' (k >= 1), counted in the proof of 'result' if it is not None,
+        or None if there is no such event. For the event 'branch', k is the number of the branch (its data),
+        and the first proof of the log is used if 'result' is None.
+        '''
+        if name == 'branch':
+            if result is None:
+                result = self.events[self.starts[0]][5][0]
+            return self.branches.get((result, k))
+        positions = self.positions.get((result, name), [])
+        return positions[k-1] if 1 <= k <= len(positions) else None
+
+
+# -----------------------------------------------------------------------------------------------------------------
+# REPLAY
+
+def replay(index, first, gui, to_prove_dictionary):
+    '''
+    Sends to the interface 'gui' the events of the log from the event number 'first' on,
+    with the configuration of every event, as during the proof.
+    '''
+    start = index.start_of(first)
+    if first > start:   # the replay starts in the middle of a proof
+        gui.notify_start(set(), set(), to_prove_dictionary[index.events[start][5][0]])
+    edges, forbidden_edges = index.configuration(first - 1) if first > 0 else (set(), set())
+    for name, added, removed, forbidden_added, forbidden_removed, data in index.events[first:]:
+        edges.difference_update(removed)
+        edges.update(added)
+        forbidden_edges.difference_update(forbidden_removed)
+        forbidden_edges.update(forbidden_added)
+        if name == 'start':
+            gui.notify_start(symmetric_edges(edges), symmetric_edges(forbidden_edges), to_prove_dictionary[data[0]])
+        elif name == 'end':
+            gui.notify_end(to_prove_dictionary[data])
+        elif name == 'finished':
+            gui.notify_finished()
+        elif name == 'impossible_to_join':
+            gui.notify_impossible_to_join(symmetric_edges(edges), symmetric_edges(forbidden_edges), *data)
+        elif name == 'progress':
+            gui.notify_progress(data)
+        elif name == 'estimate':
+            gui.notify_estimate(*data)
+        elif name == 'branch':
+            gui.notify_branch(symmetric_edges(edges), symmetric_edges(forbidden_edges), data)
+        else:
+            getattr(gui, 'notify_' + name)(symmetric_edges(edges), symmetric_edges(forbidden_edges), data)
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+
+    start_time = time.time()
+    index = LogIndex(arguments['<log_file>'], int(arguments['--keyframe-interval']))
+    print('Log indexed in %.1fs:' % (time.time() - start_time), len(index.events), 'events,', len(index.keyframes), 'keyframes')
+
+    if not index.starts:
+        raise SystemExit('The log contains no proof')
+    result = arguments['--result']
+    first = index.starts[0]
+    if result is not None:
+        if (result, 'start') not in index.positions:
+            raise SystemExit('The log does not contain the proof of %s' % result)
+        first = index.positions[(result, 'start')][0]
+    if arguments['--event'] is not None:
+        first = int(arguments['--event']) - 1
+    for option, name in SEARCHED_EVENTS.items():
+        if arguments['--' + option] is not None:
+            first = index.find(name, int(arguments['--' + option]), result)
+            if first is None:
+                raise SystemExit('The log does not contain this %s' % option)
+    if not 0 <= first < len(index.events):
+        raise SystemExit('The log does not contain this event')
+
+    if arguments['--info']:
+        start_time = time.time()
+        edges, forbidden_edges = index.configuration(first)
+        seek_time = time.time() - start_time
+        name, _, _, _, _, data = index.events[first]
+        print('Event %d (%s of the proof of %s):' % (first + 1, name, index.events[index.start_of(first)][5][0]), data)
+        print(len(edges), 'edges and', len(forbidden_edges), 'forbidden edges, rebuilt in %.2fms' % (1000*seek_time))
+    else:
+        from launch import to_prove_dictionary
+        replay(index, first, interface.GUIInterface(), to_prove_dictionary)
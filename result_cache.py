@@ -0,0 +1,133 @@
+import os
+import json
+import time
+import hashlib
+
+import proof
+
+
+# -----------------------------------------------------------------------------------------------------------------
+# KEYS
+#
+# The counters of a proof only depend on the result (its initial path, the list 'edges_to_consider', u, v,
+# 'length_of_path' and the paths of the known lemmas, from which the patterns are built), on the options which change
+# the search tree (see KEY_OPTIONS) and on the programs of the proof. The key of a proof is a hash of all of them,
+# so that an entry of the cache is never used after a change of the result, of an option or of the sources.
+# The bitboards do not change the counters, so they are not in the key. The number of processes and the depth of the
+# split do not change them either, except with the transpositions or the nogoods (see PARALLEL_OPTIONS): every worker
+# has its own table of refuted configurations and its own store of nogoods, so a parallel proof has more branches
+# than the serial one (6184 instead of 6120 for p4 with the transpositions), and their number even changes from one
+# run to the next, since the subtrees are given to the workers in the order in which they become free. With these
+# options, the number of processes and the depth of the split are in the key, and the entry of a parallel proof
+# contains the counters of the run which was stored.
+
+# The files whose contents are in the key (the programs used by 'prove')
+SOURCE_FILES = ['proof.py', 'util.py', 'bitboard.py']
+
+# The options of 'prove' which change the search tree or the counters
+KEY_OPTIONS = ['check_catalog', 'cache_size', 'transpositions', 'branching', 'propagation', 'nogood_store_size']
+
+# The options with which the counters of a parallel proof are not the counters of the serial proof
+PARALLEL_OPTIONS = ['transpositions', 'nogood_store_size']
+
+# Version of the format of the entries (an entry of another format is ignored)
+ENTRY_FORMAT = 1
+
+
+def description_of_result(result_to_prove):
+    '''Returns the inputs of the proof of 'result_to_prove' as a dictionary which can be written in JSON.'''
+    length = result_to_prove.length_of_path
+    return {'name': result_to_prove.name,
+            'u': result_to_prove.u,
+            'v': result_to_prove.v,
+            'length_of_path': None if length is None else [length.a, length.b],
+            'path_of_config': result_to_prove.path_of_config,
+            'edges_to_consider': result_to_prove.edges_to_consider,
+            'known_lemmas': [[lemma.name, lemma.path_of_config] for lemma in result_to_prove.known_lemmas]}
+
+
+def result_key(result_to_prove, options, nb_processes=1, depth_of_split=3):
+    '''
+    Returns the key of the proof of 'result_to_prove' with 'nb_processes' processes, the depth of split 'depth_of_split'
+    and the options 'options' of 'prove' (a hexadecimal string).
+    '''
+    directory = os.path.dirname(os.path.abspath(proof.__file__))
+    sources = {}
+    for source_file in SOURCE_FILES:
+        with open(os.path.join(directory, source_file), 'rb') as f:
+            sources[source_file] = hashlib.sha256(f.read()).hexdigest()
+    key_options = {option: options.get(option) for option in KEY_OPTIONS}
+    if any([options.get(option) for option in PARALLEL_OPTIONS]):
+        key_options['processes'] = nb_processes
+        key_options['split_depth'] = depth_of_split if nb_processes > 1 else None
+    content = json.dumps({'result': description_of_result(result_to_prove), 'options': key_options, 'sources': sources},
+                         sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+# -----------------------------------------------------------------------------------------------------------------
+# ENTRIES
+#
+# Every proof is stored in the file <key>.json of the directory of the cache, as a JSON object {'checksum', 'entry'}
+# where 'entry' contains the format, the key, the name of the result, the counters returned by 'prove', the time
+# of the proof and its date, and 'checksum'
+# is the SHA-256 of 'entry'. An entry is written in a temporary file which then replaces the file of the entry,
+# so an interruption never leaves a partial entry; an entry which was modified or damaged anyway is detected
+# by its checksum and ignored.
+
+class ResultCacheError(Exception):
+    '''Raised when an entry of the result cache is not valid.'''
+
+
+def checksum(entry):
+    return hashlib.sha256(json.dumps(entry, sort_keys=True).encode()).hexdigest()
+
+
+def entry_file(directory, key):
+    return os.path.join(directory, key + '.json')
+
+
+def load_result(directory, key, result_to_prove):
+    '''
+    Returns the entry of the proof of key 'key' in the cache 'directory' (see the section ENTRIES), or None if there
+    is no such entry. Raises ResultCacheError if the entry is not valid.
+    '''
+    try:
+        with open(entry_file(directory, key)) as f:
+            content = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, UnicodeDecodeError, ValueError) as error:
+        raise ResultCacheError('the entry cannot be read (%s)' % error)
+
+    if not isinstance(content, dict) or not isinstance(content.get('entry'), dict):
+        raise ResultCacheError('the entry is not an object {checksum, entry}')
+    entry = content['entry']
+    if content.get('checksum') != checksum(entry):
+        raise ResultCacheError('wrong checksum')
+    if entry.get('format') != ENTRY_FORMAT:
+        raise ResultCacheError('the entry has another format')
+    if entry.get('key') != key or entry.get('result') != result_to_prove.name:
+        raise ResultCacheError('the entry is not the entry of this proof')
+    counters = entry.get('counters')
+    if not isinstance(counters, dict) or \
+            not all([isinstance(counters.get(counter), int) for counter in ['branches', 'shortcuts', 'patterns', 'unique_paths', 'contradictions']]):
+        raise ResultCacheError('the counters are not valid')
+    return entry
+
+
+def store_result(directory, key, result_to_prove, counters, duration):
+    '''Writes the entry of a proof of key 'key' in the cache 'directory' (see the section ENTRIES).'''
+    os.makedirs(directory, exist_ok=True)
+    entry = {'format': ENTRY_FORMAT,
+             'key': key,
+             'result': result_to_prove.name,
+             'counters': counters,
+             'time': duration,
+             'date': time.strftime('%Y-%m-%d %H:%M:%S')}
+    temporary_file = entry_file(directory, key) + '.tmp'
+    with open(temporary_file, 'w') as f:
+        json.dump({'checksum': checksum(entry), 'entry': entry}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary_file, entry_file(directory, key))
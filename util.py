@@ -1,14 +1,33 @@
 # -----------------------------------------------------------------------------------------------------------------
 # CLASS FOR REPRESENTING DISTANCES EXACTLY
 
+def is_positive(a, b):
+    '''Returns True iff a+b*sqrt(2) > 0, for integers a and b.'''
+    if a < 0:
+        if b <= 0:
+            return False
+        else:  # b > 0
+            return 2*b*b > a*a
+    else:  # a >= 0
+        if b > 0:
+            return True
+        else:  # b <= 0
+            return a*a > 2*b*b
+
+
 class SquareRootNumber():
     '''
     A SquareRootNumber is an element of Z[sqrt(2)], i.e. a number of the
     form a+b*sqrt(2), for integers a and b.
     Attributes: a and b, integers.
     Methods: standard arithmetic operations and comparisons.
+
+    The comparisons do not create any intermediate SquareRootNumber.
+    SquareRootNumbers are never modified, so they can be shared (see the constants below) and hashed.
     '''
 
+    __slots__ = ('a', 'b')
+
     def __init__(self, _a, _b):  # a+b*sqrt(2)
         self.a = _a
         self.b = _b
@@ -28,41 +47,61 @@ class SquareRootNumber():
         return SquareRootNumber(a1*a2 + 2*b1*b2, a1*b2 + b1*a2)
 
     def __pow__(self, exponent):  # exponent is a nonnegative integer
+        if exponent == 2:
+            a, b = (self.a, self.b)
+            return SquareRootNumber(a*a + 2*b*b, 2*a*b)
         ans = SquareRootNumber(1, 0)
         for _ in range(exponent):
             ans *= self
         return ans
 
     def is_positive(self):
+        return is_positive(self.a, self.b)
+
+    def square_le(self, nb):
+        '''Returns True iff self**2 <= nb.'''
         a, b = (self.a, self.b)
-        if a < 0:
-            if b <= 0:
-                return False
-            else:  # b > 0
-                return 2*b**2 > a**2
-        else:  # a >= 0
-            if b > 0:
-                return True
-            else:  # b <= 0
-                return a**2 > 2*b**2
+        c = nb.a - (a*a + 2*b*b)
+        d = nb.b - 2*a*b
+        return (c == 0 and d == 0) or is_positive(c, d)
+
+    def __hash__(self):
+        return hash((self.a, self.b))
 
     def __eq__(self, nb):
         return self.a == nb.a and self.b == nb.b
 
     def __ne__(self, nb):
-        return not self == nb
+        return self.a != nb.a or self.b != nb.b
 
     def __lt__(self, nb):
-        return (nb - self).is_positive()
+        return is_positive(nb.a - self.a, nb.b - self.b)
 
     def __gt__(self, nb):
-        return nb < self
+        return is_positive(self.a - nb.a, self.b - nb.b)
 
     def __le__(self, nb):
-        return (self == nb) or (self < nb)
+        a = nb.a - self.a
+        b = nb.b - self.b
+        return (a == 0 and b == 0) or is_positive(a, b)
 
     def __ge__(self, nb):
-        return (self == nb) or (self > nb)
+        a = self.a - nb.a
+        b = self.b - nb.b
+        return (a == 0 and b == 0) or is_positive(a, b)
+
+
+# Constants shared by all the computations
+ZERO = SquareRootNumber(0, 0)
+ONE = SquareRootNumber(1, 0)
+SQRT_2 = SquareRootNumber(0, 1)
+DIL = SquareRootNumber(1, 1)    # the dilation 1+sqrt(2)
+DIL_SQUARED = DIL**2
+
+
+def dilated_squared(d_squared):
+    '''Returns (DIL*d)**2, where d_squared = d**2 is an integer (to be compared with the square of a length using square_le).'''
+    return SquareRootNumber(DIL_SQUARED.a*d_squared, DIL_SQUARED.b*d_squared)
 
 # -----------------------------------------------------------------------------------------------------------------
 # LISTS WITH THE POSSIBLE DIRECTIONS
@@ -74,9 +113,9 @@ for _i in [-1, 0, 1]:
     for _j in [-1, 0, 1]:
         if (_i, _j) != (0, 0):
             if _i != 0 and _j != 0:
-                _norm = SquareRootNumber(0, 1)
+                _norm = SQRT_2
             else:
-                _norm = SquareRootNumber(1, 0)
+                _norm = ONE
             directions.append(((_i, _j), _norm))
 
 # -----------------------------------------------------------------------------------------------------------------